@@ -1,5 +1,12 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
 
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from api.connections import check_connections_health
+        import api.signals  # noqa: F401
+
+        request_started.connect(check_connections_health)
@@ -1,7 +1,14 @@
+import hmac
 import jwt
 import logging
+import math
 
+from django.conf import settings
+
+from api import context, ratelimit, timing, tracing
+from api.middlewares.context import READ_ONLY_METHODS
 from api.models import User
+from api.routers import has_recent_write
 
 from rest_framework import status
 from rest_framework.response import Response
@@ -10,29 +17,101 @@ from rest_framework.response import Response
 logger = logging.getLogger(__name__)
 
 
+def call_view(func, view, *args, **kwargs):
+    with tracing.span(f"view {type(view).__name__}.{func.__name__}"):
+        return func(view, *args, **kwargs)
+
+
+def rate_limit(request, user):
+    """
+    429 response when the user exhausted its budget for this kind of route, None otherwise
+    """
+    allowed, retry_after = ratelimit.consume(user.id, write=request.method not in READ_ONLY_METHODS)
+    if allowed:
+        return None
+
+    logger.warning(f"User {user.id} rate limited ({request.method} {request.path})")
+    return Response(
+        "Too many requests",
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={'Retry-After': str(math.ceil(retry_after))}
+    )
+
+
+def authenticate_request(request, charge=True):
+    """
+    (user, token, None) of the request Authorization header, (None, None, response) on failure.
+    Without ``charge``, the request doesn't count against the user rate limit.
+    """
+    encoded_jwt = request.headers.get('Authorization')
+    logger.info(f"Authorizing {encoded_jwt}")
+    if not encoded_jwt:
+        logger.info("No Authorization header found")
+        return None, None, Response("No authorization header found", status=status.HTTP_401_UNAUTHORIZED)
+
+    # Already authenticated for this request (batched requests)
+    request_context = context.get()
+    if request_context.user is not None and request_context.token == encoded_jwt:
+        return request_context.user, encoded_jwt, rate_limit(request, request_context.user) if charge else None
+
+    try:
+        _, raw_jwt = encoded_jwt.split()  # Remove "Bearer"
+        decoded = jwt.decode(raw_jwt, algorithms=['HS256'], verify=False)
+
+        user = User(
+            int(decoded['userId']),
+            decoded['email']
+        )
+        token = encoded_jwt
+
+    except Exception:
+        logger.warning(f"Unable to decode authentication header {encoded_jwt}")
+        return None, None, Response("Unable to decode authentication header", status=status.HTTP_403_FORBIDDEN)
+
+    request_context.user = user
+    request_context.token = token
+    if request_context.read_only and has_recent_write(user.id):
+        request_context.use_primary = True
+
+    return user, token, rate_limit(request, user) if charge else None
+
+
 def authenticate(func):
+    """
+    Authenticate the user and charge the request to its rate limit,
+    unless the view sets ``rate_limited = False``
+    """
+    def wrapper(*args, **kwargs):
+        with timing.timer('auth'):
+            user, token, error = authenticate_request(args[1], charge=getattr(args[0], 'rate_limited', True))
+        if error is not None:
+            return error
+        return call_view(func, *args, **kwargs, user=user, token=token)
+
+    return wrapper
+
+
+def authenticate_internal(func):
+    """
+    Restrict a route to other Worko services, which must send the shared
+    INTERNAL_API_TOKEN in the X-Internal-Token header
+    """
     def wrapper(*args, **kwargs):
         request = args[1]
-        encoded_jwt = request.headers.get('Authorization')
-        logger.info(f"Authorizing {encoded_jwt}")
-        if not encoded_jwt:
-            logger.info("No Authorization header found")
-            return Response("No authorization header found", status=status.HTTP_401_UNAUTHORIZED)
-
-        try:
-            _, raw_jwt = encoded_jwt.split()  # Remove "Bearer"
-            decoded = jwt.decode(raw_jwt, algorithms=['HS256'], verify=False)
-
-            user = User(
-                int(decoded['userId']),
-                decoded['email']
-            )
-            token = encoded_jwt
-
-        except Exception:
-            logger.warning(f"Unable to decode authentication header {encoded_jwt}")
-            return Response("Unable to decode authentication header", status=status.HTTP_403_FORBIDDEN)
-
-        return func(*args, **kwargs, user=user, token=token)
+        if not settings.INTERNAL_API_TOKEN:
+            logger.error("INTERNAL_API_TOKEN is not set, internal routes are disabled")
+            return Response("Internal routes are disabled", status=status.HTTP_403_FORBIDDEN)
+
+        internal_token = request.headers.get('X-Internal-Token')
+        if not internal_token:
+            logger.info("No internal token found")
+            return Response("No internal token found", status=status.HTTP_401_UNAUTHORIZED)
+
+        # Headers may hold any latin-1 character, compare_digest only takes ASCII str
+        if not hmac.compare_digest(internal_token.encode(), settings.INTERNAL_API_TOKEN.encode()):
+            logger.warning("Invalid internal token")
+            return Response("Invalid internal token", status=status.HTTP_403_FORBIDDEN)
+
+        return call_view(func, *args, **kwargs)
 
     return wrapper
@@ -0,0 +1,12 @@
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def capped_ttl(ttl, local_max_ttl):
+    """
+    ``ttl``, capped to ``local_max_ttl`` when the cache is per process (LocMemCache):
+    invalidations then only reach the worker making them
+    """
+    if isinstance(caches['default'], LocMemCache):
+        return min(ttl, local_max_ttl)
+    return ttl
@@ -0,0 +1,131 @@
+"""
+IAM users and permissions shared by the workers, cached for IAM_USERS_CACHE_TTL
+and IAM_PERMISSIONS_CACHE_TTL. IAM pushes its changes to /internal/iam/events,
+entries are then updated (or invalidated) right away so the TTLs can be long.
+
+Entries filled from IAM answers are only added, never overwritten: an answer
+received before an event can't replace the value the event wrote. Invalidated
+entries are kept as tombstones for IAM_CACHE_TOMBSTONE_SECONDS for the same
+reason, and read as missing.
+
+Events only reach the worker they are posted to when the cache is per process
+(LocMemCache): the other workers keep the old values, revoked access included.
+The TTLs are then capped to IAM_LOCAL_CACHE_MAX_TTL.
+
+Permissions are keyed by user id, read from a JWT whose signature isn't
+checked. They are only served to tokens IAM already answered for that user
+(api.externals.iam.tokens), any other token is checked by IAM first.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from api.caches import capped_ttl
+from api.models import User, WorkspacePermission
+
+
+# Value of an invalidated entry, not a valid email nor access level
+_TOMBSTONE = ''
+
+
+def users_ttl():
+    return capped_ttl(settings.IAM_USERS_CACHE_TTL, settings.IAM_LOCAL_CACHE_MAX_TTL)
+
+
+def permissions_ttl():
+    return capped_ttl(settings.IAM_PERMISSIONS_CACHE_TTL, settings.IAM_LOCAL_CACHE_MAX_TTL)
+
+
+def _user_key(user_id):
+    return f"iam:user:{user_id}"
+
+
+def _permission_key(user_id, workspace_id):
+    return f"iam:permission:{user_id}:{workspace_id}"
+
+
+def _deleted_key(user_id):
+    return f"iam:deleted:{user_id}"
+
+
+def _token_key(token_hash):
+    return f"iam:token:{token_hash}"
+
+
+def get_users(ids):
+    """
+    Cached users of ``ids``, indexed by id
+    """
+    keys = { _user_key(user_id): user_id for user_id in ids }
+    cached = cache.get_many(keys.keys())
+    return {
+        keys[key]: User(keys[key], email)
+        for key, email in cached.items() if email != _TOMBSTONE
+    }
+
+
+def add_users(users):
+    """
+    Cache users fetched from IAM, entries already cached are kept
+    """
+    for user in users:
+        cache.add(_user_key(user.id), user.email, users_ttl())
+
+
+def set_user(user_id, email):
+    cache.set(_user_key(user_id), email, users_ttl())
+
+
+def invalidate_user(user_id):
+    cache.set(_user_key(user_id), _TOMBSTONE, settings.IAM_CACHE_TOMBSTONE_SECONDS)
+
+
+def get_permission(user_id, workspace_id, token_hash=None):
+    """
+    Cached permission of the user on the workspace, None if unknown. With
+    ``token_hash``, None unless IAM answered for the token as this user.
+    """
+    permission_key = _permission_key(user_id, workspace_id)
+    keys = [permission_key, _deleted_key(user_id)]
+    if token_hash is not None:
+        keys.append(_token_key(token_hash))
+    cached = cache.get_many(keys)
+    if _deleted_key(user_id) in cached or cached.get(permission_key, _TOMBSTONE) == _TOMBSTONE:
+        return None
+    if token_hash is not None and cached.get(_token_key(token_hash)) != user_id:
+        return None
+    return WorkspacePermission[cached[permission_key]]
+
+
+def add_token(token_hash, user_id, expires_in=None):
+    """
+    Remember IAM answered for the token as ``user_id``, at most until the token expires
+    """
+    ttl = permissions_ttl()
+    if expires_in is not None:
+        ttl = min(ttl, int(expires_in))
+    if ttl > 0:
+        cache.set(_token_key(token_hash), user_id, ttl)
+
+
+def add_permission(user_id, workspace_id, permission):
+    """
+    Cache a permission fetched from IAM, an entry already cached is kept
+    """
+    cache.add(_permission_key(user_id, workspace_id), permission.name, permissions_ttl())
+
+
+def set_permission(user_id, workspace_id, permission):
+    cache.set(_permission_key(user_id, workspace_id), permission.name, permissions_ttl())
+
+
+def invalidate_permission(user_id, workspace_id):
+    cache.set(_permission_key(user_id, workspace_id), _TOMBSTONE, settings.IAM_CACHE_TOMBSTONE_SECONDS)
+
+
+def invalidate_deleted_user(user_id):
+    """
+    Drop the user and all its permissions, whatever the workspaces
+    """
+    invalidate_user(user_id)
+    # Outlives every permission cached before the deletion
+    cache.set(_deleted_key(user_id), True, permissions_ttl())
@@ -0,0 +1,33 @@
+"""
+Number of live invitations per status of a user, for the pending invitations badge.
+Computed with an aggregate on the (user_id, status) partial index, cached for
+INVITATION_COUNTS_CACHE_TTL and invalidated on invitation changes.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from api.models import Invitation, InvitationStatus
+
+
+def _key(user_id):
+    return f"invitation-counts:{user_id}"
+
+
+def user_invitation_counts(user_id):
+    key = _key(user_id)
+    counts = cache.get(key)
+    if counts is None:
+        counts = dict.fromkeys((invitation_status.name for invitation_status in InvitationStatus), 0)
+        counts.update(
+            Invitation.objects.filter(user_id=user_id)
+            .order_by()
+            .values_list('status')
+            .annotate(count=Count('id'))
+        )
+        cache.set(key, counts, settings.INVITATION_COUNTS_CACHE_TTL)
+    return counts
+
+
+def invalidate(user_ids):
+    cache.delete_many([_key(user_id) for user_id in set(user_ids)])
@@ -0,0 +1,79 @@
+"""
+Workspace memberships answered from the local Workspace.users data.
+Entries are cached for MEMBERSHIP_CACHE_TTL and invalidated on workspace save,
+at most MEMBERSHIP_LOCAL_CACHE_MAX_TTL with the per process cache whose
+invalidations don't reach the other workers.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from api.caches import capped_ttl
+from api.models import Workspace
+
+
+def ttl():
+    return capped_ttl(settings.MEMBERSHIP_CACHE_TTL, settings.MEMBERSHIP_LOCAL_CACHE_MAX_TTL)
+
+
+def _user_key(user_id):
+    return f"membership:user:{user_id}"
+
+
+def _workspace_key(workspace_id):
+    return f"membership:workspace:{workspace_id}"
+
+
+def user_workspace_ids(user_id):
+    """
+    Ids of the workspaces the user is a member of
+    """
+    key = _user_key(user_id)
+    workspace_ids = cache.get(key)
+    if workspace_ids is None:
+        workspace_ids = sorted(
+            Workspace.objects.filter(users__contains=[user_id]).values_list('id', flat=True)
+        )
+        cache.set(key, workspace_ids, ttl())
+    return workspace_ids
+
+
+def workspaces_members(workspace_ids):
+    """
+    Members of each workspace, indexed by workspace id.
+    Unknown (or deleted) workspaces have no member.
+    """
+    keys = { _workspace_key(workspace_id): workspace_id for workspace_id in set(workspace_ids) }
+    cached = cache.get_many(keys.keys())
+    members = { keys[key]: value for key, value in cached.items() }
+
+    missing = [workspace_id for workspace_id in keys.values() if workspace_id not in members]
+    if missing:
+        loaded = dict.fromkeys(missing, [])
+        loaded.update(
+            Workspace.objects.filter(id__in=missing).values_list('id', 'users')
+        )
+        cache.set_many(
+            { _workspace_key(workspace_id): users for workspace_id, users in loaded.items() },
+            ttl()
+        )
+        members.update(loaded)
+
+    return { workspace_id: set(users) for workspace_id, users in members.items() }
+
+
+def is_member(user_id, workspace_id):
+    return user_id in workspaces_members([workspace_id])[workspace_id]
+
+
+def are_members(pairs):
+    """
+    Check many (user_id, workspace_id) pairs with at most one query
+    """
+    members = workspaces_members([workspace_id for _, workspace_id in pairs])
+    return [user_id in members[workspace_id] for user_id, workspace_id in pairs]
+
+
+def invalidate(workspace_id, user_ids):
+    cache.delete_many(
+        [_workspace_key(workspace_id)] + [_user_key(user_id) for user_id in set(user_ids)]
+    )
@@ -0,0 +1,53 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+def check_connections_health(**kwargs):
+    """
+    Close persistent connections that are no longer usable (database restart,
+    proxy recycling the server connection, network failure...) so the request
+    opens a fresh one instead of failing on its first query.
+    Connected to the ``request_started`` signal.
+
+    Each check is a round trip: connections closed after every request
+    (CONN_MAX_AGE = 0) are never checked, the others at most every
+    DB_CONN_HEALTH_CHECK_INTERVAL seconds.
+    """
+    if not settings.DB_CONN_HEALTH_CHECKS:
+        return
+
+    now = time.monotonic()
+    for conn in connections.all():
+        if conn.connection is None or conn.in_atomic_block or conn.settings_dict['CONN_MAX_AGE'] == 0:
+            continue
+        # (checked connection, when)
+        checked_connection, checked_at = getattr(conn, 'health_checked', (None, 0))
+        if checked_connection is conn.connection and now - checked_at < settings.DB_CONN_HEALTH_CHECK_INTERVAL:
+            continue
+        if not conn.is_usable():
+            logger.warning(f"Closing unusable database connection ({conn.alias})")
+            conn.close()
+            continue
+        conn.health_checked = (conn.connection, now)
+
+
+def warm_up_connections():
+    """
+    Open a connection on every configured database.
+    Called once per worker at boot, so the first request doesn't pay for it.
+    """
+    if not settings.DB_CONN_WARMUP:
+        return
+
+    for conn in connections.all():
+        try:
+            conn.ensure_connection()
+            logger.info(f"Database connection ({conn.alias}) warmed up")
+        except Exception as e:
+            logger.warning(f"Unable to warm up database connection ({conn.alias}) : {e}")
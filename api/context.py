@@ -0,0 +1,97 @@
+import threading
+
+
+_local = threading.local()
+
+
+class IdentityMap():
+    """
+    Entities loaded during the request (workspaces, IAM users, permissions...)
+    by kind and key, so none is fetched twice
+    """
+    def __init__(self):
+        self.__entities = {}
+
+    def __kind(self, kind):
+        return self.__entities.setdefault(kind, {})
+
+    def has(self, kind, key):
+        return key in self.__kind(kind)
+
+    def get(self, kind, key, default=None):
+        return self.__kind(kind).get(key, default)
+
+    def get_many(self, kind, keys):
+        """
+        Known entities of ``keys``, by key
+        """
+        entities = self.__kind(kind)
+        return { key: entities[key] for key in keys if key in entities }
+
+    def set(self, kind, key, entity):
+        self.__kind(kind)[key] = entity
+
+    def set_many(self, kind, entities):
+        self.__kind(kind).update(entities)
+
+    def discard(self, kind, key):
+        self.__kind(kind).pop(key, None)
+
+    def load(self, kind, key, loader):
+        """
+        Known entity of ``key``, or the one returned by ``loader`` which is
+        kept unless None
+        """
+        entities = self.__kind(kind)
+        if key in entities:
+            return entities[key]
+
+        entity = loader()
+        if entity is not None:
+            entities[key] = entity
+        return entity
+
+
+class RequestContext():
+    """
+    State shared by everything running for the current request
+    (views, externals, database router...)
+    """
+    def __init__(self):
+        self.user = None
+        # Authorization header the user was decoded from
+        self.token = None
+        # Request only reads data, its queries may be sent to a replica
+        self.read_only = False
+        # Force reads on the primary database (read-your-writes)
+        self.use_primary = False
+        # Entities loaded during the request, cleared with the context
+        self.entities = IdentityMap()
+        # api.tracing.Trace of the request
+        self.trace = None
+        # Time spent per phase of the request, (seconds, count) by name
+        self.timings = {}
+        # time.monotonic() after which the request is abandoned, None without deadline
+        self.deadline = None
+        # External data served from its last known value (api.externals.iam.snapshots)
+        self.stale = set()
+
+
+def begin():
+    _local.context = RequestContext()
+    return _local.context
+
+
+def end():
+    _local.context = None
+
+
+def get():
+    """
+    Return the current request context.
+    Outside of a request (shell, management commands) a default one is created.
+    """
+    context = getattr(_local, 'context', None)
+    if context is None:
+        context = begin()
+    return context
@@ -0,0 +1,39 @@
+"""
+Per-request deadline.
+
+The budget of a request starts in middleware (REQUEST_DEADLINE_MS, or less
+when the caller sent its own remaining budget in the X-Request-Budget-Ms
+header). External calls derive their timeout from what is left and send it
+downstream in the same header.
+"""
+import time
+
+from api import context
+
+
+BUDGET_HEADER = 'X-Request-Budget-Ms'
+
+
+def parse_budget(value):
+    """
+    Budget in seconds of a X-Request-Budget-Ms header value, None if malformed
+    """
+    try:
+        budget = int(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0, budget) / 1000
+
+
+def start(budget):
+    context.get().deadline = time.monotonic() + budget
+
+
+def remaining():
+    """
+    Seconds left before the request deadline, None without deadline
+    """
+    deadline = context.get().deadline
+    if deadline is None:
+        return None
+    return max(0, deadline - time.monotonic())
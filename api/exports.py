@@ -0,0 +1,83 @@
+"""
+Full dumps of workspaces and invitations, soft-deleted rows included,
+streamed row by row with a server-side cursor so memory stays constant.
+"""
+import csv
+import json
+
+from django.conf import settings
+
+from api.models import Workspace, Invitation
+from api.serializers.fast import datetime_representation
+
+
+EXPORTS = {
+    'workspace': (
+        Workspace,
+        ('id', 'name', 'users', 'created_at', 'updated_at', 'deleted_at')
+    ),
+    'invitation': (
+        Invitation,
+        ('id', 'workspace_id', 'sender', 'user_id', 'status', 'created_at', 'updated_at', 'deleted_at')
+    ),
+}
+
+DATETIME_COLUMNS = frozenset(('created_at', 'updated_at', 'deleted_at'))
+
+
+def export_queryset(name, since=None, until=None, status=None, deleted=None):
+    """
+    Rows of the ``name`` export, filtered on creation date range,
+    invitation status and soft-delete state (True: only deleted rows,
+    False: only live rows, None: both)
+    """
+    model, columns = EXPORTS[name]
+    queryset = model.raw_objects.all()
+
+    if since is not None:
+        queryset = queryset.filter(created_at__gte=since)
+    if until is not None:
+        queryset = queryset.filter(created_at__lt=until)
+    if status is not None:
+        queryset = queryset.filter(status=status)
+    if deleted is not None:
+        queryset = queryset.filter(deleted_at__isnull=not deleted)
+
+    return queryset.order_by('id').values_list(*columns)
+
+
+def _row_values(columns, row):
+    return [
+        datetime_representation(value) if column in DATETIME_COLUMNS else value
+        for column, value in zip(columns, row)
+    ]
+
+
+class _Echo():
+    """
+    File-like object returning what is written, used to stream csv lines
+    """
+    def write(self, value):
+        return value
+
+
+def export_lines(name, queryset, export_format, chunk_size=None):
+    """
+    Generate the export lines, fetching ``chunk_size`` rows at a time
+    """
+    _, columns = EXPORTS[name]
+    rows = queryset.iterator(chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE)
+
+    if export_format == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns)
+        for row in rows:
+            values = _row_values(columns, row)
+            if 'users' in columns:
+                index = columns.index('users')
+                values[index] = ' '.join(str(user_id) for user_id in values[index])
+            yield writer.writerow(values)
+        return
+
+    for row in rows:
+        yield json.dumps(dict(zip(columns, _row_values(columns, row))), ensure_ascii=False) + '\n'
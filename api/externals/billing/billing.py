@@ -25,7 +25,8 @@ class ExternalBilling(AbstractExternalBilling):
                 body={
                     'type': event[0],
                     'workspaceId': workspace_id
-                }
+                },
+                service='billing'
             )
             if response.status_code == 200:
                 logger.info("Billing event successfully sent.")
@@ -5,5 +5,12 @@ class ExternalUnreachableException(Exception):
     pass
 
 
+class DeadlineExceededException(ExternalUnreachableException):
+    """
+    Not enough request budget left for the call
+    """
+    pass
+
+
 class HttpException(requests.exceptions.HTTPError):
     pass
@@ -23,7 +23,9 @@ class ExternalGamification:
                 token=token,
                 body={
                     'actionTitle': 'Workspaces created'
-                }
+                },
+                service='gamification',
+                essential=False
             )
             if response.status_code == 200:
                 logger.info("Gamification event successfully sent.")
@@ -0,0 +1,167 @@
+"""
+Hedged requests for idempotent reads.
+
+When a read hasn't answered after the HTTP_HEDGE_PERCENTILE of the recent
+latencies of its service, a second identical request is sent and the first
+answer wins. Hedges are capped to HTTP_HEDGE_BUDGET of the requests so a slow
+service doesn't get twice the load.
+
+Calls are never queued behind the ones of other requests: when the
+HTTP_HEDGE_WORKERS threads are busy, the call runs unhedged in the request
+thread.
+"""
+import collections
+import concurrent.futures
+import os
+import threading
+import time
+
+from django.conf import settings
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker():
+    """
+    Latencies of the last ``window`` requests of a service
+    """
+    def __init__(self, window):
+        self.latencies = collections.deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def record(self, latency):
+        with self.lock:
+            self.latencies.append(latency)
+
+    def percentile(self, percentile, min_samples):
+        """
+        Latency under which ``percentile`` % of the requests answered, None without enough samples
+        """
+        with self.lock:
+            if len(self.latencies) < max(1, min_samples):
+                return None
+            latencies = sorted(self.latencies)
+        index = min(len(latencies) - 1, int(len(latencies) * percentile / 100))
+        return latencies[index]
+
+
+class HedgeBudget():
+    """
+    Each request earns ``ratio`` token, each hedge costs one
+    """
+    def __init__(self, ratio, max_tokens=10):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = 0
+        self.lock = threading.Lock()
+
+    def earn(self):
+        with self.lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def spend(self):
+        with self.lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_service(service):
+    """
+    (LatencyTracker, HedgeBudget) of ``service``
+    """
+    with _services_lock:
+        if service not in _services:
+            _services[service] = (
+                LatencyTracker(settings.HTTP_HEDGE_WINDOW),
+                HedgeBudget(settings.HTTP_HEDGE_BUDGET)
+            )
+        return _services[service]
+
+
+_executor = None
+_executor_slots = None
+_executor_pid = None
+
+
+def get_executor():
+    """
+    (pool, semaphore of its idle threads)
+    """
+    # Threads don't survive fork, each worker needs its own pool
+    global _executor, _executor_slots, _executor_pid
+    if _executor_pid != os.getpid():
+        _executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=settings.HTTP_HEDGE_WORKERS,
+            thread_name_prefix='http-hedge'
+        )
+        _executor_slots = threading.BoundedSemaphore(settings.HTTP_HEDGE_WORKERS)
+        _executor_pid = os.getpid()
+    return _executor, _executor_slots
+
+
+def _timed(call, tracker):
+    start = time.perf_counter()
+    result = call()
+    tracker.record(time.perf_counter() - start)
+    return result
+
+
+def _submit(call, tracker):
+    """
+    Future of ``call`` run by an idle thread of the pool, None when they are all busy
+    """
+    executor, slots = get_executor()
+    if not slots.acquire(blocking=False):
+        return None
+
+    def run():
+        try:
+            return _timed(call, tracker)
+        finally:
+            slots.release()
+    return executor.submit(run)
+
+
+def hedged(call, service):
+    """
+    Result of ``call``, hedged by a second call if the first one is slow
+    """
+    tracker, budget = get_service(service)
+    budget.earn()
+
+    delay = tracker.percentile(settings.HTTP_HEDGE_PERCENTILE, settings.HTTP_HEDGE_MIN_SAMPLES)
+    if delay is None:
+        return _timed(call, tracker)
+
+    primary = _submit(call, tracker)
+    if primary is None:
+        return _timed(call, tracker)
+    try:
+        return primary.result(timeout=delay)
+    except concurrent.futures.TimeoutError:
+        pass
+
+    if not budget.spend():
+        return primary.result()
+
+    hedge = _submit(call, tracker)
+    if hedge is None:
+        return primary.result()
+
+    logger.info(f"Hedging request to {service} after {delay * 1000:.0f}ms")
+    pending = {primary, hedge}
+    error = None
+    while pending:
+        done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = error or future.exception()
+    raise error
@@ -4,34 +4,91 @@ import logging
 import json
 logger  = logging.getLogger(__name__)
 
+from django.conf import settings
+
+from api import deadline, timing, tracing
+from api.externals import hedging
 from api.externals.errors import (
+    DeadlineExceededException,
     ExternalUnreachableException,
     HttpException
 )
 
 class Http():
     __session = requests.Session()
-    __TIMEOUT = os.getenv('HTTP_TIMEOUT', 1)
+    __TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 1))
+
+    @staticmethod
+    def reset_session():
+        """
+        Drop the pooled connections, forked workers must not share sockets
+        """
+        Http.__session.close()
+        Http.__session = requests.Session()
+
+    @staticmethod
+    def __get_timeout(essential=True):
+        """
+        HTTP_TIMEOUT, or what is left of the request budget when it is less
+        """
+        remaining = deadline.remaining()
+        if remaining is None:
+            return Http.__TIMEOUT
+
+        if not essential and remaining * 1000 < settings.REQUEST_DEADLINE_NON_ESSENTIAL_MS:
+            raise DeadlineExceededException("Not enough request budget left, non essential call skipped")
+        if remaining * 1000 < settings.REQUEST_DEADLINE_MIN_CALL_MS:
+            raise DeadlineExceededException("Request deadline exceeded")
+        return min(Http.__TIMEOUT, remaining)
 
     @staticmethod
-    def __get_headers(token=None):
+    def __get_headers(token=None, timeout=None):
         headers = {
             'Content-Type': 'application/json; charset=UTF-8'
         }
         if not token is None:
             headers['Authorization'] = token
+        if not timeout is None and deadline.remaining() is not None:
+            headers[deadline.BUDGET_HEADER] = str(int(timeout * 1000))
+        traceparent = tracing.traceparent()
+        if not traceparent is None:
+            headers['traceparent'] = traceparent
         return headers
 
     @staticmethod
-    def __call(method, url, token=None, body=None):
-        logger.info(f'[{method.upper()}] {url} body={json.dumps(body)} headers={Http.__get_headers(token)} auth={token != None}')
+    def __call(method, url, token=None, body=None, service=None, hedge=False, essential=True):
+        with tracing.span(f'http {service or "external"}', method=method.upper(), url=url) as span, \
+                timing.timer(service or 'external'):
+            timeout = Http.__get_timeout(essential)
+            # Headers use the request context, build them in the request thread
+            headers = Http.__get_headers(token, timeout)
+            if hedge and settings.HTTP_HEDGING:
+                response = hedging.hedged(
+                    lambda: Http.__send(method, url, headers, body, timeout, token is not None),
+                    service or url
+                )
+            else:
+                response = Http.__send(method, url, headers, body, timeout, token is not None)
+            if span is not None:
+                span.attributes['status'] = response.status_code
+        return response
+
+    @staticmethod
+    def __send(method, url, headers, body=None, timeout=None, auth=False):
+        logger.info(f'[{method.upper()}] {url} body={json.dumps(body)} headers={headers} auth={auth}')
         try:
             response = getattr(Http.__session, method)(
                 url,
-                timeout=Http.__TIMEOUT,
-                headers=Http.__get_headers(token),
+                timeout=timeout or Http.__TIMEOUT,
+                headers=headers,
                 data=json.dumps(body)
             )
+        except requests.Timeout as e:
+            logger.error('Unable to reach external service : ', e)
+            # Cut short by the request deadline, the service may be fine
+            if timeout is not None and timeout < Http.__TIMEOUT:
+                raise DeadlineExceededException(e)
+            raise ExternalUnreachableException(e)
         except requests.ConnectionError as e:
             logger.error('Unable to reach external service : ', e)
             raise ExternalUnreachableException(e)
@@ -45,17 +102,21 @@ class Http():
         return response
 
     @staticmethod
-    def get(url, token=None):
-        return Http.__call('get', url, token)
+    def get(url, token=None, service=None, hedge=False, essential=True):
+        """
+        ``hedge`` a slow call with a second one (HTTP_HEDGING), for idempotent reads only.
+        Calls that are not ``essential`` are skipped when the request deadline is close.
+        """
+        return Http.__call('get', url, token, service=service, hedge=hedge, essential=essential)
 
     @staticmethod
-    def post(url, token=None, body=None):
-        return Http.__call('post', url, token, body)
+    def post(url, token=None, body=None, service=None, hedge=False, essential=True):
+        return Http.__call('post', url, token, body, service=service, hedge=hedge, essential=essential)
 
     @staticmethod
-    def put(url, token=None, body=None):
-        return Http.__call('put', url, token, body)
+    def put(url, token=None, body=None, service=None, essential=True):
+        return Http.__call('put', url, token, body, service=service, essential=essential)
 
     @staticmethod
-    def delete(url, token=None):
-        return Http.__call('delete', url, token)
+    def delete(url, token=None, service=None, essential=True):
+        return Http.__call('delete', url, token, service=service, essential=essential)
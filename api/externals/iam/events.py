@@ -0,0 +1,60 @@
+"""
+Changes pushed by IAM to /internal/iam/events, applied to the IAM cache
+(api.caches.iam) and snapshots (api.externals.iam.snapshots).
+The new value is written when the event carries it, invalidated otherwise.
+"""
+from api.caches import iam as iam_cache
+from api.externals.iam import snapshots
+from api.models import User, WorkspacePermission
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+USER_CHANGED = 'user-changed'
+PERMISSION_CHANGED = 'permission-changed'
+USER_DELETED = 'user-deleted'
+
+EVENT_TYPES = (USER_CHANGED, PERMISSION_CHANGED, USER_DELETED)
+
+
+def _user_changed(event):
+    email = event.get('email')
+    if email is None:
+        iam_cache.invalidate_user(event['userId'])
+        return
+    iam_cache.set_user(event['userId'], email)
+    snapshots.save_users([User(event['userId'], email)])
+
+
+def _permission_changed(event):
+    user_id, workspace_id = event['userId'], event['workspaceId']
+    access_level = event.get('accessLevel')
+    if access_level is None:
+        iam_cache.invalidate_permission(user_id, workspace_id)
+        snapshots.delete_permission(user_id, workspace_id)
+        return
+    permission = WorkspacePermission[access_level]
+    iam_cache.set_permission(user_id, workspace_id, permission)
+    snapshots.save_permission(user_id, workspace_id, permission)
+
+
+def _user_deleted(event):
+    iam_cache.invalidate_deleted_user(event['userId'])
+    snapshots.delete_user(event['userId'])
+
+
+_HANDLERS = {
+    USER_CHANGED: _user_changed,
+    PERMISSION_CHANGED: _permission_changed,
+    USER_DELETED: _user_deleted,
+}
+
+
+def apply(events):
+    """
+    Apply validated ``events`` in order
+    """
+    for event in events:
+        logger.info(f"IAM event {event['type']} (user {event['userId']})")
+        _HANDLERS[event['type']](event)
@@ -1,7 +1,13 @@
+from django.conf import settings
+
 import logging
 logger = logging.getLogger(__name__)
 
+from api import context
+from api.caches import iam as iam_cache
 from api.externals.http import Http
+from api.externals.iam import snapshots
+from api.externals.iam.tokens import expires_in, token_hash
 from api.externals.iam.abstract import AbstractExternalIAM
 from api.models.workspace_permission import WorkspacePermission
 
@@ -13,20 +19,61 @@ class ExternalWorkspacePermission(AbstractExternalIAM):
 
     @staticmethod
     def get(token, workspace_id):
+        # Already fetched during this request
+        entities = context.get().entities
+        key = (token, int(workspace_id))
+        if entities.has('permission', key):
+            return entities.get('permission', key)
+
+        # Known by every worker, kept up to date by IAM events
+        user = context.get().user
+        if user is not None:
+            permission = iam_cache.get_permission(user.id, key[1], token_hash(token))
+            if permission is not None:
+                entities.set('permission', key, permission)
+                return permission
+
+        if snapshots.is_unavailable():
+            return ExternalWorkspacePermission.__get_stale(user, key)
+
         logger.info("Fetching workspace user permissions")
         try:
             response = Http.get(
                 ExternalWorkspacePermission.__get_permission_url(workspace_id),
-                token=token
+                token=token,
+                service='iam-permission',
+                hedge=True
             )
         except Exception as e:
-            logger.warning("Unable to fetch workspace user permissions")
-            return None
+            logger.warning(f"Unable to fetch workspace user permissions: {e}")
+            if not snapshots.is_outage(e):
+                return None
+            snapshots.mark_unavailable()
+            return ExternalWorkspacePermission.__get_stale(user, key)
 
         if response.status_code == 200:
-            return WorkspacePermission(response.json()['accessLevel'])
+            permission = WorkspacePermission(response.json()['accessLevel'])
+            entities.set('permission', key, permission)
+            if user is not None:
+                iam_cache.add_token(token_hash(token), user.id, expires_in(token))
+                iam_cache.add_permission(user.id, key[1], permission)
+                snapshots.save_permission(user.id, key[1], permission, token_hash(token))
+            return permission
         return None
 
+    @staticmethod
+    def __get_stale(user, key):
+        """
+        Last known permission of the authenticated user, answered for the same token
+        """
+        if not settings.IAM_SNAPSHOTS or user is None:
+            return None
+        logger.warning(f"IAM unavailable, serving last known permission on workspace {key[1]}")
+        permission = snapshots.stale_permission(user.id, key[1], token_hash(key[0]))
+        context.get().stale.add('iam-permission')
+        context.get().entities.set('permission', key, permission)
+        return permission
+
     @staticmethod
     def set(token, workspace_id, permission):
         logger.info("Setting workspace user permissions")
@@ -36,7 +83,8 @@ class ExternalWorkspacePermission(AbstractExternalIAM):
             response = Http.post(
                 ExternalWorkspacePermission.__get_permission_url(workspace_id),
                 token=token,
-                body=body
+                body=body,
+                service='iam-permission'
             )
         except Exception as e:
             logger.error("Unable to set user workspace permissions", e)
@@ -44,5 +92,9 @@ class ExternalWorkspacePermission(AbstractExternalIAM):
 
         if response.status_code == 201:
             logger.info("User workspace permissions successfully set")
+            context.get().entities.set('permission', (token, int(workspace_id)), permission)
+            user = context.get().user
+            if user is not None:
+                iam_cache.set_permission(user.id, int(workspace_id), permission)
             return True
         return False
@@ -0,0 +1,221 @@
+"""
+Last known good IAM data.
+
+Users and permissions answered by IAM are kept in the database. While IAM is
+unavailable, they are served from there instead, the response being marked
+stale (X-Stale-Data header), and IAM is left alone for IAM_STALE_RETRY_SECONDS
+so requests don't wait for it. A background thread meanwhile retries the users
+served stale and refreshes them once IAM answers again. Permissions are
+refreshed by the next request of their user, the only one holding a token.
+"""
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+from api import context
+from api.externals.errors import DeadlineExceededException, ExternalUnreachableException
+from api.models import IamUserSnapshot, IamPermissionSnapshot, User, WorkspacePermission
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def _user_key(user_id):
+    return f"iam-snapshot:user:{user_id}"
+
+
+def _permission_key(user_id, workspace_id):
+    return f"iam-snapshot:permission:{user_id}:{workspace_id}"
+
+
+def _unchanged(keys_values):
+    """
+    Keys whose value was written less than IAM_SNAPSHOT_WRITE_INTERVAL ago
+    """
+    cached = cache.get_many(keys_values.keys())
+    return { key for key, value in keys_values.items() if cached.get(key) == value }
+
+
+def save_users(users):
+    """
+    Upsert snapshots of ``users``, unchanged ones are only rewritten every
+    IAM_SNAPSHOT_WRITE_INTERVAL
+    """
+    if not settings.IAM_SNAPSHOTS:
+        return
+    keys_values = { _user_key(user.id): user.email for user in users }
+    unchanged = _unchanged(keys_values)
+    users = [user for user in users if _user_key(user.id) not in unchanged]
+    if not users:
+        return
+
+    fetched_at = timezone.now()
+    params = []
+    for user in users:
+        params.extend([user.id, user.email, fetched_at])
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {IamUserSnapshot._meta.db_table} (id, email, fetched_at)
+                VALUES {', '.join(['(%s, %s, %s)'] * len(users))}
+                ON CONFLICT (id) DO UPDATE
+                SET email = EXCLUDED.email, fetched_at = EXCLUDED.fetched_at
+                """,
+                params
+            )
+    except DatabaseError as e:
+        logger.error(f"Unable to save IAM users snapshot ({e})")
+        return
+    cache.set_many(
+        { _user_key(user.id): user.email for user in users },
+        settings.IAM_SNAPSHOT_WRITE_INTERVAL
+    )
+
+
+def save_permission(user_id, workspace_id, permission, token_hash=None):
+    """
+    Upsert the snapshot of a permission, ``token_hash`` of the token IAM answered
+    for. Without it (IAM events), the token of the previous snapshot is kept.
+    """
+    if not settings.IAM_SNAPSHOTS:
+        return
+    key = _permission_key(user_id, workspace_id)
+    value = f"{permission.name}:{token_hash}"
+    if cache.get(key) == value:
+        return
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {IamPermissionSnapshot._meta.db_table} (user_id, workspace_id, access_level, token_hash, fetched_at)
+                VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT (user_id, workspace_id) DO UPDATE
+                SET access_level = EXCLUDED.access_level,
+                    token_hash = COALESCE(EXCLUDED.token_hash, {IamPermissionSnapshot._meta.db_table}.token_hash),
+                    fetched_at = EXCLUDED.fetched_at
+                """,
+                [user_id, workspace_id, permission.name, token_hash, timezone.now()]
+            )
+    except DatabaseError as e:
+        logger.error(f"Unable to save IAM permission snapshot ({e})")
+        return
+    cache.set(key, value, settings.IAM_SNAPSHOT_WRITE_INTERVAL)
+
+
+def delete_user(user_id):
+    """
+    Drop the snapshots of a user deleted from IAM, permissions included
+    """
+    IamUserSnapshot.objects.filter(id=user_id).delete()
+    IamPermissionSnapshot.objects.filter(user_id=user_id).delete()
+    cache.delete(_user_key(user_id))
+
+
+def delete_permission(user_id, workspace_id):
+    IamPermissionSnapshot.objects.filter(user_id=user_id, workspace_id=workspace_id).delete()
+    cache.delete(_permission_key(user_id, workspace_id))
+
+
+def stale_users(ids):
+    """
+    Last known users of ``ids``
+    """
+    return [
+        User(snapshot.id, snapshot.email)
+        for snapshot in IamUserSnapshot.objects.filter(id__in=ids)
+    ]
+
+
+def stale_permission(user_id, workspace_id, token_hash):
+    """
+    Last known permission of the user on the workspace, None if unknown or
+    answered for another token
+    """
+    snapshot = IamPermissionSnapshot.objects.filter(
+        user_id=user_id,
+        workspace_id=workspace_id,
+        token_hash=token_hash
+    ).first()
+    return WorkspacePermission[snapshot.access_level] if snapshot is not None else None
+
+
+# Per worker, time.monotonic() until which IAM is not called
+_unavailable_until = 0
+_pending_user_ids = set()
+_refresher_pid = None
+_lock = threading.Lock()
+
+
+def is_outage(error):
+    """
+    Whether the call failed because of IAM: unreachable, timed out at HTTP_TIMEOUT
+    or answering 5xx. Calls cut short by the request deadline don't count.
+    """
+    if isinstance(error, DeadlineExceededException):
+        return False
+    if isinstance(error, ExternalUnreachableException):
+        return True
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code >= 500
+
+
+def is_unavailable():
+    return time.monotonic() < _unavailable_until
+
+
+def mark_unavailable():
+    global _unavailable_until
+    _unavailable_until = time.monotonic() + settings.IAM_STALE_RETRY_SECONDS
+
+
+def mark_available():
+    global _unavailable_until
+    _unavailable_until = 0
+
+
+def refresh_in_background(user_ids, fetch):
+    """
+    Refresh the snapshots of ``user_ids`` with ``fetch(ids)`` once IAM answers again
+    """
+    global _refresher_pid
+    with _lock:
+        _pending_user_ids.update(user_ids)
+        # Threads don't survive fork, each worker runs its own
+        if _refresher_pid == os.getpid():
+            return
+        _refresher_pid = os.getpid()
+    threading.Thread(target=_refresh, args=(fetch,), name='iam-snapshot-refresh', daemon=True).start()
+
+
+def _refresh(fetch):
+    global _refresher_pid
+    while True:
+        time.sleep(settings.IAM_STALE_RETRY_SECONDS)
+        with _lock:
+            user_ids = sorted(_pending_user_ids)
+
+        context.begin()
+        try:
+            save_users(fetch(user_ids))
+        except Exception as e:
+            logger.warning(f"IAM still unavailable ({e})")
+            mark_unavailable()
+            continue
+        finally:
+            context.end()
+            connection.close()
+
+        logger.info(f"IAM available again, {len(user_ids)} users snapshots refreshed")
+        mark_available()
+        with _lock:
+            _pending_user_ids.difference_update(user_ids)
+            if not _pending_user_ids:
+                _refresher_pid = None
+                return
@@ -0,0 +1,157 @@
+import json
+import time
+from unittest import mock
+import jwt
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from api import context
+from api.caches import iam as iam_cache
+from api.externals.http import Http
+from api.externals.iam import events, snapshots
+from api.externals.iam.permission import ExternalWorkspacePermission
+from api.externals.iam.tokens import expires_in, token_hash
+from api.externals.iam.users import ExternalUsers
+from api.models import User, WorkspacePermission
+
+
+@mock.patch.object(snapshots, 'save_users')
+@mock.patch.object(snapshots, 'save_permission')
+@mock.patch.object(snapshots, 'delete_user')
+@mock.patch.object(snapshots, 'delete_permission')
+class TestIamEvents(SimpleTestCase):
+    def setUp(self):
+        context.begin().user = User(1, 'user@test.com')
+        cache.clear()
+
+    def tearDown(self):
+        context.end()
+
+    def test_user_changed(self, delete_permission, delete_user, save_permission, save_users):
+        iam_cache.add_users([User(1, 'old@test.com')])
+
+        events.apply([{ 'type': 'user-changed', 'userId': 1, 'email': 'new@test.com' }])
+
+        self.assertEqual(iam_cache.get_users([1])[1].email, 'new@test.com')
+        self.assertEqual(save_users.call_args[0][0][0].email, 'new@test.com')
+
+    def test_fill_fetched_before_event_is_dropped(self, delete_permission, delete_user, save_permission, save_users):
+        events.apply([{ 'type': 'user-changed', 'userId': 1 }])
+        iam_cache.add_users([User(1, 'old@test.com')])
+        self.assertEqual(iam_cache.get_users([1]), {})
+
+        events.apply([{ 'type': 'user-changed', 'userId': 1, 'email': 'new@test.com' }])
+        iam_cache.add_users([User(1, 'old@test.com')])
+        self.assertEqual(iam_cache.get_users([1])[1].email, 'new@test.com')
+
+    def test_permission_changed(self, delete_permission, delete_user, save_permission, save_users):
+        iam_cache.add_permission(1, 3, WorkspacePermission.CREATOR)
+
+        events.apply([{ 'type': 'permission-changed', 'userId': 1, 'workspaceId': 3, 'accessLevel': 'NONE' }])
+
+        self.assertEqual(iam_cache.get_permission(1, 3), WorkspacePermission.NONE)
+        save_permission.assert_called_once_with(1, 3, WorkspacePermission.NONE)
+
+    def test_permission_invalidated(self, delete_permission, delete_user, save_permission, save_users):
+        iam_cache.add_permission(1, 3, WorkspacePermission.CREATOR)
+        iam_cache.add_permission(1, 4, WorkspacePermission.USER)
+
+        events.apply([{ 'type': 'permission-changed', 'userId': 1, 'workspaceId': 3 }])
+
+        self.assertIsNone(iam_cache.get_permission(1, 3))
+        self.assertEqual(iam_cache.get_permission(1, 4), WorkspacePermission.USER)
+        delete_permission.assert_called_once_with(1, 3)
+
+    def test_user_deleted(self, delete_permission, delete_user, save_permission, save_users):
+        iam_cache.add_users([User(1, 'user@test.com'), User(2, 'other@test.com')])
+        iam_cache.add_permission(1, 3, WorkspacePermission.CREATOR)
+        iam_cache.add_permission(2, 3, WorkspacePermission.USER)
+
+        events.apply([{ 'type': 'user-deleted', 'userId': 1 }])
+
+        self.assertEqual(list(iam_cache.get_users([1, 2]).keys()), [2])
+        self.assertIsNone(iam_cache.get_permission(1, 3))
+        self.assertEqual(iam_cache.get_permission(2, 3), WorkspacePermission.USER)
+        delete_user.assert_called_once_with(1)
+
+    def test_cached_permission_skips_iam(self, delete_permission, delete_user, save_permission, save_users):
+        iam_cache.add_token(token_hash('Bearer token'), 1)
+        events.apply([{ 'type': 'permission-changed', 'userId': 1, 'workspaceId': 3, 'accessLevel': 'USER' }])
+
+        with mock.patch.object(Http, '_Http__session') as session:
+            permission = ExternalWorkspacePermission.get('Bearer token', '3')
+
+        self.assertEqual(permission, WorkspacePermission.USER)
+        session.get.assert_not_called()
+
+    def test_forged_token_checked_by_iam(self, delete_permission, delete_user, save_permission, save_users):
+        # The victim's token was answered for, the forged one carries the same userId
+        iam_cache.add_token(token_hash('Bearer victim'), 1)
+        iam_cache.add_permission(1, 3, WorkspacePermission.CREATOR)
+
+        with mock.patch.object(Http, '_Http__session') as session:
+            session.get.return_value = mock.Mock(status_code=403)
+            session.get.return_value.raise_for_status.side_effect = requests.exceptions.HTTPError(
+                response=session.get.return_value
+            )
+            permission = ExternalWorkspacePermission.get('Bearer forged', '3')
+
+        self.assertIsNone(permission)
+        session.get.assert_called_once()
+        self.assertEqual(session.get.call_args[1]['headers']['Authorization'], 'Bearer forged')
+
+    def test_token_remembered_once_iam_answered(self, delete_permission, delete_user, save_permission, save_users):
+        with mock.patch.object(Http, '_Http__session') as session:
+            session.get.return_value = mock.Mock(status_code=200)
+            session.get.return_value.json.return_value = { 'accessLevel': 'USER' }
+            ExternalWorkspacePermission.get('Bearer token', '3')
+        # Next request
+        context.end()
+        context.begin().user = User(1, 'user@test.com')
+
+        with mock.patch.object(Http, '_Http__session') as session:
+            permission = ExternalWorkspacePermission.get('Bearer token', '3')
+
+        self.assertEqual(permission, WorkspacePermission.USER)
+        session.get.assert_not_called()
+
+    def test_only_missing_users_fetched(self, delete_permission, delete_user, save_permission, save_users):
+        iam_cache.add_users([User(1, 'user@test.com')])
+
+        with mock.patch.object(Http, '_Http__session') as session:
+            session.post.return_value = mock.Mock(status_code=200)
+            session.post.return_value.json.return_value = [{ 'id': 2, 'email': 'other@test.com' }]
+            users = ExternalUsers.get_by_ids([1, 2])
+
+        self.assertEqual(sorted(user.email for user in users), ['other@test.com', 'user@test.com'])
+        self.assertEqual(json.loads(session.post.call_args[1]['data']), { 'userIds': [2] })
+
+
+@override_settings(IAM_USERS_CACHE_TTL=3600, IAM_PERMISSIONS_CACHE_TTL=3600, IAM_LOCAL_CACHE_MAX_TTL=60)
+class TestIamCacheTtl(SimpleTestCase):
+    def test_capped_with_local_cache(self):
+        self.assertEqual(iam_cache.users_ttl(), 60)
+        self.assertEqual(iam_cache.permissions_ttl(), 60)
+
+    @override_settings(CACHES={ 'default': { 'BACKEND': 'django.core.cache.backends.dummy.DummyCache' } })
+    def test_kept_with_shared_cache(self):
+        self.assertEqual(iam_cache.users_ttl(), 3600)
+        self.assertEqual(iam_cache.permissions_ttl(), 3600)
+
+
+class TestTokens(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_expires_in(self):
+        raw_jwt = jwt.encode({ 'userId': 1, 'exp': int(time.time()) + 30 }, 'secret', algorithm='HS256').decode()
+
+        self.assertAlmostEqual(expires_in(f'Bearer {raw_jwt}'), 30, delta=2)
+        self.assertIsNone(expires_in('Bearer token'))
+
+    def test_expired_token_not_remembered(self):
+        iam_cache.add_permission(1, 3, WorkspacePermission.USER)
+        iam_cache.add_token(token_hash('Bearer token'), 1, expires_in=-1)
+
+        self.assertIsNone(iam_cache.get_permission(1, 3, token_hash('Bearer token')))
@@ -0,0 +1,215 @@
+import time
+from unittest import mock
+import requests
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, RequestFactory, override_settings
+from django.utils import timezone
+
+from api import context
+from api.externals.errors import ExternalUnreachableException
+from api.externals.http import Http
+from api.externals.iam import snapshots
+from api.externals.iam.permission import ExternalWorkspacePermission
+from api.externals.iam.tokens import token_hash
+from api.externals.iam.users import ExternalUsers
+from api.middlewares.context import RequestContextMiddleware
+from api.models import IamPermissionSnapshot, User, WorkspacePermission
+
+
+@mock.patch.object(snapshots, 'save_users')
+@mock.patch.object(snapshots, 'refresh_in_background')
+@mock.patch.object(snapshots, 'stale_users', return_value=[User(1, 'user@test.com')])
+class TestStaleUsers(SimpleTestCase):
+    def setUp(self):
+        context.begin()
+        snapshots.mark_available()
+        cache.clear()
+
+    def tearDown(self):
+        context.end()
+        snapshots.mark_available()
+
+    def test_users_served_from_snapshot_when_iam_unreachable(self, stale_users, refresh, save_users):
+        with mock.patch.object(Http, '_Http__session') as session:
+            session.post.side_effect = requests.exceptions.ConnectionError()
+            users = ExternalUsers.get_by_ids([1])
+
+        self.assertEqual(users[0].email, 'user@test.com')
+        stale_users.assert_called_once_with([1])
+        self.assertEqual(refresh.call_args[0][0], [1])
+        self.assertTrue(snapshots.is_unavailable())
+        self.assertEqual(context.get().stale, {'iam-users'})
+        save_users.assert_not_called()
+
+    def test_iam_not_called_while_unavailable(self, stale_users, refresh, save_users):
+        snapshots.mark_unavailable()
+
+        with mock.patch.object(Http, '_Http__session') as session:
+            ExternalUsers.get_by_ids([1])
+
+        session.post.assert_not_called()
+        stale_users.assert_called_once_with([1])
+
+    def test_server_error_served_from_snapshot(self, stale_users, refresh, save_users):
+        with mock.patch.object(Http, '_Http__session') as session:
+            session.post.return_value = mock.Mock(status_code=503)
+            ExternalUsers.get_by_ids([1])
+
+        stale_users.assert_called_once_with([1])
+
+    def test_not_found_not_an_outage(self, stale_users, refresh, save_users):
+        with mock.patch.object(Http, '_Http__session') as session:
+            session.post.return_value = mock.Mock(status_code=404)
+            session.post.return_value.raise_for_status.side_effect = requests.exceptions.HTTPError(
+                response=session.post.return_value
+            )
+            self.assertEqual(ExternalUsers.get_by_ids([1]), [])
+
+        self.assertFalse(snapshots.is_unavailable())
+        stale_users.assert_not_called()
+
+    def test_budget_timeout_not_an_outage(self, stale_users, refresh, save_users):
+        context.get().deadline = time.monotonic() + 0.2
+
+        with mock.patch.object(Http, '_Http__session') as session:
+            session.post.side_effect = requests.exceptions.Timeout()
+            self.assertEqual(ExternalUsers.get_by_ids([1]), [])
+
+        self.assertFalse(snapshots.is_unavailable())
+        stale_users.assert_not_called()
+
+    def test_short_budget_not_an_outage(self, stale_users, refresh, save_users):
+        context.get().deadline = time.monotonic() + 0.005
+
+        with mock.patch.object(Http, '_Http__session') as session:
+            self.assertEqual(ExternalUsers.get_by_ids([1]), [])
+
+        session.post.assert_not_called()
+        self.assertFalse(snapshots.is_unavailable())
+        stale_users.assert_not_called()
+
+    def test_fetched_users_saved(self, stale_users, refresh, save_users):
+        with mock.patch.object(Http, '_Http__session') as session:
+            session.post.return_value = mock.Mock(status_code=200)
+            session.post.return_value.json.return_value = [{ 'id': 2, 'email': 'other@test.com' }]
+            users = ExternalUsers.get_by_ids([2])
+
+        self.assertEqual(save_users.call_args[0][0], users)
+        stale_users.assert_not_called()
+
+    @override_settings(IAM_SNAPSHOTS=False)
+    def test_disabled(self, stale_users, refresh, save_users):
+        with mock.patch.object(Http, '_Http__session') as session:
+            session.post.side_effect = requests.exceptions.ConnectionError()
+            self.assertEqual(ExternalUsers.get_by_ids([1]), [])
+
+        stale_users.assert_not_called()
+
+
+@mock.patch.object(snapshots, 'save_permission')
+@mock.patch.object(snapshots, 'stale_permission', return_value=WorkspacePermission.USER)
+class TestStalePermission(SimpleTestCase):
+    def setUp(self):
+        context.begin().user = User(1, 'user@test.com')
+        snapshots.mark_available()
+        cache.clear()
+
+    def tearDown(self):
+        context.end()
+        snapshots.mark_available()
+
+    def test_permission_served_from_snapshot(self, stale_permission, save_permission):
+        with mock.patch.object(Http, '_Http__session') as session:
+            session.get.side_effect = requests.exceptions.Timeout()
+            permission = ExternalWorkspacePermission.get('Bearer token', '3')
+
+        self.assertEqual(permission, WorkspacePermission.USER)
+        stale_permission.assert_called_once_with(1, 3, token_hash('Bearer token'))
+        self.assertEqual(context.get().stale, {'iam-permission'})
+
+    def test_budget_timeout_not_an_outage(self, stale_permission, save_permission):
+        context.get().deadline = time.monotonic() + 0.2
+
+        with mock.patch.object(Http, '_Http__session') as session:
+            session.get.side_effect = requests.exceptions.Timeout()
+            self.assertIsNone(ExternalWorkspacePermission.get('Bearer token', '3'))
+
+        self.assertFalse(snapshots.is_unavailable())
+        stale_permission.assert_not_called()
+
+    def test_fetched_permission_saved(self, stale_permission, save_permission):
+        with mock.patch.object(Http, '_Http__session') as session:
+            session.get.return_value = mock.Mock(status_code=200)
+            session.get.return_value.json.return_value = { 'accessLevel': 'CREATOR' }
+            ExternalWorkspacePermission.get('Bearer token', '3')
+
+        save_permission.assert_called_once_with(1, 3, WorkspacePermission.CREATOR, token_hash('Bearer token'))
+        stale_permission.assert_not_called()
+
+
+class TestStalePermissionToken(TestCase):
+    def setUp(self):
+        context.begin().user = User(1, 'user@test.com')
+        snapshots.mark_unavailable()
+        IamPermissionSnapshot.objects.create(
+            user_id=1,
+            workspace_id=3,
+            access_level=WorkspacePermission.CREATOR.name,
+            token_hash=token_hash('Bearer victim'),
+            fetched_at=timezone.now()
+        )
+
+    def tearDown(self):
+        context.end()
+        snapshots.mark_available()
+
+    def test_served_to_the_token_iam_answered_for(self):
+        self.assertEqual(ExternalWorkspacePermission.get('Bearer victim', '3'), WorkspacePermission.CREATOR)
+
+    def test_not_served_to_another_token_of_the_user(self):
+        # Same userId in the JWT, the signature isn't checked
+        self.assertIsNone(ExternalWorkspacePermission.get('Bearer forged', '3'))
+
+    def test_event_keeps_token(self):
+        snapshots.save_permission(1, 3, WorkspacePermission.USER)
+
+        self.assertEqual(ExternalWorkspacePermission.get('Bearer victim', '3'), WorkspacePermission.USER)
+
+
+class TestRefresh(SimpleTestCase):
+    def tearDown(self):
+        snapshots.mark_available()
+        snapshots._pending_user_ids.clear()
+        snapshots._refresher_pid = None
+
+    @override_settings(IAM_STALE_RETRY_SECONDS=0)
+    def test_refreshed_once_iam_answers(self):
+        users = [User(1, 'user@test.com')]
+        fetch = mock.Mock(side_effect=[ExternalUnreachableException(), users])
+        snapshots._pending_user_ids.update([1])
+        snapshots.mark_unavailable()
+
+        with mock.patch.object(snapshots, 'save_users') as save_users:
+            snapshots._refresh(fetch)
+
+        save_users.assert_called_once_with(users)
+        self.assertEqual(fetch.call_count, 2)
+        self.assertFalse(snapshots.is_unavailable())
+        self.assertEqual(snapshots._pending_user_ids, set())
+
+
+class TestStaleDataHeader(SimpleTestCase):
+    def test_header(self):
+        def view(request):
+            context.get().stale.update(['iam-users', 'iam-permission'])
+            return HttpResponse()
+
+        response = RequestContextMiddleware(view)(RequestFactory().get('/workspace/'))
+
+        self.assertEqual(response['X-Stale-Data'], 'iam-permission, iam-users')
+
+    def test_no_header_when_fresh(self):
+        response = RequestContextMiddleware(lambda request: HttpResponse())(RequestFactory().get('/workspace/'))
+
+        self.assertFalse(response.has_header('X-Stale-Data'))
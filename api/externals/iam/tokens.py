@@ -0,0 +1,27 @@
+"""
+Authorization tokens as stored next to IAM answers.
+
+The user id of a request is read from its JWT without checking the signature:
+what IAM answered for a token is only served again to the same token, never to
+another one carrying the same user id.
+"""
+import hashlib
+import time
+
+import jwt
+
+
+def token_hash(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def expires_in(token):
+    """
+    Seconds before the token expires, None without expiration
+    """
+    try:
+        _, raw_jwt = token.split()
+        expiration = jwt.decode(raw_jwt, algorithms=['HS256'], verify=False).get('exp')
+    except Exception:
+        return None
+    return expiration - time.time() if expiration is not None else None
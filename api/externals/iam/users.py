@@ -1,7 +1,15 @@
+import copy
+
+from django.conf import settings
+
 import logging
 logger  = logging.getLogger(__name__)
 
+from api import context
+from api.caches import iam as iam_cache
+from api.externals.errors import ExternalUnreachableException
 from api.externals.http import Http
+from api.externals.iam import snapshots
 from api.externals.iam.abstract import AbstractExternalIAM
 from api.models.user import User
 
@@ -19,7 +27,9 @@ class ExternalUsers(AbstractExternalIAM):
         try:
             response = Http.get(
                 url,
-                token=token
+                token=token,
+                service='iam-users',
+                hedge=True
             )
         except Exception as e:
             logger.warning(f"Unable to fetch user by email ({email})")
@@ -27,30 +37,65 @@ class ExternalUsers(AbstractExternalIAM):
 
         if response.status_code == 200:
             logger.info(f"User successfully fetched by email ({email})")
-            return User(
+            user = User(
                 int(response.json()['id']),
                 response.json()['email']
             )
+            context.get().entities.set('user', user.id, user)
+            iam_cache.add_users([user])
+            return user
         return None
 
     @staticmethod
     def get_by_ids(ids):
+        """
+        Users of ``ids``, from the IAM cache when known,
+        the last known ones while IAM is unavailable
+        """
         logger.info(f"Fetching user by ids ({ids})")
         if ids == None or len(ids) == 0:
             logger.info("No ids to fetch")
             return []
 
-        url = ExternalUsers.__get_users_url() + f'/search'
-        body = { 'userIds': ids }
+        cached = iam_cache.get_users(ids)
+        users = list(cached.values())
+        missing_ids = [user_id for user_id in ids if user_id not in cached]
+        if not missing_ids:
+            return users
+
+        if snapshots.is_unavailable():
+            return users + ExternalUsers.__get_stale_by_ids(missing_ids)
+
         try:
-            response = Http.post(
-                url,
-                body=body
-            )
+            fetched = ExternalUsers.fetch_by_ids(missing_ids)
         except Exception as e:
-            logger.warning(f"Unable to fetch user by ids ({ids})", e)
-            return []
+            logger.warning(f"Unable to fetch user by ids ({missing_ids}): {e}")
+            if not snapshots.is_outage(e):
+                return users
+            snapshots.mark_unavailable()
+            return users + ExternalUsers.__get_stale_by_ids(missing_ids)
+
+        iam_cache.add_users(fetched)
+        snapshots.save_users(fetched)
+        return users + fetched
 
+    @staticmethod
+    def fetch_by_ids(ids):
+        """
+        Users of ``ids`` as answered by IAM,
+        raise ExternalUnreachableException when IAM is unavailable
+        """
+        url = ExternalUsers.__get_users_url() + f'/search'
+        body = { 'userIds': ids }
+        response = Http.post(
+            url,
+            body=body,
+            service='iam-users',
+            hedge=True
+        )
+
+        if response.status_code >= 500:
+            raise ExternalUnreachableException(f"IAM answered {response.status_code}")
         if response.status_code == 200:
             response_content = response.json()
             return [
@@ -58,20 +103,50 @@ class ExternalUsers(AbstractExternalIAM):
             ]
         return []
 
+    @staticmethod
+    def __get_stale_by_ids(ids):
+        if not settings.IAM_SNAPSHOTS:
+            return []
+        logger.warning(f"IAM unavailable, serving last known users ({ids})")
+        snapshots.refresh_in_background(ids, ExternalUsers.fetch_by_ids)
+        context.get().stale.add('iam-users')
+        return snapshots.stale_users(ids)
+
+    @staticmethod
+    def get_map_by_ids(ids):
+        """
+        Fetch users by ids, indexed by id.
+        Users already fetched during this request are not fetched again.
+        """
+        entities = context.get().entities
+        users = entities.get_many('user', ids)
+        missing_ids = [user_id for user_id in ids if user_id not in users]
+        if missing_ids:
+            fetched = { user.id: user for user in ExternalUsers.get_by_ids(missing_ids) }
+            entities.set_many('user', fetched)
+            users.update(fetched)
+        return users
+
     @staticmethod
     def fill_workspaces_users(workspaces):
-        userIds = []
+        """
+        Copies of the workspaces with users filled, workspaces themselves are
+        left untouched as they may be shared through the request identity map
+        """
+        userIds = set()
         for workspace in workspaces:
-            userIds = list(set(userIds + workspace.users))
+            userIds.update(workspace.users)
 
-        users = ExternalUsers.get_by_ids(userIds)
+        users = ExternalUsers.get_map_by_ids(list(userIds))
+        filled_workspaces = []
         for workspace in workspaces:
-            for i, userId in enumerate(workspace.users):
-                user = [ user for user in users if user.id == userId ]
-                if user:
-                    workspace.users[i] = user[0]
+            filled_workspace = copy.copy(workspace)
+            filled_workspace.users = [
+                users.get(userId, userId) for userId in workspace.users
+            ]
+            filled_workspaces.append(filled_workspace)
 
-        return workspaces
+        return filled_workspaces
 
     @staticmethod
     def fill_workspace_users(workspace):
@@ -21,7 +21,9 @@ class ExternalNotify(AbstractExternalNotifier):
         try:
             response = Http.post(
                 ExternalNotify.__get_notifier_url(),
-                body=body
+                body=body,
+                service='notifier',
+                essential=False
             )
         except Exception as e:
             logger.error(f"Unable to send notification ({body}), ({e})")
@@ -2,9 +2,6 @@ import os
 import logging
 logger = logging.getLogger(__name__)
 
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-
 
 class ExternalMail():
 
@@ -22,6 +19,10 @@ class ExternalMail():
             logger.warning("SENDGRID_API_KEY not defined")
             return False
 
+        # Imported on first mail, only invitations need it
+        from sendgrid import SendGridAPIClient
+        from sendgrid.helpers.mail import Mail
+
         message = Mail(
             from_email='contact@worko.tech',
             to_emails=to,
@@ -0,0 +1,135 @@
+import threading
+import time
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+
+from api import context
+from api.externals import hedging
+from api.externals.http import Http
+
+
+class TestLatencyTracker(SimpleTestCase):
+    def test_percentile(self):
+        tracker = hedging.LatencyTracker(window=100)
+        for latency in range(1, 101):
+            tracker.record(latency / 1000)
+
+        self.assertEqual(tracker.percentile(95, 20), 0.096)
+
+    def test_not_enough_samples(self):
+        tracker = hedging.LatencyTracker(window=100)
+        tracker.record(0.01)
+
+        self.assertIsNone(tracker.percentile(95, 20))
+
+
+class TestHedgeBudget(SimpleTestCase):
+    def test_hedges_capped_to_ratio(self):
+        budget = hedging.HedgeBudget(0.25)
+        hedges = 0
+        for _ in range(100):
+            budget.earn()
+            hedges += budget.spend()
+
+        self.assertEqual(hedges, 25)
+
+
+@override_settings(HTTP_HEDGE_PERCENTILE=50, HTTP_HEDGE_MIN_SAMPLES=1, HTTP_HEDGE_BUDGET=1)
+class TestHedged(SimpleTestCase):
+    def setUp(self):
+        hedging._services.clear()
+        tracker, _ = hedging.get_service('iam')
+        tracker.record(0.01)
+
+    def tearDown(self):
+        hedging._services.clear()
+
+    def test_fast_call_not_hedged(self):
+        call = mock.Mock(return_value='response')
+
+        self.assertEqual(hedging.hedged(call, 'iam'), 'response')
+        call.assert_called_once()
+
+    def test_slow_call_hedged(self):
+        calls = []
+
+        def call():
+            calls.append(1)
+            # First call is stuck, the hedge answers
+            if len(calls) == 1:
+                time.sleep(1)
+                return 'slow'
+            return 'fast'
+
+        start = time.perf_counter()
+        self.assertEqual(hedging.hedged(call, 'iam'), 'fast')
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(len(calls), 2)
+
+    def test_failed_hedge_waits_for_first_call(self):
+        calls = []
+
+        def call():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.1)
+                return 'slow'
+            raise Exception('IAM failed')
+
+        self.assertEqual(hedging.hedged(call, 'iam'), 'slow')
+
+    @override_settings(HTTP_HEDGE_BUDGET=0)
+    def test_no_hedge_without_budget(self):
+        hedging._services.clear()
+        tracker, _ = hedging.get_service('iam')
+        tracker.record(0.01)
+        call = mock.Mock(side_effect=lambda: time.sleep(0.05) or 'slow')
+
+        self.assertEqual(hedging.hedged(call, 'iam'), 'slow')
+        call.assert_called_once()
+
+    @override_settings(HTTP_HEDGE_WORKERS=1)
+    def test_busy_pool_runs_call_in_request_thread(self):
+        hedging._executor_pid = None
+        _, slots = hedging.get_executor()
+        slots.acquire()
+        threads = []
+        call = mock.Mock(side_effect=lambda: threads.append(threading.current_thread()) or 'response')
+
+        try:
+            self.assertEqual(hedging.hedged(call, 'iam'), 'response')
+        finally:
+            slots.release()
+            hedging._executor_pid = None
+
+        self.assertEqual(threads, [threading.current_thread()])
+
+
+@override_settings(HTTP_HEDGING=True, HTTP_HEDGE_PERCENTILE=50, HTTP_HEDGE_MIN_SAMPLES=1, HTTP_HEDGE_BUDGET=1)
+class TestHttpHedging(SimpleTestCase):
+    def setUp(self):
+        hedging._services.clear()
+        context.begin()
+
+    def tearDown(self):
+        hedging._services.clear()
+        context.end()
+
+    def test_hedged_read(self):
+        hedging.get_service('iam-permission')[0].record(0.01)
+        first_call = threading.Event()
+
+        def get(url, **kwargs):
+            if not first_call.is_set():
+                first_call.set()
+                time.sleep(1)
+            return mock.Mock(status_code=200, headers=kwargs['headers'])
+
+        with mock.patch.object(Http, '_Http__session') as session:
+            session.get.side_effect = get
+            start = time.perf_counter()
+            response = Http.get('http://iam/permission', token='Bearer token', service='iam-permission', hedge=True)
+
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(session.get.call_count, 2)
+        self.assertEqual(response.headers['Authorization'], 'Bearer token')
@@ -0,0 +1,202 @@
+"""
+Bulk load of workspaces, memberships and invitations.
+
+Rows are streamed to a temporary staging table with Postgres COPY, then
+merged into the live tables with one set-based statement handling
+Workspace.name and Invitation (user_id, workspace) uniqueness.
+No external service is called.
+"""
+import csv
+import io
+import json
+
+from django.db import connection, transaction
+
+from api.caches import membership, invitation_counts
+from api.models import Workspace, Invitation, InvitationStatus
+
+
+IMPORT_FORMATS = ('ndjson', 'csv')
+
+# Staging table columns of each import, with their Postgres type
+IMPORT_COLUMNS = {
+    'workspace': (('name', 'text'), ('users', 'integer[]')),
+    'membership': (('workspace', 'text'), ('user_id', 'integer')),
+    'invitation': (('workspace', 'text'), ('user_id', 'integer'), ('sender', 'text'), ('status', 'text')),
+}
+
+
+class ImportResult():
+    """
+    ``merged`` counts written rows, updated workspaces for memberships
+    """
+    def __init__(self, staged=0, merged=0):
+        self.staged = staged
+        self.merged = merged
+
+
+def read_rows(lines, import_format):
+    """
+    Parse NDJSON or CSV lines into dicts
+    """
+    if import_format == 'csv':
+        yield from csv.DictReader(lines)
+        return
+
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _users_literal(users):
+    if users is None or users == '':
+        return '{}'
+    if isinstance(users, str):
+        users = users.split()
+    return '{' + ','.join(str(int(user_id)) for user_id in users) + '}'
+
+
+def _staging_values(name, row):
+    if name == 'workspace':
+        return [row['name'], _users_literal(row.get('users'))]
+    if name == 'membership':
+        return [row['workspace'], row['user_id']]
+    return [row['workspace'], row['user_id'], row['sender'], row.get('status') or None]
+
+
+class CopyStream():
+    """
+    File-like object feeding COPY with csv lines built from ``rows``,
+    ``on_progress`` is called with the number of rows sent every ``progress_every`` rows
+    """
+    def __init__(self, name, rows, on_progress=None, progress_every=10000):
+        self.name = name
+        self.rows = iter(rows)
+        self.on_progress = on_progress
+        self.progress_every = progress_every
+        self.count = 0
+        self.buffer = b''
+        self.line = io.StringIO()
+        self.writer = csv.writer(self.line)
+
+    def __next_line(self):
+        row = next(self.rows)
+        self.line.seek(0)
+        self.line.truncate()
+        # None is written as an empty unquoted field, read back as NULL by COPY
+        self.writer.writerow(_staging_values(self.name, row))
+        self.count += 1
+        if self.on_progress and self.count % self.progress_every == 0:
+            self.on_progress(self.count)
+        return self.line.getvalue().encode('utf-8')
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            try:
+                self.buffer += self.__next_line()
+            except StopIteration:
+                break
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def _quote(name):
+    return connection.ops.quote_name(name)
+
+
+def _merge_workspaces(cursor, merge_users):
+    table = _quote(Workspace._meta.db_table)
+    conflict = "DO NOTHING"
+    if merge_users:
+        # Soft-deleted workspaces keep their name but are not revived
+        conflict = f"""DO UPDATE SET
+            users = ARRAY(SELECT DISTINCT unnest({table}.users || EXCLUDED.users) ORDER BY 1),
+            updated_at = now()
+            WHERE {table}.deleted_at IS NULL"""
+    # First line of each duplicated name wins
+    cursor.execute(f"""
+        INSERT INTO {table} (name, users, created_at, updated_at)
+        SELECT DISTINCT ON (name) name, users, now(), now()
+        FROM import_workspace
+        ORDER BY name, line
+        ON CONFLICT (name) {conflict}
+        RETURNING id, users
+    """)
+    return cursor.fetchall()
+
+
+def _merge_memberships(cursor):
+    table = _quote(Workspace._meta.db_table)
+    cursor.execute(f"""
+        UPDATE {table} AS w SET
+            users = ARRAY(SELECT DISTINCT unnest(w.users || m.user_ids) ORDER BY 1),
+            updated_at = now()
+        FROM (
+            SELECT workspace, array_agg(user_id) AS user_ids
+            FROM import_membership GROUP BY workspace
+        ) AS m
+        WHERE w.name = m.workspace AND w.deleted_at IS NULL
+        RETURNING w.id, w.users
+    """)
+    return cursor.fetchall()
+
+
+def _merge_invitations(cursor):
+    table = _quote(Invitation._meta.db_table)
+    workspace_table = _quote(Workspace._meta.db_table)
+    cursor.execute(f"""
+        INSERT INTO {table} (workspace_id, user_id, sender, status, created_at, updated_at)
+        SELECT DISTINCT ON (w.id, i.user_id)
+            w.id, i.user_id, i.sender, COALESCE(i.status, %s), now(), now()
+        FROM import_invitation AS i
+        JOIN {workspace_table} AS w ON w.name = i.workspace AND w.deleted_at IS NULL
+        WHERE COALESCE(i.status, %s) = ANY(%s)
+        ORDER BY w.id, i.user_id, i.line
+        ON CONFLICT (user_id, workspace_id) DO NOTHING
+        RETURNING id, user_id
+    """, [
+        InvitationStatus.PENDING.name,
+        InvitationStatus.PENDING.name,
+        [invitation_status.name for invitation_status in InvitationStatus],
+    ])
+    return cursor.fetchall()
+
+
+def bulk_import(name, rows, merge_users=False, on_progress=None, progress_every=10000):
+    """
+    Load ``rows`` of the ``name`` import in a single transaction.
+    Rows conflicting with existing ones (or referencing an unknown workspace)
+    are skipped, with ``merge_users`` conflicting workspaces get the new users
+    unless soft-deleted. The first line of duplicated rows wins.
+    """
+    columns = IMPORT_COLUMNS[name]
+    staging = f"import_{name}"
+    stream = CopyStream(name, rows, on_progress, progress_every)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # line numbers the rows in the order COPY reads them
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {staging} (line bigserial, {', '.join(f'{column} {kind}' for column, kind in columns)}) ON COMMIT DROP"
+        )
+        cursor.copy_expert(
+            f"COPY {staging} ({', '.join(column for column, _ in columns)}) FROM STDIN WITH (FORMAT csv)",
+            stream
+        )
+
+        if name == 'workspace':
+            merged = _merge_workspaces(cursor, merge_users)
+        elif name == 'membership':
+            merged = _merge_memberships(cursor)
+        else:
+            merged = _merge_invitations(cursor)
+
+    # Signals are not sent for set-based statements
+    if name == 'invitation':
+        invitation_counts.invalidate([user_id for _, user_id in merged])
+    else:
+        for workspace_id, users in merged:
+            membership.invalidate(workspace_id, users)
+
+    return ImportResult(staged=stream.count, merged=len(merged))
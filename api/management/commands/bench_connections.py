@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request cost of opening a database connection versus reusing a persistent one"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Number of simulated requests")
+        parser.add_argument('--database', default='default', help="Database alias to benchmark")
+
+    def simulate_request(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+
+    def run(self, conn, count, persistent):
+        conn.close()
+        start = time.perf_counter()
+        for _ in range(count):
+            self.simulate_request(conn)
+            if not persistent:
+                # What Django does at request end when CONN_MAX_AGE = 0
+                conn.close()
+        elapsed = time.perf_counter() - start
+        conn.close()
+        return elapsed / count * 1000
+
+    def handle(self, *args, **options):
+        conn = connections[options['database']]
+        count = options['requests']
+
+        per_request = self.run(conn, count, persistent=False)
+        persistent = self.run(conn, count, persistent=True)
+
+        self.stdout.write(f"requests                      : {count}")
+        self.stdout.write(f"new connection per request    : {per_request:.3f} ms/request")
+        self.stdout.write(f"persistent connection         : {persistent:.3f} ms/request")
+        self.stdout.write(f"connection setup cost         : {per_request - persistent:.3f} ms/request")
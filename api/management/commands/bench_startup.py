@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.startup import measure_startup
+
+
+class Command(BaseCommand):
+    help = "Measure the cold start of a production worker: imports and first response"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters started")
+        parser.add_argument('--top', type=int, default=15, help="Slowest packages listed")
+        parser.add_argument('--environment', default='production')
+
+    def handle(self, *args, **options):
+        measures = [measure_startup(options['environment']) for _ in range(options['runs'])]
+        totals = sorted(measure['bootMs'] + measure['firstResponseMs'] for measure in measures)
+        best = min(measures, key=lambda measure: measure['bootMs'] + measure['firstResponseMs'])
+
+        self.stdout.write(
+            f"boot {best['bootMs']:.0f}ms, first response {best['firstResponseMs']:.0f}ms "
+            f"(best of {len(measures)}, median total {totals[len(totals) // 2]:.0f}ms, "
+            f"budget {settings.STARTUP_BUDGET_MS}ms)"
+        )
+        self.stdout.write("Import time by package:")
+        imports = sorted(best['imports'].items(), key=lambda item: item[1], reverse=True)
+        for name, cumulative in imports[:options['top']]:
+            self.stdout.write(f"  {cumulative / 1000:8.1f}ms  {name}")
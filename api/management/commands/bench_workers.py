@@ -0,0 +1,133 @@
+import os
+import resource
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def rss_mb(pid):
+    """
+    Resident memory of the gunicorn master and its workers
+    """
+    pids = [pid]
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as children:
+            pids.extend(int(child) for child in children.read().split())
+    except OSError:
+        return None
+
+    total = 0
+    for process_id in pids:
+        try:
+            with open(f'/proc/{process_id}/statm') as statm:
+                total += int(statm.read().split()[1]) * resource.getpagesize()
+        except (OSError, IndexError, ValueError):
+            pass
+    return total / (1024 * 1024)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = "Compare gunicorn worker profiles under the same concurrent load"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', default='sync,gthread', help="GUNICORN_WORKER_CLASS values compared")
+        parser.add_argument('--path', action='append', help="Paths loaded, default /workspace/ and /invitation/status/PENDING")
+        parser.add_argument('--token', default=os.getenv('TOKEN'), help="Authorization bearer token")
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--duration', type=int, default=60, help="Seconds of load per profile")
+
+    def load(self, url, token, concurrency, duration):
+        latencies = []
+        statuses = {}
+        lock = threading.Lock()
+        end = time.monotonic() + duration
+
+        def client():
+            while time.monotonic() < end:
+                request = urllib.request.Request(url, headers={ 'Authorization': f'Bearer {token}' })
+                start = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(request, timeout=30) as response:
+                        response.read()
+                        status = response.status
+                except urllib.error.HTTPError as e:
+                    status = e.code
+                except OSError:
+                    status = 'error'
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    latencies.append(elapsed)
+                    statuses[status] = statuses.get(status, 0) + 1
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sorted(latencies), statuses
+
+    def start(self, profile, port):
+        env = { **os.environ, 'GUNICORN_WORKER_CLASS': profile, 'GUNICORN_BIND': f'127.0.0.1:{port}' }
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'workspace/gunicorn_config.py'],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"gunicorn exited with {server.returncode} ({profile})")
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f"gunicorn didn't start ({profile})")
+
+    def handle(self, *args, **options):
+        if not options['token']:
+            raise CommandError("A token is needed (--token or TOKEN)")
+        paths = options['path'] or ['/workspace/', '/invitation/status/PENDING']
+
+        self.stdout.write("profile   path                           req/s    p50 ms   p99 ms   503  other    RSS MB")
+        for profile in options['profiles'].split(','):
+            port = free_port()
+            server = self.start(profile, port)
+            try:
+                for path in paths:
+                    latencies, statuses = self.load(
+                        f'http://127.0.0.1:{port}{path}',
+                        options['token'],
+                        options['concurrency'],
+                        options['duration']
+                    )
+                    rss = rss_mb(server.pid)
+                    if not latencies:
+                        continue
+                    # Any other error makes the comparison meaningless (expired token, no database...)
+                    other = sum(
+                        count for status, count in statuses.items()
+                        if status != 503 and not (isinstance(status, int) and status < 400)
+                    )
+                    self.stdout.write(
+                        f"{profile:<9} {path:<30} {len(latencies) / options['duration']:6.0f} "
+                        f"{latencies[len(latencies) // 2]:8.1f} {latencies[int(len(latencies) * 0.99)]:8.1f} "
+                        f"{statuses.get(503, 0):5d} {other:6d} {rss or 0:9.0f}"
+                    )
+            finally:
+                server.terminate()
+                server.wait()
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from api.imports import IMPORT_COLUMNS, IMPORT_FORMATS, bulk_import, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk load workspaces, memberships or invitations from NDJSON or CSV with Postgres COPY. "
+        "Workspaces and memberships reference workspaces by name."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=IMPORT_COLUMNS.keys())
+        parser.add_argument('file', help="NDJSON or CSV file to load")
+        parser.add_argument('--input', choices=IMPORT_FORMATS, help="File format, guessed from its extension by default")
+        parser.add_argument(
+            '--merge-users',
+            action='store_true',
+            help="Add the users of workspaces whose name already exists instead of skipping them"
+        )
+        parser.add_argument('--progress-every', type=int, default=10000, help="Report progress every N rows")
+
+    def handle(self, *args, **options):
+        import_format = options['input'] or ('csv' if options['file'].endswith('.csv') else 'ndjson')
+        start = time.perf_counter()
+
+        def on_progress(count):
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f"{count} rows staged ({count / elapsed:.0f} rows/s)")
+
+        with open(options['file'], newline='') as lines:
+            try:
+                result = bulk_import(
+                    options['name'],
+                    read_rows(lines, import_format),
+                    merge_users=options['merge_users'],
+                    on_progress=on_progress,
+                    progress_every=options['progress_every']
+                )
+            except (DatabaseError, KeyError, ValueError) as e:
+                raise CommandError(f"Import failed, nothing was loaded : {e!r}")
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{result.staged} rows staged, {result.merged} rows merged in {elapsed:.2f}s")
+        self.stdout.write(f"Throughput : {result.staged / elapsed if elapsed else 0:.0f} rows/s")
+        if options['name'] != 'membership':
+            self.stdout.write(f"{result.staged - result.merged} rows skipped (conflict, unknown workspace or invalid status)")
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api import profiling
+
+
+class Command(BaseCommand):
+    help = (
+        "Dump the profiles of slow requests as folded stacks, "
+        "e.g. python3 manage.py dump_profiles | flamegraph.pl > profile.svg"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('profile_ids', nargs='*', help="Profiles to dump, all of them merged by default")
+        parser.add_argument('--list', action='store_true', help="List the stored profiles")
+        parser.add_argument('--directory', help="Profiles directory, PROFILING_DIR by default")
+
+    def handle(self, *args, **options):
+        store = profiling.ProfileStore(options['directory'])
+
+        if options['list']:
+            for profile in store.all():
+                summary = profiling.summary(profile)
+                self.stdout.write(
+                    f"{summary['id']} {summary['method']} {summary['path']} {summary['status']} "
+                    f"{summary['durationMs']}ms {summary['samples']} samples"
+                )
+            return
+
+        if options['profile_ids']:
+            profiles = [store.get(profile_id) for profile_id in options['profile_ids']]
+            if None in profiles:
+                raise CommandError("Unknown profile")
+        else:
+            profiles = store.all()
+
+        stacks = {}
+        for profile in profiles:
+            for stack, count in profile['stacks'].items():
+                stacks[stack] = stacks.get(stack, 0) + count
+        self.stdout.write(profiling.folded(stacks), ending='')
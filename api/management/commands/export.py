@@ -0,0 +1,55 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.exports import EXPORTS, export_queryset, export_lines
+from api.serializers.export import EXPORT_FORMATS
+from api.serializers import ExportQuerySerializer
+
+
+class Command(BaseCommand):
+    help = "Stream every workspace or invitation, soft-deleted ones included, as NDJSON or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=EXPORTS.keys())
+        parser.add_argument('--output', choices=EXPORT_FORMATS, default='ndjson')
+        parser.add_argument('--since', help="Rows created since this date (ISO 8601)")
+        parser.add_argument('--until', help="Rows created before this date (ISO 8601)")
+        parser.add_argument('--status', help="Invitation status")
+        parser.add_argument('--deleted', choices=['true', 'false'], help="Only soft-deleted or only live rows")
+        parser.add_argument('--chunk-size', type=int, help="Rows fetched at a time")
+        parser.add_argument('--file', help="Write to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        serializer = ExportQuerySerializer(data={
+            key: options[key]
+            for key in ('output', 'since', 'until', 'status', 'deleted')
+            if options[key] is not None
+        })
+        if not serializer.is_valid():
+            raise CommandError(serializer.errors)
+        params = serializer.validated_data
+
+        if 'status' in params and options['name'] != 'invitation':
+            raise CommandError("Status filter is only available on invitations")
+
+        queryset = export_queryset(
+            options['name'],
+            since=params.get('since'),
+            until=params.get('until'),
+            status=params.get('status'),
+            deleted=params.get('deleted')
+        )
+        lines = export_lines(options['name'], queryset, params['output'], options['chunk_size'])
+
+        output = open(options['file'], 'w', newline='') if options['file'] else sys.stdout
+        try:
+            count = 0
+            for line in lines:
+                output.write(line)
+                count += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        self.stderr.write(f"{count} lines exported")
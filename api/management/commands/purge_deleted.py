@@ -0,0 +1,64 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError
+from django.utils import timezone
+
+from api.purge import PURGES, count_candidates, purge_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Move soft-deleted workspaces and invitations older than the retention window "
+        "to the archive tables, in small throttled batches"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, default=settings.PURGE_RETENTION_DAYS)
+        parser.add_argument('--batch-size', type=int, default=settings.PURGE_BATCH_SIZE)
+        parser.add_argument('--sleep', type=float, default=settings.PURGE_BATCH_SLEEP, help="Pause between batches, in seconds")
+        parser.add_argument('--max-batches', type=int, help="Stop after this number of batches per table")
+        parser.add_argument('--max-retries', type=int, default=5, help="Batches giving up on a lock before stopping")
+        parser.add_argument('--no-archive', action='store_true', help="Delete rows without archiving them")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the rows that would be moved")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['retention_days'])
+        self.stdout.write(f"Moving rows soft-deleted before {cutoff.isoformat()}")
+
+        for name in PURGES:
+            if options['dry_run']:
+                self.stdout.write(f"[{name}] {count_candidates(name, cutoff)} rows would be moved")
+                continue
+            self.purge(name, cutoff, options)
+
+    def purge(self, name, cutoff, options):
+        start = time.perf_counter()
+        total = batches = retries = 0
+
+        while options['max_batches'] is None or batches < options['max_batches']:
+            try:
+                moved = purge_batch(name, cutoff, options['batch_size'], archive=not options['no_archive'])
+            except OperationalError as e:
+                # Lock timeout, live traffic holds the rows
+                retries += 1
+                self.stderr.write(f"[{name}] batch gave up ({e}), retry {retries}/{options['max_retries']}")
+                if retries >= options['max_retries']:
+                    break
+                time.sleep(options['sleep'] * 10)
+                continue
+
+            if moved == 0:
+                break
+
+            batches += 1
+            total += moved
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"[{name}] batch {batches} : {moved} rows, {total} total ({total / elapsed:.0f} rows/s)"
+            )
+            time.sleep(options['sleep'])
+
+        self.stdout.write(f"[{name}] {total} rows moved in {batches} batches ({time.perf_counter() - start:.2f}s)")
@@ -0,0 +1,150 @@
+"""
+Memory instrumentation of the worker.
+
+With MEMORY_PROFILING, allocations are traced with tracemalloc and a thread
+diffs a snapshot every MEMORY_SNAPSHOT_INTERVAL seconds against the previous
+one, logging the lines that grew the most. With MEMORY_MAX_RSS_MB, a worker
+growing past the limit is recycled (SIGTERM, gunicorn finishes its requests
+and replaces it).
+"""
+import os
+import resource
+import signal
+import threading
+import time
+import tracemalloc
+
+from django.conf import settings
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+# Allocations of the instrumentation itself
+_IGNORED_FILES = (
+    tracemalloc.__file__,
+    '<frozen importlib._bootstrap>',
+    '<frozen importlib._bootstrap_external>',
+    '<unknown>',
+)
+
+
+def current_rss():
+    """
+    Resident memory of the process in bytes
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        # Peak instead of current, in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES
+    ])
+
+
+def _stat_dict(stat):
+    frame = stat.traceback[0]
+    return {
+        'file': frame.filename,
+        'line': frame.lineno,
+        'sizeKb': round(stat.size / 1024, 1),
+        'count': stat.count,
+    }
+
+
+def top_allocations(snapshot, limit):
+    return [_stat_dict(stat) for stat in snapshot.statistics('lineno')[:limit]]
+
+
+def growth(snapshot, previous, limit):
+    """
+    Lines whose allocations grew the most between ``previous`` and ``snapshot``
+    """
+    stats = [stat for stat in snapshot.compare_to(previous, 'lineno') if stat.size_diff > 0]
+    return [
+        dict(_stat_dict(stat), sizeDiffKb=round(stat.size_diff / 1024, 1), countDiff=stat.count_diff)
+        for stat in stats[:limit]
+    ]
+
+
+class MemoryMonitor():
+    """
+    Periodic snapshot diff of this worker
+    """
+    def __init__(self, interval, limit):
+        self.interval = interval
+        self.limit = limit
+        self.previous = None
+        self.last_growth = []
+        self.last_snapshot_at = None
+
+    def snapshot(self):
+        snapshot = take_snapshot()
+        if self.previous is not None:
+            self.last_growth = growth(snapshot, self.previous, self.limit)
+            for stat in self.last_growth[:5]:
+                logger.info(
+                    f"Memory growth {stat['file']}:{stat['line']} +{stat['sizeDiffKb']}KB "
+                    f"({stat['countDiff']:+d} blocks)"
+                )
+        self.previous = snapshot
+        self.last_snapshot_at = time.time()
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.snapshot()
+            except Exception as e:
+                logger.error(f"Memory snapshot failed ({e})")
+
+
+_monitor = None
+_monitor_pid = None
+
+
+def get_monitor():
+    return _monitor if _monitor_pid == os.getpid() else None
+
+
+def start():
+    """
+    Start tracing allocations and the snapshot thread of this worker.
+    Threads don't survive fork, call it again in each forked worker.
+    """
+    global _monitor, _monitor_pid
+    if not settings.MEMORY_PROFILING or _monitor_pid == os.getpid():
+        return
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(settings.MEMORY_TRACE_FRAMES)
+    _monitor = MemoryMonitor(settings.MEMORY_SNAPSHOT_INTERVAL, settings.MEMORY_TOP_LIMIT)
+    _monitor_pid = os.getpid()
+    threading.Thread(target=_monitor.run, name='memory-monitor', daemon=True).start()
+    logger.info(f"Memory profiling started (worker {_monitor_pid})")
+
+
+_recycling = False
+
+
+def check_rss():
+    """
+    Recycle the worker once its resident memory exceeds MEMORY_MAX_RSS_MB
+    """
+    global _recycling
+    if not settings.MEMORY_MAX_RSS_MB or _recycling:
+        return
+
+    rss = current_rss()
+    if rss > settings.MEMORY_MAX_RSS_MB * 1024 * 1024:
+        _recycling = True
+        logger.warning(
+            f"Worker {os.getpid()} uses {rss // (1024 * 1024)}MB "
+            f"(limit {settings.MEMORY_MAX_RSS_MB}MB), recycling it"
+        )
+        os.kill(os.getpid(), signal.SIGTERM)
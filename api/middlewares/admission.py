@@ -0,0 +1,139 @@
+import threading
+import time
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.urls import resolve, Resolver404
+
+from api.middlewares.context import is_sub_request
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter():
+    """
+    Concurrency limit with a bounded waiting queue.
+    With a target latency the limit adapts to observed latencies:
+    it grows by one slot per window of fast requests and shrinks by 10%
+    on each slow one (AIMD), between min_limit and max_limit.
+    """
+    def __init__(self, max_limit, min_limit=1, target_latency=None):
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.target_latency = target_latency
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.condition = threading.Condition()
+
+    def __has_slot(self):
+        return self.in_flight < int(self.limit)
+
+    def acquire(self, timeout, queue_size):
+        """
+        Take a slot, waiting at most ``timeout`` seconds behind at most
+        ``queue_size`` other requests, return False when shed
+        """
+        with self.condition:
+            if not self.__has_slot():
+                if self.waiting >= queue_size or timeout <= 0:
+                    return False
+                self.waiting += 1
+                try:
+                    if not self.condition.wait_for(self.__has_slot, timeout):
+                        return False
+                finally:
+                    self.waiting -= 1
+            self.in_flight += 1
+            return True
+
+    def release(self, latency=None):
+        """
+        Give the slot back, ``latency`` in seconds feeds the adaptive limit
+        """
+        with self.condition:
+            self.in_flight -= 1
+            if latency is not None and self.target_latency:
+                if latency > self.target_latency:
+                    self.limit = max(self.min_limit, self.limit * 0.9)
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+
+# WSGI environ key of the middleware which admitted the request, inherited
+# by the sub-requests of a batch so they share its route limiters
+ADMITTED_BY = 'api.admitted_by'
+
+
+class AdmissionControlMiddleware():
+    """
+    Bound the requests in flight in this worker, overall and per route.
+    Excess requests wait in a short queue, then are shed with a 503
+    so clients get a fast error instead of a timeout.
+    Health checks are never limited.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.limiter = self.__limiter(settings.ADMISSION_MAX_CONCURRENCY)
+        self.route_limiters = {}
+        self.route_limiters_lock = threading.Lock()
+
+    @staticmethod
+    def __limiter(max_limit):
+        target_latency = settings.ADMISSION_TARGET_LATENCY_MS / 1000 or None
+        return AdaptiveLimiter(max_limit, settings.ADMISSION_MIN_CONCURRENCY, target_latency)
+
+    def route_limiter(self, request):
+        try:
+            route = resolve(request.path_info).route
+        except Resolver404:
+            return None
+
+        with self.route_limiters_lock:
+            if route not in self.route_limiters:
+                self.route_limiters[route] = self.__limiter(settings.ADMISSION_ROUTE_MAX_CONCURRENCY)
+            return self.route_limiters[route]
+
+    def shed(self, request):
+        logger.warning(f"Request shed, server overloaded ({request.method} {request.path})")
+        response = JsonResponse(
+            "Server overloaded, retry later",
+            status=503,
+            safe=False
+        )
+        response['Retry-After'] = str(settings.ADMISSION_RETRY_AFTER)
+        return response
+
+    def __call__(self, request):
+        if not settings.ADMISSION_CONTROL or request.path in settings.ADMISSION_EXEMPT_PATHS:
+            return self.get_response(request)
+
+        # Sub-requests of a batch run in the slot of the batch, only their route is limited
+        limiter = None if is_sub_request(request) else self.limiter
+        admitted_by = request.META.setdefault(ADMITTED_BY, self)
+        deadline = time.monotonic() + settings.ADMISSION_QUEUE_TIMEOUT
+        if limiter is not None and not limiter.acquire(settings.ADMISSION_QUEUE_TIMEOUT, settings.ADMISSION_QUEUE_SIZE):
+            return self.shed(request)
+
+        route_limiter = admitted_by.route_limiter(request)
+        if route_limiter is not None and not route_limiter.acquire(
+                deadline - time.monotonic(),
+                settings.ADMISSION_QUEUE_SIZE):
+            if limiter is not None:
+                limiter.release()
+            return self.shed(request)
+
+        start = time.monotonic()
+        latency = None
+        try:
+            response = self.get_response(request)
+            latency = time.monotonic() - start
+            return response
+        finally:
+            # Failed requests don't tell anything about latency
+            if route_limiter is not None:
+                route_limiter.release(latency)
+            if limiter is not None:
+                limiter.release(latency)
@@ -0,0 +1,69 @@
+from api import context
+from api.routers import record_user_write
+
+
+READ_ONLY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Lists the external data served from its last known value
+STALE_DATA_HEADER = 'X-Stale-Data'
+
+# WSGI environ key flagging the sub-requests of a /batch request, which run
+# through the middlewares again but share the context of the batch
+SUB_REQUEST = 'api.sub_request'
+
+
+def is_sub_request(request):
+    return request.META.get(SUB_REQUEST, False)
+
+
+class RequestContextMiddleware():
+    """
+    Create the request context and drop it once the response is built.
+    Sub-requests of a batch share it, with their own read-only flag.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if is_sub_request(request):
+            return self.__call_sub_request(request)
+
+        request_context = context.begin()
+        request_context.read_only = request.method in READ_ONLY_METHODS
+
+        try:
+            response = self.get_response(request)
+
+            # Next reads of this user will be served by the primary database
+            if not request_context.read_only and request_context.user is not None \
+                    and response.status_code < 400:
+                record_user_write(request_context.user.id)
+
+            if request_context.stale:
+                response[STALE_DATA_HEADER] = ', '.join(sorted(request_context.stale))
+        finally:
+            context.end()
+
+        return response
+
+    def __call_sub_request(self, request):
+        request_context = context.get()
+        batch_read_only = request_context.read_only
+        request_context.read_only = request.method in READ_ONLY_METHODS
+        try:
+            response = self.get_response(request)
+
+            if not request_context.read_only and request_context.user is not None \
+                    and response.status_code < 400:
+                record_user_write(request_context.user.id)
+                # Next sub-requests must see this write
+                request_context.use_primary = True
+        finally:
+            request_context.read_only = batch_read_only
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Views only running other requests (batch) don't write by themselves
+        if not getattr(getattr(view_func, 'view_class', None), 'writes', True):
+            context.get().read_only = True
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.http import JsonResponse
+
+from api import deadline
+from api.middlewares.context import is_sub_request
+
+
+class DeadlineMiddleware():
+    """
+    Start the request deadline, shortened by the budget left to the caller.
+    Sub-requests of a batch share the deadline of the batch.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REQUEST_DEADLINE_MS or is_sub_request(request):
+            return self.get_response(request)
+
+        budget = settings.REQUEST_DEADLINE_MS / 1000
+        caller_budget = deadline.parse_budget(request.headers.get(deadline.BUDGET_HEADER))
+        if caller_budget is not None:
+            budget = min(budget, caller_budget)
+
+        # The caller already gave up
+        if budget <= 0:
+            return JsonResponse("Request deadline exceeded", status=504, safe=False)
+
+        deadline.start(budget)
+        return self.get_response(request)
@@ -0,0 +1,17 @@
+from api import memory
+from api.middlewares.context import is_sub_request
+
+
+class MemoryGuardMiddleware():
+    """
+    Recycle the worker after a response once it uses more than MEMORY_MAX_RSS_MB
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        # Checked once the whole batch answered
+        if not is_sub_request(request):
+            memory.check_rss()
+        return response
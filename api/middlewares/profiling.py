@@ -0,0 +1,45 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+
+from api import context, profiling
+from api.middlewares.context import is_sub_request
+
+
+class ProfilingMiddleware():
+    """
+    Sample the request stacks and keep the profile of slow (or sampled) requests,
+    sub-requests of a batch are part of the batch profile
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.PROFILING or is_sub_request(request):
+            return self.get_response(request)
+
+        sampler = profiling.get_sampler()
+        thread_id = threading.get_ident()
+        start = time.perf_counter()
+        sampler.start(thread_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            stacks = sampler.stop(thread_id)
+        duration = time.perf_counter() - start
+
+        if stacks and (duration * 1000 >= settings.PROFILING_SLOW_MS
+                       or random.random() < settings.PROFILING_SAMPLE_RATE):
+            user = context.get().user
+            profiling.ProfileStore().save({
+                'method': request.method,
+                'path': request.get_full_path(),
+                'status': response.status_code,
+                'userId': user.id if user is not None else None,
+                'durationMs': round(duration * 1000, 1),
+                'createdAt': time.time(),
+                'stacks': dict(stacks),
+            })
+        return response
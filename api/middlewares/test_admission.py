@@ -0,0 +1,88 @@
+import threading
+from django.http import HttpResponse
+from django.test import SimpleTestCase, RequestFactory, override_settings
+from rest_framework import status
+
+from api.middlewares.admission import AdaptiveLimiter, AdmissionControlMiddleware
+
+
+class TestAdaptiveLimiter(SimpleTestCase):
+    def test_sheds_when_queue_is_full(self):
+        limiter = AdaptiveLimiter(1)
+
+        self.assertTrue(limiter.acquire(1, 0))
+        self.assertFalse(limiter.acquire(1, 0))
+
+    def test_queued_request_gets_released_slot(self):
+        limiter = AdaptiveLimiter(1)
+        limiter.acquire(1, 0)
+
+        timer = threading.Timer(0.05, limiter.release)
+        timer.start()
+        self.assertTrue(limiter.acquire(5, 1))
+        timer.join()
+
+    def test_queued_request_times_out(self):
+        limiter = AdaptiveLimiter(1)
+        limiter.acquire(1, 0)
+
+        self.assertFalse(limiter.acquire(0.01, 1))
+        self.assertEqual(limiter.waiting, 0)
+
+    def test_limit_shrinks_on_slow_requests(self):
+        limiter = AdaptiveLimiter(10, min_limit=2, target_latency=0.1)
+
+        for _ in range(50):
+            limiter.acquire(0, 0)
+            limiter.release(1)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_limit_grows_back_on_fast_requests(self):
+        limiter = AdaptiveLimiter(10, min_limit=2, target_latency=0.1)
+        limiter.limit = 2
+
+        for _ in range(100):
+            limiter.acquire(0, 0)
+            limiter.release(0.01)
+        self.assertEqual(limiter.limit, 10)
+
+
+@override_settings(
+    ADMISSION_CONTROL=True,
+    ADMISSION_MAX_CONCURRENCY=1,
+    ADMISSION_QUEUE_SIZE=0,
+    ADMISSION_RETRY_AFTER=2
+)
+class TestAdmissionControlMiddleware(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = AdmissionControlMiddleware(lambda request: HttpResponse())
+
+    def test_request_admitted(self):
+        res = self.middleware(self.factory.get('/workspace/'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.middleware.limiter.in_flight, 0)
+
+    def test_request_shed_when_overloaded(self):
+        self.middleware.limiter.acquire(0, 0)
+
+        res = self.middleware(self.factory.get('/workspace/'))
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res['Retry-After'], '2')
+
+    @override_settings(ADMISSION_MAX_CONCURRENCY=10, ADMISSION_ROUTE_MAX_CONCURRENCY=1)
+    def test_route_limit(self):
+        middleware = AdmissionControlMiddleware(lambda request: HttpResponse())
+        middleware.route_limiter(self.factory.get('/workspace/')).acquire(0, 0)
+
+        self.assertEqual(middleware(self.factory.get('/workspace/')).status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(middleware(self.factory.get('/invitation/')).status_code, status.HTTP_200_OK)
+        self.assertEqual(middleware.limiter.in_flight, 0)
+
+    def test_health_checks_are_never_shed(self):
+        self.middleware.limiter.acquire(0, 0)
+
+        self.assertEqual(self.middleware(self.factory.get('/ping')).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.middleware(self.factory.get('/health')).status_code, status.HTTP_200_OK)
@@ -0,0 +1,33 @@
+import contextlib
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from api import context, timing
+from api.middlewares.context import is_sub_request
+
+
+class ServerTimingMiddleware():
+    """
+    Add a Server-Timing header with the time spent per phase of the request,
+    sub-requests of a batch add theirs to the batch one
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SERVER_TIMING or is_sub_request(request):
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timing.db_wrapper))
+            response = self.get_response(request)
+
+        response['Server-Timing'] = timing.server_timing(
+            context.get().timings,
+            time.perf_counter() - start
+        )
+        return response
@@ -0,0 +1,43 @@
+import contextlib
+
+from django.db import connections
+
+from api import tracing
+from api.middlewares.context import is_sub_request
+
+
+class TracingMiddleware():
+    """
+    Trace the request, with a span per ORM query when sampled.
+    Sub-requests of a batch are spans of the batch trace.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if is_sub_request(request):
+            with tracing.span(f"{request.method} {request.path}", method=request.method, path=request.path) as span:
+                response = self.get_response(request)
+                if span is not None:
+                    span.attributes['status'] = response.status_code
+                return response
+
+        trace = tracing.start_trace(request.headers.get('traceparent'))
+        try:
+            if not trace.sampled:
+                return self.get_response(request)
+
+            with contextlib.ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(tracing.db_wrapper))
+
+                with tracing.span(f"{request.method} {request.path}", method=request.method, path=request.path) as root:
+                    response = self.get_response(request)
+
+                    root.attributes['status'] = response.status_code
+                    resolver_match = getattr(request, 'resolver_match', None)
+                    if resolver_match is not None and resolver_match.route:
+                        root.name = f"{request.method} /{resolver_match.route}"
+                    return response
+        finally:
+            tracing.finish_trace()
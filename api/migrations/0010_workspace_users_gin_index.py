@@ -0,0 +1,21 @@
+# Generated by Django 3.0.1 on 2026-10-19 19:31
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY doesn't lock writes but can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('api', '0009_auto_20201009_1923'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='workspace',
+            index=django.contrib.postgres.indexes.GinIndex(condition=models.Q(deleted_at__isnull=True), fields=['users'], name='workspace_users_live_gin'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 3.0.1 on 2026-10-19 19:35
+
+import django.contrib.postgres.fields
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY doesn't lock writes but can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('api', '0010_workspace_users_gin_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedInvitation',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('workspace_id', models.IntegerField()),
+                ('sender', models.EmailField(max_length=255)),
+                ('user_id', models.IntegerField()),
+                ('status', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(null=True)),
+                ('updated_at', models.DateTimeField(null=True)),
+                ('deleted_at', models.DateTimeField(null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedWorkspace',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=256)),
+                ('users', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, size=None)),
+                ('created_at', models.DateTimeField(null=True)),
+                ('updated_at', models.DateTimeField(null=True)),
+                ('deleted_at', models.DateTimeField(null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        AddIndexConcurrently(
+            model_name='invitation',
+            index=models.Index(condition=models.Q(deleted_at__isnull=True), fields=['workspace', 'user_id'], name='invitation_workspace_live_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='invitation',
+            index=models.Index(condition=models.Q(deleted_at__isnull=False), fields=['deleted_at'], name='invitation_deleted_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='workspace',
+            index=models.Index(condition=models.Q(deleted_at__isnull=False), fields=['deleted_at'], name='workspace_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY doesn't lock writes but can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('api', '0011_archive'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='invitation',
+            index=models.Index(condition=models.Q(deleted_at__isnull=True), fields=['user_id', 'status'], name='invitation_user_status_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.0.1 on 2026-10-19 19:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_invitation_user_status_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IamPermissionSnapshot',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField()),
+                ('workspace_id', models.IntegerField()),
+                ('access_level', models.CharField(max_length=32)),
+                ('fetched_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='IamUserSnapshot',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('email', models.EmailField(max_length=255)),
+                ('fetched_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='iampermissionsnapshot',
+            constraint=models.UniqueConstraint(fields=('user_id', 'workspace_id'), name='iam_permission_snapshot_unique'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.0.1 on 2026-10-19 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_iam_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='iampermissionsnapshot',
+            name='token_hash',
+            field=models.CharField(max_length=64, null=True),
+        ),
+    ]
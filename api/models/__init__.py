@@ -2,3 +2,5 @@ from .workspace import Workspace
 from .invitation import Invitation, InvitationStatus
 from .user import User
 from .workspace_permission import WorkspacePermission
+from .archive import ArchivedWorkspace, ArchivedInvitation
+from .iam_snapshot import IamUserSnapshot, IamPermissionSnapshot
@@ -12,6 +12,15 @@ class AbstractModelQuerySet(models.QuerySet):
         for obj in self:
             obj.delete()
 
+    def soft_delete_bulk(self):
+        """
+        Soft-delete every object with a single UPDATE statement.
+        As any update(), it doesn't call save() nor send post_save:
+        callers invalidate what the signals would have.
+        """
+        now = timezone.now()
+        return self.update(deleted_at=now, updated_at=now)
+
     def hard_delete(self):
         for obj in self:
             obj.hard_delete()
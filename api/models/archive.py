@@ -0,0 +1,37 @@
+from django.db import models
+from django.contrib.postgres.fields import ArrayField
+
+
+class ArchivedWorkspace(models.Model):
+    """
+    Soft-deleted workspace moved out of the live table after the retention window
+    """
+    id = models.IntegerField(primary_key=True)
+    name = models.CharField(max_length=256)
+    users = ArrayField(models.IntegerField(), default=list)
+    created_at = models.DateTimeField(null=True)
+    updated_at = models.DateTimeField(null=True)
+    deleted_at = models.DateTimeField(null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __repr__(self):
+        return f'<ArchivedWorkspace name={self.name}>'
+
+
+class ArchivedInvitation(models.Model):
+    """
+    Soft-deleted invitation (or invitation of an archived workspace) moved
+    out of the live table after the retention window
+    """
+    id = models.IntegerField(primary_key=True)
+    workspace_id = models.IntegerField()
+    sender = models.EmailField(max_length=255)
+    user_id = models.IntegerField()
+    status = models.CharField(max_length=255)
+    created_at = models.DateTimeField(null=True)
+    updated_at = models.DateTimeField(null=True)
+    deleted_at = models.DateTimeField(null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __repr__(self):
+        return f'<ArchivedInvitation workspace={self.workspace_id} userId={self.user_id} status={self.status}>'
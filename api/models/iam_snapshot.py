@@ -0,0 +1,34 @@
+from django.db import models
+
+
+class IamUserSnapshot(models.Model):
+    """
+    Last IAM answer about a user, served while IAM is unavailable
+    """
+    id = models.IntegerField(primary_key=True)
+    email = models.EmailField(max_length=255)
+    fetched_at = models.DateTimeField()
+
+    def __repr__(self):
+        return f'<IamUserSnapshot id={self.id} email={self.email}>'
+
+
+class IamPermissionSnapshot(models.Model):
+    """
+    Last IAM answer about the access level of a user on a workspace,
+    served while IAM is unavailable
+    """
+    user_id = models.IntegerField()
+    workspace_id = models.IntegerField()
+    access_level = models.CharField(max_length=32)
+    # Token IAM answered for, None when only known from IAM events
+    token_hash = models.CharField(max_length=64, null=True)
+    fetched_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_id', 'workspace_id'], name='iam_permission_snapshot_unique'),
+        ]
+
+    def __repr__(self):
+        return f'<IamPermissionSnapshot userId={self.user_id} workspace={self.workspace_id} accessLevel={self.access_level}>'
@@ -29,6 +29,26 @@ class Invitation(AbstractModel):
 
     class Meta:
         unique_together = ('user_id', 'workspace')
+        indexes = [
+            # Live invitations of a user, optionally filtered by status
+            models.Index(
+                fields=['user_id', 'status'],
+                name='invitation_user_status_idx',
+                condition=models.Q(deleted_at__isnull=True)
+            ),
+            # Live invitations of a workspace
+            models.Index(
+                fields=['workspace', 'user_id'],
+                name='invitation_workspace_live_idx',
+                condition=models.Q(deleted_at__isnull=True)
+            ),
+            # Soft-deleted invitations waiting to be archived
+            models.Index(
+                fields=['deleted_at'],
+                name='invitation_deleted_idx',
+                condition=models.Q(deleted_at__isnull=False)
+            ),
+        ]
 
     def __repr__(self):
         return f'<Invitation workspace={self.workspace} userId={self.userId} status={self.status}>'
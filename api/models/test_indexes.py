@@ -0,0 +1,40 @@
+from django.db import connection
+from django.test import TestCase
+
+from api.models import Workspace, Invitation, InvitationStatus
+
+
+class TestInvitationIndexes(TestCase):
+    """
+    Query plans of the invitation access patterns.
+    Sequential scans are disabled, test tables are too small for the planner to pick an index.
+    """
+    def setUp(self):
+        self.workspace = Workspace.objects.create(name="Workspace", users=[1])
+        Invitation.objects.create(workspace=self.workspace, sender="email@example.com", user_id=2)
+
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def tearDown(self):
+        Workspace.objects.all().hard_delete()
+
+    def test_user_invitations_by_status(self):
+        plan = Invitation.objects.filter(user_id=2, status=InvitationStatus.PENDING.name).explain()
+
+        self.assertIn('invitation_user_status_idx', plan)
+
+    def test_user_invitations(self):
+        plan = Invitation.objects.filter(user_id=2).explain()
+
+        self.assertNotIn('Seq Scan', plan)
+
+    def test_workspace_user_invitation(self):
+        plan = Invitation.objects.filter(workspace=self.workspace, user_id=2).explain()
+
+        self.assertNotIn('Seq Scan', plan)
+
+    def test_workspace_members(self):
+        plan = Workspace.objects.filter(users__contains=[1]).explain()
+
+        self.assertIn('workspace_users_live_gin', plan)
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 
 from .abstract_model import AbstractModel
 
@@ -19,6 +20,29 @@ class Workspace(AbstractModel):
         default=list
     )
 
+    class Meta:
+        indexes = [
+            # Membership lookups (users__contains) on live workspaces
+            GinIndex(
+                fields=['users'],
+                name='workspace_users_live_gin',
+                condition=models.Q(deleted_at__isnull=True)
+            ),
+            # Soft-deleted workspaces waiting to be archived
+            models.Index(
+                fields=['deleted_at'],
+                name='workspace_deleted_idx',
+                condition=models.Q(deleted_at__isnull=False)
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Keep loaded members to know who left the workspace on save
+        instance._loaded_users = list(instance.users) if 'users' in field_names else []
+        return instance
+
     def __repr__(self):
         return f'<Workspace name={self.name}>'
 
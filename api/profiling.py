@@ -0,0 +1,153 @@
+"""
+Sampling profiler for slow requests.
+
+While profiling is enabled, one thread per worker samples the stacks of the
+threads handling a request every PROFILING_INTERVAL_MS. Profiles of requests
+slower than PROFILING_SLOW_MS (or picked with PROFILING_SAMPLE_RATE) are kept
+in PROFILING_DIR, the PROFILING_MAX_PROFILES most recent only, as folded
+stacks ("frame;frame;frame count") readable by flamegraph.pl or speedscope.
+"""
+import collections
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+from django.conf import settings
+
+
+PROFILE_ID = re.compile(r'^[0-9a-f-]+$')
+
+_profile_counter = itertools.count()
+
+
+def fold(frame):
+    """
+    Folded stack of ``frame``, outermost frame first
+    """
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}".replace(' ', '_').replace(';', '_'))
+        frame = frame.f_back
+    return ';'.join(reversed(frames))
+
+
+class Sampler():
+    """
+    Samples the stacks of the registered threads from a background thread
+    """
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self, thread_id):
+        with self.lock:
+            self.samples[thread_id] = collections.Counter()
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='profiling-sampler', daemon=True)
+                self.thread.start()
+
+    def stop(self, thread_id):
+        with self.lock:
+            return self.samples.pop(thread_id, collections.Counter())
+
+    def sample(self):
+        frames = sys._current_frames()
+        with self.lock:
+            for thread_id, counter in self.samples.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    counter[fold(frame)] += 1
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            self.sample()
+
+
+_sampler = None
+
+
+def get_sampler():
+    global _sampler
+    if _sampler is None:
+        _sampler = Sampler(settings.PROFILING_INTERVAL_MS / 1000)
+    return _sampler
+
+
+class ProfileStore():
+    """
+    Most recent profiles, one JSON file each in PROFILING_DIR shared by the workers
+    """
+    def __init__(self, directory=None, max_profiles=None):
+        self.directory = directory or settings.PROFILING_DIR
+        self.max_profiles = max_profiles or settings.PROFILING_MAX_PROFILES
+
+    def __path(self, profile_id):
+        return os.path.join(self.directory, f"{profile_id}.json")
+
+    def __ids(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name[:-len('.json')] for name in os.listdir(self.directory)
+            if name.endswith('.json') and PROFILE_ID.match(name[:-len('.json')])
+        )
+
+    def save(self, profile):
+        """
+        Store ``profile`` and drop the oldest ones beyond max_profiles, return its id
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        # Ids sort by creation time
+        profile_id = f"{int(time.time() * 1000):013x}-{os.getpid():x}-{next(_profile_counter):x}"
+        profile['id'] = profile_id
+        temporary_path = self.__path(profile_id) + '.tmp'
+        with open(temporary_path, 'w') as profile_file:
+            json.dump(profile, profile_file)
+        os.replace(temporary_path, self.__path(profile_id))
+
+        for old_id in self.__ids()[:-self.max_profiles]:
+            try:
+                os.remove(self.__path(old_id))
+            except FileNotFoundError:  # Removed by another worker
+                pass
+        return profile_id
+
+    def get(self, profile_id):
+        if not PROFILE_ID.match(profile_id):
+            return None
+        try:
+            with open(self.__path(profile_id)) as profile_file:
+                return json.load(profile_file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def all(self):
+        """
+        Stored profiles, most recent first
+        """
+        profiles = (self.get(profile_id) for profile_id in reversed(self.__ids()))
+        return [profile for profile in profiles if profile is not None]
+
+
+def folded(stacks):
+    """
+    flamegraph.pl input of ``stacks`` counts
+    """
+    return ''.join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+def summary(profile):
+    profile_summary = {
+        key: profile.get(key)
+        for key in ('id', 'method', 'path', 'status', 'userId', 'durationMs', 'createdAt')
+    }
+    profile_summary['samples'] = sum(profile.get('stacks', {}).values())
+    return profile_summary
@@ -0,0 +1,125 @@
+"""
+Move soft-deleted rows older than the retention window out of the live tables.
+
+Rows are handled in small batches, each one in its own short transaction
+(SELECT ... FOR UPDATE SKIP LOCKED, DELETE, INSERT into the archive table),
+so locks are held for a bounded time and live traffic is never blocked.
+Invitations go first: those of a purged workspace must leave before it.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+
+from api.caches import invitation_counts
+from api.models import (
+    Workspace,
+    Invitation,
+    ArchivedWorkspace,
+    ArchivedInvitation
+)
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _invitation_condition():
+    return f"""
+        t.deleted_at < %(cutoff)s
+        OR t.workspace_id IN (
+            SELECT id FROM {_table(Workspace)} WHERE deleted_at < %(cutoff)s
+        )
+    """
+
+
+def _workspace_condition():
+    return f"""
+        t.deleted_at < %(cutoff)s
+        AND NOT EXISTS (
+            SELECT 1 FROM {_table(Invitation)} WHERE workspace_id = t.id
+        )
+    """
+
+
+def _workspace_count_condition():
+    # A run purges the invitations of these workspaces first (_invitation_condition),
+    # none of them is left behind by the time workspaces are purged
+    return "t.deleted_at < %(cutoff)s"
+
+
+# Live table, archive table, candidate rows condition, archived columns
+PURGES = {
+    'invitation': (
+        Invitation,
+        ArchivedInvitation,
+        _invitation_condition,
+        ('id', 'workspace_id', 'sender', 'user_id', 'status', 'created_at', 'updated_at', 'deleted_at'),
+    ),
+    'workspace': (
+        Workspace,
+        ArchivedWorkspace,
+        _workspace_condition,
+        ('id', 'name', 'users', 'created_at', 'updated_at', 'deleted_at'),
+    ),
+}
+
+
+# Rows a full run would move, when it differs from the batch condition
+COUNT_CONDITIONS = {
+    'workspace': _workspace_count_condition,
+}
+
+
+def count_candidates(name, cutoff):
+    """
+    Number of rows a full run (all tables, in order) would move
+    """
+    model, _, condition, _ = PURGES[name]
+    condition = COUNT_CONDITIONS.get(name, condition)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT count(*) FROM {_table(model)} AS t WHERE ({condition()})",
+            {'cutoff': cutoff}
+        )
+        return cursor.fetchone()[0]
+
+
+def purge_batch(name, cutoff, batch_size, archive=True):
+    """
+    Archive (or only delete) one batch of rows, return the number of moved rows
+    """
+    model, archive_model, condition, columns = PURGES[name]
+    column_list = ', '.join(columns)
+
+    archive_statement = ""
+    if archive:
+        archive_statement = f""",
+            archived AS (
+                INSERT INTO {_table(archive_model)} ({column_list}, archived_at)
+                SELECT {column_list}, now() FROM moved
+                ON CONFLICT (id) DO NOTHING
+            )"""
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Give up the batch rather than waiting behind live traffic
+        cursor.execute(f"SET LOCAL lock_timeout = '{int(settings.PURGE_LOCK_TIMEOUT_MS)}ms'")
+        cursor.execute(f"""
+            WITH batch AS (
+                SELECT t.id FROM {_table(model)} AS t
+                WHERE ({condition()})
+                ORDER BY t.id
+                LIMIT %(batch_size)s
+                FOR UPDATE SKIP LOCKED
+            ),
+            moved AS (
+                DELETE FROM {_table(model)} WHERE id IN (SELECT id FROM batch)
+                RETURNING {column_list}
+            ){archive_statement}
+            SELECT {'user_id' if model is Invitation else 'id'} FROM moved
+        """, {'cutoff': cutoff, 'batch_size': batch_size})
+        moved = [row[0] for row in cursor.fetchall()]
+
+    # Invitations of purged workspaces may be live ones, and the set-based
+    # delete doesn't send post_delete
+    if model is Invitation:
+        invitation_counts.invalidate(moved)
+    return len(moved)
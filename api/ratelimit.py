@@ -0,0 +1,97 @@
+"""
+Per-user token buckets, with separate budgets for read and write routes,
+so a buggy client loop cannot saturate IAM for the whole platform.
+
+Buckets are held in-process by default (per worker). RATE_LIMIT_BACKEND can
+point to CacheBackend to share them between workers through the Django cache,
+or to any class with the same ``consume`` method.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+
+def _take(bucket, capacity, rate, now):
+    """
+    Take one token from ``bucket`` (tokens, updated_at) refilled at ``rate``
+    tokens per second up to ``capacity``, return (bucket, allowed, retry_after)
+    """
+    tokens, updated_at = bucket or (capacity, now)
+    tokens = min(capacity, tokens + max(0, now - updated_at) * rate)
+
+    if tokens >= 1:
+        return (tokens - 1, now), True, 0
+    return (tokens, now), False, (1 - tokens) / rate
+
+
+class LocalBackend():
+    """
+    Buckets of this worker, in a dict
+    """
+    max_keys = 10000
+
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def consume(self, key, capacity, rate):
+        now = time.monotonic()
+        with self.lock:
+            bucket, allowed, retry_after = _take(self.buckets.get(key), capacity, rate, now)
+            self.buckets[key] = bucket
+
+            if len(self.buckets) > self.max_keys:
+                # Idle buckets are full again, forgetting them changes nothing
+                full_after = capacity / rate
+                self.buckets = {
+                    bucket_key: bucket for bucket_key, bucket in self.buckets.items()
+                    if now - bucket[1] < full_after
+                }
+
+        return allowed, retry_after
+
+
+class CacheBackend():
+    """
+    Buckets shared by the workers using the Django cache.
+    Read and write are not atomic, concurrent calls may let a few extra through.
+    """
+    def consume(self, key, capacity, rate):
+        cache_key = f"rate-limit:{key}"
+        bucket, allowed, retry_after = _take(cache.get(cache_key), capacity, rate, time.time())
+        cache.set(cache_key, bucket, max(1, int(capacity / rate) + 1))
+        return allowed, retry_after
+
+
+_backends = {}
+
+
+def get_backend():
+    path = settings.RATE_LIMIT_BACKEND
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
+
+
+def consume(user_id, write=False):
+    """
+    Take a token from the user read or write budget,
+    return (allowed, seconds before a token is available)
+    """
+    if not settings.RATE_LIMIT:
+        return True, 0
+
+    if write:
+        return get_backend().consume(
+            f"write:{user_id}",
+            settings.RATE_LIMIT_WRITE_BURST,
+            settings.RATE_LIMIT_WRITE_PER_SECOND
+        )
+    return get_backend().consume(
+        f"read:{user_id}",
+        settings.RATE_LIMIT_READ_BURST,
+        settings.RATE_LIMIT_READ_PER_SECOND
+    )
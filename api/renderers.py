@@ -0,0 +1,40 @@
+from rest_framework.renderers import JSONRenderer
+
+from api import timing, tracing
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fallback on DRF renderer
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Render JSON with orjson when it is installed.
+    Output is byte-identical to rest_framework JSONRenderer, anything orjson
+    can't render the same way is delegated to it. Floats in exponent notation
+    are the exception ('1e16' instead of '1e+16'), the API doesn't render any.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with tracing.span('render'), timing.timer('render'):
+            return self.__render(data, accepted_media_type, renderer_context)
+
+    def __render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+            )
+        except (orjson.JSONEncodeError, TypeError):
+            # Non string keys, big integers...
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same escaping as JSONRenderer, these are not valid in javascript strings
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,53 @@
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from api import context
+
+
+def _pin_key(user_id):
+    return f"replica-pin:{user_id}"
+
+
+def record_user_write(user_id):
+    """
+    Pin the user reads on the primary database for DB_REPLICA_PIN_SECONDS,
+    so the user sees its own writes while replicas catch up.
+    """
+    if not settings.DB_REPLICAS:
+        return
+    cache.set(_pin_key(user_id), True, settings.DB_REPLICA_PIN_SECONDS)
+
+
+def has_recent_write(user_id):
+    if not settings.DB_REPLICAS:
+        return False
+    return cache.get(_pin_key(user_id), False)
+
+
+class ReplicaRouter():
+    """
+    Send read-only requests queries to a replica, everything else to the primary
+    """
+    def db_for_read(self, model, **hints):
+        request_context = context.get()
+        if not request_context.read_only or request_context.use_primary:
+            return DEFAULT_DB_ALIAS
+
+        # Reads inside a transaction must see the transaction writes
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        return random.choice(settings.DB_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
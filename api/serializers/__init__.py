@@ -15,3 +15,22 @@ from .invitation import (
 from .user import (
     UserSerializer,
 )
+
+from .membership import (
+    MembershipSerializer,
+    MembershipBatchSerializer,
+)
+
+from .export import (
+    ExportQuerySerializer,
+)
+
+from .batch import (
+    BatchRequestSerializer,
+    BatchSerializer,
+)
+
+from .iam import (
+    IamEventSerializer,
+    IamEventBatchSerializer,
+)
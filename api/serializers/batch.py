@@ -0,0 +1,19 @@
+from django.conf import settings
+from rest_framework import serializers
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=['GET', 'POST', 'PUT', 'DELETE'])
+    path = serializers.RegexField(r'^/')
+    body = serializers.JSONField(required=False)
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchRequestSerializer(many=True, allow_empty=False)
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f"Ensure this field has no more than {settings.BATCH_MAX_REQUESTS} elements."
+            )
+        return value
@@ -0,0 +1,16 @@
+from rest_framework import serializers
+
+from api.models import InvitationStatus
+
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    output = serializers.ChoiceField(choices=EXPORT_FORMATS, default='ndjson')
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+    # Invitation status, only for the invitation export
+    status = serializers.ChoiceField(choices=InvitationStatus.choices(), required=False)
+    # Only soft-deleted rows (true) or only live rows (false), both when missing
+    deleted = serializers.BooleanField(required=False, allow_null=True, default=None)
@@ -0,0 +1,29 @@
+from rest_framework import serializers
+
+from api.externals.iam.events import EVENT_TYPES, USER_CHANGED, PERMISSION_CHANGED
+from api.models import WorkspacePermission
+
+
+class IamEventSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=EVENT_TYPES)
+    userId = serializers.IntegerField()
+    # New email of a user-changed event, the user is invalidated when missing
+    email = serializers.EmailField(required=False, allow_null=True)
+    workspaceId = serializers.IntegerField(required=False)
+    # New access level of a permission-changed event, the permission is invalidated when missing
+    accessLevel = serializers.ChoiceField(
+        choices=[permission.name for permission in WorkspacePermission],
+        required=False,
+        allow_null=True
+    )
+
+    def validate(self, data):
+        if data['type'] == PERMISSION_CHANGED and data.get('workspaceId') is None:
+            raise serializers.ValidationError({ 'workspaceId': 'Required by permission-changed events' })
+        if data['type'] != USER_CHANGED and data.get('email') is not None:
+            raise serializers.ValidationError({ 'email': f"Only sent with {USER_CHANGED} events" })
+        return data
+
+
+class IamEventBatchSerializer(serializers.Serializer):
+    events = IamEventSerializer(many=True)
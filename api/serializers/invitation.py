@@ -2,9 +2,10 @@ from rest_framework import serializers
 
 from api.serializers import FkWorkspaceRelatedField
 from api.models import Invitation
+from api.serializers.tracing import TracedSerializerMixin
 
 
-class FullInvitationSerializer(serializers.ModelSerializer):
+class FullInvitationSerializer(TracedSerializerMixin, serializers.ModelSerializer):
     workspace = FkWorkspaceRelatedField(read_only=True)
 
     class Meta:
@@ -12,7 +13,7 @@ class FullInvitationSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class InvitationSerializer(serializers.ModelSerializer):
+class InvitationSerializer(TracedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Invitation
         fields = '__all__'
@@ -0,0 +1,10 @@
+from rest_framework import serializers
+
+
+class MembershipSerializer(serializers.Serializer):
+    userId = serializers.IntegerField()
+    workspaceId = serializers.IntegerField()
+
+
+class MembershipBatchSerializer(serializers.Serializer):
+    pairs = MembershipSerializer(many=True)
@@ -0,0 +1,70 @@
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from api.models import (
+    Workspace,
+    Invitation,
+    InvitationStatus,
+    User
+)
+from api.serializers import (
+    fast,
+    UserFilledWorkspaceSerializer,
+    FullInvitationSerializer,
+    WorkspaceSerializer
+)
+
+
+class TestFastSerializers(TestCase):
+    def setUp(self):
+        self.workspace = Workspace.objects.create(name="Workspace", users=[1, 2])
+        self.other_workspace = Workspace.objects.create(name="Wörkspace ✓", users=[1, 3])
+        Invitation.objects.create(workspace=self.workspace, sender="email@example.com", user_id=4)
+        Invitation.objects.create(
+            workspace=self.other_workspace,
+            sender="email@example.com",
+            user_id=4,
+            status=InvitationStatus.ACCEPTED.name
+        )
+        self.users = {
+            1: User(1, 'one@example.com'),
+            2: User(2, 'two@example.com'),
+            3: User(3, 'three@example.com'),
+        }
+
+    def tearDown(self):
+        Invitation.objects.all().hard_delete()
+        Workspace.objects.all().hard_delete()
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_workspace_same_as_serializer(self):
+        expected = self.render(WorkspaceSerializer(Workspace.objects.order_by('id'), many=True).data)
+
+        rows = fast.workspace_rows(Workspace.objects.order_by('id'))
+        self.assertEqual(self.render([fast.serialize_workspace(row) for row in rows]), expected)
+
+    def test_user_filled_workspace_same_as_serializer(self):
+        workspaces = list(Workspace.objects.order_by('id'))
+        for workspace in workspaces:
+            workspace.users = [self.users[user_id] for user_id in workspace.users]
+        expected = self.render(UserFilledWorkspaceSerializer(workspaces, many=True).data)
+
+        rows = fast.workspace_rows(Workspace.objects.order_by('id'))
+        self.assertEqual(self.render(fast.serialize_user_filled_workspaces(rows, self.users)), expected)
+
+    def test_workspaces_user_ids(self):
+        rows = fast.workspace_rows(Workspace.objects.order_by('id'))
+
+        self.assertEqual(sorted(fast.workspaces_user_ids(rows)), [1, 2, 3])
+
+    def test_invitation_same_as_serializer(self):
+        expected = self.render(FullInvitationSerializer(Invitation.objects.order_by('id'), many=True).data)
+
+        rows = fast.invitation_rows(Invitation.objects.order_by('id'))
+        self.assertEqual(self.render(fast.serialize_invitations(rows)), expected)
+
+    def test_invitation_single_query(self):
+        with self.assertNumQueries(1):
+            fast.serialize_invitations(fast.invitation_rows(Invitation.objects.order_by('id')))
@@ -0,0 +1,11 @@
+from api import tracing
+
+
+class TracedSerializerMixin():
+    """
+    Record a span while building the representation of the serializer
+    """
+    @property
+    def data(self):
+        with tracing.span(f"serialize {type(self).__name__}"):
+            return super().data
@@ -1,10 +1,11 @@
 from rest_framework import serializers
 
 from api.models import Workspace
+from api.serializers.tracing import TracedSerializerMixin
 from api.serializers.user import UserSerializer
 
 
-class UserFilledWorkspaceSerializer(serializers.ModelSerializer):
+class UserFilledWorkspaceSerializer(TracedSerializerMixin, serializers.ModelSerializer):
     users = UserSerializer(many=True)
 
     class Meta:
@@ -0,0 +1,27 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from api.caches import membership, invitation_counts
+from api.models import Workspace, Invitation
+
+
+@receiver([post_save, post_delete], sender=Workspace)
+def invalidate_workspace_membership(sender, instance, **kwargs):
+    """
+    Members who joined or left the workspace (or all of them when it is deleted)
+    """
+    user_ids = set(instance.users) | set(getattr(instance, '_loaded_users', []))
+    # Users may have been filled with IAM users before the save
+    user_ids = [getattr(user, 'id', user) for user in user_ids]
+    # Invalidated before commit, a concurrent read would cache the old members again
+    workspace_id = instance.id
+    transaction.on_commit(lambda: membership.invalidate(workspace_id, user_ids))
+    instance._loaded_users = [getattr(user, 'id', user) for user in instance.users]
+
+
+@receiver([post_save, post_delete], sender=Invitation)
+def invalidate_invitation_counts(sender, instance, **kwargs):
+    # Invalidated before commit, a concurrent read would cache the old counts again
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invitation_counts.invalidate([user_id]))
@@ -0,0 +1,73 @@
+"""
+Cold start measurement of a production worker: time to import the WSGI
+application, time to answer its first request, and what got imported
+(from ``python -X importtime``). Runs in a fresh interpreter.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+
+BOOT_SCRIPT = """
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+
+start = time.perf_counter()
+import workspace.wsgi
+booted = time.perf_counter()
+
+environ = {'PATH_INFO': '/ping', 'REQUEST_METHOD': 'GET'}
+setup_testing_defaults(environ)
+statuses = []
+b''.join(workspace.wsgi.application(environ, lambda status, headers: statuses.append(status)))
+responded = time.perf_counter()
+
+print(json.dumps({
+    'bootMs': (booted - start) * 1000,
+    'firstResponseMs': (responded - booted) * 1000,
+    'status': statuses[0],
+    'modules': sorted(sys.modules),
+}))
+"""
+
+
+def parse_importtime(output):
+    """
+    Import time in microseconds by top-level package (``-X importtime`` self times summed)
+    """
+    imports = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_time, _, name = line[len('import time:'):].split('|')
+        if not self_time.strip().isdigit():
+            continue  # Header
+        package = name.strip().split('.')[0]
+        imports[package] = imports.get(package, 0) + int(self_time)
+    return imports
+
+
+def measure_startup(environment='production'):
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE='workspace.settings',
+        WORKSPACE_ENVIRONMENT=environment,
+        DB_CONN_WARMUP='false',
+    )
+    env.pop('WSGI_WORKER_INIT_IN_POST_FORK', None)
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+        cwd=settings.BASE_DIR,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True
+    )
+    measure = json.loads(result.stdout.strip().splitlines()[-1])
+    measure['imports'] = parse_importtime(result.stderr)
+    return measure
@@ -1,7 +1,7 @@
 import jwt
 import logging
 
-from django.test import TestCase, Client
+from django.test import SimpleTestCase, TestCase, Client, override_settings
 from rest_framework import status
 
 
@@ -48,3 +48,26 @@ class TestAuthenticator(TestCase):
         # Assert view has been called (workspace/ will return 200 and empty array)
         self.assertEqual(res.status_code, 200)
         self.assertEqual(res.json(), [])
+
+
+class TestAuthenticateInternal(SimpleTestCase):
+    def setUp(self):
+        self.client = Client()
+
+    @override_settings(INTERNAL_API_TOKEN=None)
+    def test_rejected_without_configured_token(self):
+        res = self.client.get('/internal/memory', HTTP_X_INTERNAL_TOKEN='internal')
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(INTERNAL_API_TOKEN='internal-token')
+    def test_non_ascii_token_rejected(self):
+        res = self.client.get('/internal/memory', HTTP_X_INTERNAL_TOKEN='t\u00f6ken')
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(INTERNAL_API_TOKEN='internal-token')
+    def test_valid_token(self):
+        res = self.client.get('/internal/memory', HTTP_X_INTERNAL_TOKEN='internal-token')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -0,0 +1,116 @@
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+
+from api import connections
+
+
+def connection(alias='default', usable=True, max_age=60):
+    conn = mock.Mock(alias=alias, in_atomic_block=False, settings_dict={ 'CONN_MAX_AGE': max_age })
+    conn.is_usable.return_value = usable
+    del conn.health_checked
+    return conn
+
+
+@override_settings(DB_CONN_HEALTH_CHECKS=True, DB_CONN_HEALTH_CHECK_INTERVAL=10)
+class TestConnectionsHealth(SimpleTestCase):
+    def check(self, *conns):
+        with mock.patch.object(connections.connections, 'all', return_value=list(conns)):
+            connections.check_connections_health()
+
+    def test_unusable_connection_closed(self):
+        conn = connection(usable=False)
+
+        self.check(conn)
+
+        conn.close.assert_called_once()
+
+    def test_usable_connection_kept(self):
+        conn = connection()
+
+        self.check(conn)
+
+        conn.close.assert_not_called()
+
+    def test_checked_once_per_interval(self):
+        conn = connection()
+
+        self.check(conn)
+        self.check(conn)
+
+        conn.is_usable.assert_called_once()
+
+    @override_settings(DB_CONN_HEALTH_CHECK_INTERVAL=0)
+    def test_checked_again_after_interval(self):
+        conn = connection()
+
+        self.check(conn)
+        self.check(conn)
+
+        self.assertEqual(conn.is_usable.call_count, 2)
+
+    def test_new_connection_checked(self):
+        conn = connection()
+        self.check(conn)
+
+        conn.connection = mock.Mock()
+        self.check(conn)
+
+        self.assertEqual(conn.is_usable.call_count, 2)
+
+    def test_connection_per_request_not_checked(self):
+        conn = connection(max_age=0)
+
+        self.check(conn)
+
+        conn.is_usable.assert_not_called()
+
+    def test_closed_or_in_transaction_not_checked(self):
+        closed = connection()
+        closed.connection = None
+        in_transaction = connection()
+        in_transaction.in_atomic_block = True
+
+        self.check(closed, in_transaction)
+
+        closed.is_usable.assert_not_called()
+        in_transaction.is_usable.assert_not_called()
+
+    @override_settings(DB_CONN_HEALTH_CHECKS=False)
+    def test_disabled(self):
+        conn = connection(usable=False)
+
+        self.check(conn)
+
+        conn.is_usable.assert_not_called()
+
+
+class TestWarmUp(SimpleTestCase):
+    def warm_up(self, *conns):
+        with mock.patch.object(connections.connections, 'all', return_value=list(conns)):
+            connections.warm_up_connections()
+
+    @override_settings(DB_CONN_WARMUP=True)
+    def test_every_database_connected(self):
+        primary, replica = connection(), connection('replica_0')
+
+        self.warm_up(primary, replica)
+
+        primary.ensure_connection.assert_called_once()
+        replica.ensure_connection.assert_called_once()
+
+    @override_settings(DB_CONN_WARMUP=True)
+    def test_unreachable_database_skipped(self):
+        primary, replica = connection(), connection('replica_0')
+        primary.ensure_connection.side_effect = Exception('unreachable')
+
+        self.warm_up(primary, replica)
+
+        replica.ensure_connection.assert_called_once()
+
+    @override_settings(DB_CONN_WARMUP=False)
+    def test_disabled(self):
+        conn = connection()
+
+        self.warm_up(conn)
+
+        conn.ensure_connection.assert_not_called()
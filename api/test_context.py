@@ -0,0 +1,44 @@
+from django.test import SimpleTestCase
+
+from api import context
+
+
+class TestIdentityMap(SimpleTestCase):
+    def setUp(self):
+        self.entities = context.begin().entities
+
+    def tearDown(self):
+        context.end()
+
+    def test_load_calls_loader_once(self):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return 'workspace'
+
+        self.assertEqual(self.entities.load('workspace', 1, loader), 'workspace')
+        self.assertEqual(self.entities.load('workspace', 1, loader), 'workspace')
+        self.assertEqual(len(calls), 1)
+
+    def test_load_does_not_keep_none(self):
+        self.assertIsNone(self.entities.load('workspace', 1, lambda: None))
+        self.assertFalse(self.entities.has('workspace', 1))
+
+    def test_kinds_are_separated(self):
+        self.entities.set('workspace', 1, 'workspace')
+        self.entities.set('user', 1, 'user')
+
+        self.assertEqual(self.entities.get('workspace', 1), 'workspace')
+        self.assertEqual(self.entities.get('user', 1), 'user')
+
+    def test_get_many_returns_known_entities(self):
+        self.entities.set_many('user', { 1: 'one', 2: 'two' })
+
+        self.assertEqual(self.entities.get_many('user', [1, 3]), { 1: 'one' })
+
+    def test_cleared_with_the_context(self):
+        self.entities.set('workspace', 1, 'workspace')
+        context.end()
+
+        self.assertFalse(context.begin().entities.has('workspace', 1))
@@ -0,0 +1,96 @@
+from unittest import mock
+from django.http import HttpResponse
+from django.test import SimpleTestCase, RequestFactory, override_settings
+from rest_framework import status
+
+from api import context, deadline
+from api.externals.errors import DeadlineExceededException
+from api.externals.http import Http
+from api.externals.notifier import ExternalNotify
+from api.middlewares.deadline import DeadlineMiddleware
+
+
+@override_settings(REQUEST_DEADLINE_MS=5000)
+class TestDeadlineMiddleware(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        context.begin()
+
+    def tearDown(self):
+        context.end()
+
+    def call(self, **headers):
+        remaining = []
+
+        def view(request):
+            remaining.append(deadline.remaining())
+            return HttpResponse()
+
+        response = DeadlineMiddleware(view)(self.factory.get('/workspace/', **headers))
+        return response, remaining
+
+    def test_default_budget(self):
+        _, remaining = self.call()
+
+        self.assertAlmostEqual(remaining[0], 5, places=1)
+
+    def test_caller_budget(self):
+        _, remaining = self.call(HTTP_X_REQUEST_BUDGET_MS='800')
+
+        self.assertAlmostEqual(remaining[0], 0.8, places=1)
+
+    def test_caller_budget_capped(self):
+        _, remaining = self.call(HTTP_X_REQUEST_BUDGET_MS='60000')
+
+        self.assertAlmostEqual(remaining[0], 5, places=1)
+
+    def test_caller_gave_up(self):
+        res, remaining = self.call(HTTP_X_REQUEST_BUDGET_MS='0')
+
+        self.assertEqual(res.status_code, status.HTTP_504_GATEWAY_TIMEOUT)
+        self.assertEqual(remaining, [])
+
+
+@override_settings(REQUEST_DEADLINE_NON_ESSENTIAL_MS=500, REQUEST_DEADLINE_MIN_CALL_MS=20)
+class TestHttpDeadline(SimpleTestCase):
+    def setUp(self):
+        context.begin()
+        self.session = mock.patch.object(Http, '_Http__session').start()
+        self.session.get.return_value = mock.Mock(status_code=200)
+        self.session.post.return_value = mock.Mock(status_code=201)
+
+    def tearDown(self):
+        mock.patch.stopall()
+        context.end()
+
+    def test_no_deadline(self):
+        Http.get('http://iam/permission')
+
+        self.assertEqual(self.session.get.call_args[1]['timeout'], 1)
+        self.assertNotIn(deadline.BUDGET_HEADER, self.session.get.call_args[1]['headers'])
+
+    def test_timeout_from_remaining_budget(self):
+        deadline.start(0.3)
+
+        Http.get('http://iam/permission')
+
+        timeout = self.session.get.call_args[1]['timeout']
+        self.assertLessEqual(timeout, 0.3)
+        self.assertGreater(timeout, 0.2)
+        self.assertEqual(
+            self.session.get.call_args[1]['headers'][deadline.BUDGET_HEADER],
+            str(int(timeout * 1000))
+        )
+
+    def test_non_essential_call_skipped(self):
+        deadline.start(0.3)
+
+        self.assertFalse(ExternalNotify.send('workspace 1', 'workspace updated'))
+        self.session.post.assert_not_called()
+
+    def test_essential_call_fails_once_exhausted(self):
+        deadline.start(0)
+
+        with self.assertRaises(DeadlineExceededException):
+            Http.get('http://iam/permission')
+        self.session.get.assert_not_called()
@@ -0,0 +1,69 @@
+import io
+from datetime import datetime
+import json
+import tempfile
+from django.core.management import call_command
+from django.test import TestCase
+
+from api.models import Workspace, Invitation, InvitationStatus
+
+
+class TestBulkImport(TestCase):
+    def setUp(self):
+        self.workspace = Workspace.objects.create(name="Existing", users=[1])
+
+    def tearDown(self):
+        Workspace.raw_objects.all().delete()
+
+    def load(self, name, content, suffix, *args):
+        with tempfile.NamedTemporaryFile('w', suffix=suffix) as file:
+            file.write(content)
+            file.flush()
+            out = io.StringIO()
+            call_command('bulk_import', name, file.name, *args, stdout=out)
+        return out.getvalue()
+
+    def test_import_workspaces_csv_skip_conflicts(self):
+        out = self.load('workspace', 'name,users\nFirst,1 2\nExisting,3\nFirst,4\n', '.csv')
+
+        self.assertIn('3 rows staged, 1 rows merged', out)
+        self.assertEqual(Workspace.objects.get(name='First').users, [1, 2])
+        self.assertEqual(Workspace.objects.get(name='Existing').users, [1])
+
+    def test_import_workspaces_merge_users(self):
+        self.load('workspace', json.dumps({'name': 'Existing', 'users': [3, 1]}) + '\n', '.ndjson', '--merge-users')
+
+        self.assertEqual(Workspace.objects.get(name='Existing').users, [1, 3])
+
+    def test_import_workspaces_merge_skips_deleted(self):
+        Workspace.objects.create(name='Deleted', users=[1], deleted_at=datetime.now())
+
+        out = self.load('workspace', json.dumps({'name': 'Deleted', 'users': [2]}) + '\n', '.ndjson', '--merge-users')
+
+        self.assertIn('1 rows staged, 0 rows merged', out)
+        deleted = Workspace.raw_objects.get(name='Deleted')
+        self.assertEqual(deleted.users, [1])
+        self.assertIsNotNone(deleted.deleted_at)
+
+    def test_import_memberships(self):
+        out = self.load('membership', 'workspace,user_id\nExisting,2\nExisting,3\nUnknown,4\n', '.csv')
+
+        self.assertIn('3 rows staged, 1 rows merged', out)
+        self.assertEqual(Workspace.objects.get(name='Existing').users, [1, 2, 3])
+
+    def test_import_invitations(self):
+        Invitation.objects.create(workspace=self.workspace, sender="email@example.com", user_id=2)
+        lines = [
+            {'workspace': 'Existing', 'user_id': 2, 'sender': 'email@example.com'},
+            {'workspace': 'Existing', 'user_id': 3, 'sender': 'email@example.com', 'status': 'ACCEPTED'},
+            {'workspace': 'Existing', 'user_id': 4, 'sender': 'email@example.com', 'status': 'UNKNOWN'},
+            {'workspace': 'Unknown', 'user_id': 5, 'sender': 'email@example.com'},
+        ]
+        out = self.load('invitation', '\n'.join(json.dumps(line) for line in lines), '.ndjson')
+
+        self.assertIn('4 rows staged, 1 rows merged', out)
+        self.assertEqual(
+            Invitation.objects.get(workspace=self.workspace, user_id=3).status,
+            InvitationStatus.ACCEPTED.name
+        )
+        self.assertEqual(Invitation.objects.count(), 2)
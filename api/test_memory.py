@@ -0,0 +1,54 @@
+import signal
+import tracemalloc
+from unittest import mock
+from django.test import SimpleTestCase, Client, override_settings
+from rest_framework import status
+
+from api import memory
+
+
+class TestMemory(SimpleTestCase):
+    def setUp(self):
+        tracemalloc.start()
+
+    def tearDown(self):
+        tracemalloc.stop()
+
+    def test_growth_between_snapshots(self):
+        monitor = memory.MemoryMonitor(interval=60, limit=10)
+        monitor.snapshot()
+
+        self.leak = [bytearray(1024) for _ in range(1000)]
+        monitor.snapshot()
+
+        self.assertTrue(monitor.last_growth)
+        self.assertTrue(monitor.last_growth[0]['file'].endswith('test_memory.py'))
+        self.assertGreater(monitor.last_growth[0]['sizeDiffKb'], 1000)
+
+    @override_settings(INTERNAL_API_TOKEN='internal-token')
+    def test_stats_view(self):
+        res = Client().get('/internal/memory', HTTP_X_INTERNAL_TOKEN='internal-token')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.json().get('tracing'))
+        self.assertTrue(res.json().get('top'))
+
+
+class TestRssGuard(SimpleTestCase):
+    def tearDown(self):
+        memory._recycling = False
+
+    @override_settings(MEMORY_MAX_RSS_MB=1)
+    def test_worker_recycled_over_limit(self):
+        with mock.patch('api.memory.os.kill') as mock_kill:
+            memory.check_rss()
+            memory.check_rss()
+
+        mock_kill.assert_called_once_with(mock.ANY, signal.SIGTERM)
+
+    @override_settings(MEMORY_MAX_RSS_MB=1024 * 1024)
+    def test_worker_kept_under_limit(self):
+        with mock.patch('api.memory.os.kill') as mock_kill:
+            memory.check_rss()
+
+        mock_kill.assert_not_called()
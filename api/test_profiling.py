@@ -0,0 +1,110 @@
+import io
+import shutil
+import tempfile
+import time
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import SimpleTestCase, Client, RequestFactory, override_settings
+from rest_framework import status
+
+from api import context, profiling
+from api.middlewares.profiling import ProfilingMiddleware
+
+
+def slow_view(request):
+    time.sleep(0.05)
+    return HttpResponse()
+
+
+class TestProfiling(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_fold(self):
+        def inner():
+            return profiling.fold(__import__('sys')._getframe())
+
+        stack = inner()
+        self.assertTrue(stack.endswith('test_profiling.py:test_fold;test_profiling.py:inner'))
+
+    def test_store_keeps_most_recent_profiles(self):
+        store = profiling.ProfileStore(self.directory, max_profiles=2)
+        ids = []
+        for index in range(3):
+            ids.append(store.save({ 'path': f'/workspace/{index}', 'stacks': {} }))
+            time.sleep(0.002)
+
+        self.assertEqual([profile['id'] for profile in store.all()], [ids[2], ids[1]])
+        self.assertIsNone(store.get(ids[0]))
+        self.assertIsNone(store.get('../secret'))
+
+    def test_slow_request_profiled(self):
+        with override_settings(PROFILING=True, PROFILING_SLOW_MS=10, PROFILING_INTERVAL_MS=1,
+                               PROFILING_DIR=self.directory):
+            context.begin()
+            ProfilingMiddleware(slow_view)(RequestFactory().get('/workspace/'))
+            ProfilingMiddleware(lambda request: HttpResponse())(RequestFactory().get('/invitation/'))
+            context.end()
+
+            profiles = profiling.ProfileStore().all()
+
+        self.assertEqual(len(profiles), 1)
+        self.assertEqual(profiles[0]['path'], '/workspace/')
+        self.assertTrue(any('test_profiling.py:slow_view' in stack for stack in profiles[0]['stacks']))
+
+    def test_dump_command(self):
+        store = profiling.ProfileStore(self.directory, max_profiles=5)
+        store.save({ 'stacks': { 'a.py:main;b.py:view': 3 } })
+        store.save({ 'stacks': { 'a.py:main;b.py:view': 2, 'a.py:main': 1 } })
+
+        out = io.StringIO()
+        call_command('dump_profiles', directory=self.directory, stdout=out)
+
+        self.assertEqual(out.getvalue(), 'a.py:main 1\na.py:main;b.py:view 5\n')
+
+
+@override_settings(INTERNAL_API_TOKEN='internal-token')
+class TestProfileViews(SimpleTestCase):
+    def setUp(self):
+        self.client = Client()
+        self.headers = {
+            'HTTP_X_INTERNAL_TOKEN': 'internal-token'
+        }
+        self.directory = tempfile.mkdtemp()
+        self.settings = override_settings(PROFILING_DIR=self.directory)
+        self.settings.enable()
+        self.profile_id = profiling.ProfileStore().save({
+            'method': 'GET',
+            'path': '/workspace/',
+            'stacks': { 'a.py:main;b.py:view': 3 }
+        })
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.directory)
+
+    def test_internal_token_must_be_provided(self):
+        res = self.client.get('/internal/profiles')
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_list(self):
+        res = self.client.get('/internal/profiles', **self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()[0].get('id'), self.profile_id)
+        self.assertEqual(res.json()[0].get('samples'), 3)
+
+    def test_detail(self):
+        res = self.client.get(f'/internal/profiles/{self.profile_id}', **self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.content, b'a.py:main;b.py:view 3\n')
+
+    def test_unknown_profile(self):
+        res = self.client.get('/internal/profiles/0123', **self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,74 @@
+import io
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from api.caches import invitation_counts
+from api.models import (
+    Workspace,
+    Invitation,
+    ArchivedWorkspace,
+    ArchivedInvitation
+)
+
+
+class TestPurgeDeleted(TransactionTestCase):
+    def setUp(self):
+        old = timezone.now() - timedelta(days=100)
+
+        self.live_workspace = Workspace.objects.create(name="Live", users=[1])
+        self.recently_deleted = Workspace.objects.create(name="Recently deleted", users=[1])
+        self.recently_deleted.delete()
+        self.old_deleted = Workspace.objects.create(name="Old deleted", users=[1, 2])
+        Invitation.objects.create(workspace=self.old_deleted, sender="email@example.com", user_id=2)
+        Workspace.raw_objects.filter(pk=self.old_deleted.pk).update(deleted_at=old)
+
+        self.live_invitation = Invitation.objects.create(workspace=self.live_workspace, sender="email@example.com", user_id=2)
+        self.old_invitation = Invitation.objects.create(workspace=self.live_workspace, sender="email@example.com", user_id=3)
+        Invitation.raw_objects.filter(pk=self.old_invitation.pk).update(deleted_at=old)
+
+    def purge(self, *args):
+        out = io.StringIO()
+        call_command('purge_deleted', '--retention-days', '90', '--batch-size', '1', '--sleep', '0', *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_moves_nothing(self):
+        out = self.purge('--dry-run')
+
+        self.assertIn('[invitation] 2 rows would be moved', out)
+        # Old deleted workspace still has an invitation, purged before it
+        self.assertIn('[workspace] 1 rows would be moved', out)
+        self.assertEqual(Workspace.raw_objects.count(), 3)
+        self.assertEqual(Invitation.raw_objects.count(), 3)
+
+    def test_purge_archives_old_deleted_rows(self):
+        self.purge()
+
+        self.assertEqual(
+            sorted(Workspace.raw_objects.values_list('id', flat=True)),
+            sorted([self.live_workspace.id, self.recently_deleted.id])
+        )
+        self.assertEqual(list(Invitation.raw_objects.values_list('id', flat=True)), [self.live_invitation.id])
+
+        archived = ArchivedWorkspace.objects.get()
+        self.assertEqual(archived.id, self.old_deleted.id)
+        self.assertEqual(archived.users, [1, 2])
+        self.assertEqual(ArchivedInvitation.objects.count(), 2)
+
+    def test_purge_invalidates_invitation_counts(self):
+        cache.clear()
+        self.assertEqual(invitation_counts.user_invitation_counts(2)['PENDING'], 2)
+
+        self.purge()
+
+        # Live invitation of the purged workspace is gone
+        self.assertEqual(invitation_counts.user_invitation_counts(2)['PENDING'], 1)
+
+    def test_purge_without_archive(self):
+        self.purge('--no-archive')
+
+        self.assertEqual(Workspace.raw_objects.count(), 2)
+        self.assertEqual(ArchivedWorkspace.objects.count(), 0)
+        self.assertEqual(ArchivedInvitation.objects.count(), 0)
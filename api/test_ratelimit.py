@@ -0,0 +1,104 @@
+import jwt
+from unittest import mock
+from django.test import SimpleTestCase, RequestFactory, override_settings
+from rest_framework import status
+from rest_framework.response import Response
+
+from api import context, ratelimit
+from api.authenticator import authenticate
+
+
+class TestTokenBucket(SimpleTestCase):
+    def test_burst_then_refill(self):
+        bucket = None
+        for _ in range(3):
+            bucket, allowed, _ = ratelimit._take(bucket, 3, 1, 0)
+            self.assertTrue(allowed)
+
+        bucket, allowed, retry_after = ratelimit._take(bucket, 3, 1, 0)
+        self.assertFalse(allowed)
+        self.assertEqual(retry_after, 1)
+
+        _, allowed, _ = ratelimit._take(bucket, 3, 1, 1)
+        self.assertTrue(allowed)
+
+    def test_refill_capped_to_capacity(self):
+        bucket, _, _ = ratelimit._take(None, 3, 1, 0)
+
+        bucket, _, _ = ratelimit._take(bucket, 3, 1, 1000)
+        self.assertEqual(bucket[0], 2)
+
+
+class TestLocalBackend(SimpleTestCase):
+    def test_keys_are_separated(self):
+        backend = ratelimit.LocalBackend()
+
+        self.assertTrue(backend.consume('read:1', 1, 0.001)[0])
+        self.assertFalse(backend.consume('read:1', 1, 0.001)[0])
+        self.assertTrue(backend.consume('read:2', 1, 0.001)[0])
+
+    def test_idle_buckets_are_forgotten(self):
+        backend = ratelimit.LocalBackend()
+        backend.max_keys = 1
+
+        with mock.patch('api.ratelimit.time.monotonic', return_value=0):
+            backend.consume('read:1', 1, 1)
+        with mock.patch('api.ratelimit.time.monotonic', return_value=10):
+            backend.consume('read:2', 1, 1)
+
+        self.assertEqual(list(backend.buckets), ['read:2'])
+
+
+@override_settings(
+    RATE_LIMIT=True,
+    RATE_LIMIT_BACKEND='api.ratelimit.LocalBackend',
+    RATE_LIMIT_READ_BURST=2,
+    RATE_LIMIT_READ_PER_SECOND=0.5,
+    RATE_LIMIT_WRITE_BURST=1,
+    RATE_LIMIT_WRITE_PER_SECOND=0.5
+)
+class TestAuthenticateRateLimit(SimpleTestCase):
+    def setUp(self):
+        ratelimit._backends.clear()
+        self.factory = RequestFactory()
+        raw_token = jwt.encode({
+                'userId': 1,
+                'email': 'email@example.com'
+            },
+            'secret'
+        )
+        self.headers = {
+            'HTTP_AUTHORIZATION': f"Bearer {raw_token.decode('utf-8')}"
+        }
+        self.view = authenticate(lambda view, request, user=None, token=None: Response(status=status.HTTP_200_OK))
+
+    def tearDown(self):
+        ratelimit._backends.clear()
+
+    def call(self, request):
+        context.begin()
+        try:
+            return self.view(None, request)
+        finally:
+            context.end()
+
+    def test_read_budget(self):
+        for _ in range(2):
+            self.assertEqual(self.call(self.factory.get('/workspace/', **self.headers)).status_code, status.HTTP_200_OK)
+
+        res = self.call(self.factory.get('/workspace/', **self.headers))
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res['Retry-After'], '2')
+
+    def test_write_budget_is_separated(self):
+        self.assertEqual(self.call(self.factory.post('/workspace/', **self.headers)).status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.call(self.factory.post('/workspace/', **self.headers)).status_code,
+            status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertEqual(self.call(self.factory.get('/workspace/', **self.headers)).status_code, status.HTTP_200_OK)
+
+    @override_settings(RATE_LIMIT=False)
+    def test_disabled(self):
+        for _ in range(5):
+            self.assertEqual(self.call(self.factory.post('/workspace/', **self.headers)).status_code, status.HTTP_200_OK)
@@ -0,0 +1,51 @@
+import datetime
+from collections import OrderedDict
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONRenderer
+
+
+class TestFastJSONRenderer(SimpleTestCase):
+    def assertSameRendering(self, data):
+        self.assertEqual(
+            FastJSONRenderer().render(data),
+            JSONRenderer().render(data)
+        )
+
+    def test_render_workspaces(self):
+        self.assertSameRendering([
+            OrderedDict([
+                ('id', 1),
+                ('users', [{'id': 1, 'email': 'email@example.com'}, 2]),
+                ('created_at', '2020-01-01T10:00:00.123456'),
+                ('deleted_at', None),
+                ('name', 'Wörkspace ✓'),
+            ])
+        ])
+
+    def test_render_string(self):
+        self.assertSameRendering("Permission denied")
+
+    def test_render_none(self):
+        self.assertSameRendering(None)
+
+    def test_render_errors(self):
+        self.assertSameRendering({'name': [ErrorDetail('This field is required.', code='required')]})
+
+    def test_render_datetimes(self):
+        self.assertSameRendering({
+            'naive': datetime.datetime(2020, 1, 1, 10, 0, 0, 123),
+            'utc': datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc),
+            'date': datetime.date(2020, 1, 1),
+        })
+
+    def test_render_javascript_line_separators(self):
+        self.assertSameRendering({'name': 'a\u2028b\u2029c'})
+
+    def test_render_non_string_keys(self):
+        self.assertSameRendering({1: 'a'})
+
+    def test_render_big_integers(self):
+        self.assertSameRendering({'id': 2 ** 70})
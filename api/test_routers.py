@@ -0,0 +1,54 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.test import SimpleTestCase, override_settings
+
+from api import context
+from api.routers import ReplicaRouter, record_user_write, has_recent_write
+from api.models import Workspace
+
+
+@override_settings(DB_REPLICAS=['replica_0'], DB_REPLICA_PIN_SECONDS=5)
+class TestReplicaRouter(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.context = context.begin()
+
+    def tearDown(self):
+        context.end()
+
+    def test_read_only_request_reads_from_replica(self):
+        self.context.read_only = True
+
+        self.assertEqual(self.router.db_for_read(Workspace), 'replica_0')
+
+    def test_write_request_reads_from_primary(self):
+        self.context.read_only = False
+
+        self.assertEqual(self.router.db_for_read(Workspace), DEFAULT_DB_ALIAS)
+
+    def test_writes_go_to_primary(self):
+        self.context.read_only = True
+
+        self.assertEqual(self.router.db_for_write(Workspace), DEFAULT_DB_ALIAS)
+
+    def test_pinned_request_reads_from_primary(self):
+        self.context.read_only = True
+        self.context.use_primary = True
+
+        self.assertEqual(self.router.db_for_read(Workspace), DEFAULT_DB_ALIAS)
+
+    def test_migrations_only_on_primary(self):
+        self.assertTrue(self.router.allow_migrate(DEFAULT_DB_ALIAS, 'api'))
+        self.assertFalse(self.router.allow_migrate('replica_0', 'api'))
+
+    def test_user_write_is_recorded(self):
+        self.assertFalse(has_recent_write(42))
+
+        record_user_write(42)
+
+        self.assertTrue(has_recent_write(42))
+
+    @override_settings(DB_REPLICAS=[])
+    def test_no_pin_without_replicas(self):
+        record_user_write(43)
+
+        self.assertFalse(has_recent_write(43))
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from api.startup import measure_startup, parse_importtime
+
+
+class TestStartup(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Best of a few fresh interpreters, the first one warms the file cache
+        cls.measures = [measure_startup() for _ in range(3)]
+
+    def test_first_response(self):
+        for measure in self.measures:
+            self.assertEqual(measure['status'], '200 OK')
+
+    def test_heavy_integrations_imported_lazily(self):
+        modules = self.measures[-1]['modules']
+
+        self.assertNotIn('sendgrid', modules)
+        self.assertNotIn('django_extensions', modules)
+
+    def test_startup_budget(self):
+        best = min(measure['bootMs'] + measure['firstResponseMs'] for measure in self.measures)
+
+        self.assertLess(best, settings.STARTUP_BUDGET_MS)
+
+    def test_parse_importtime(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       100 |        100 |     django.utils\n"
+            "import time:        50 |        150 |   django\n"
+            "import time:        20 |         20 | api\n"
+        )
+
+        self.assertEqual(parse_importtime(output), { 'django': 150, 'api': 20 })
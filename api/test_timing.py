@@ -0,0 +1,62 @@
+from unittest import mock
+from django.http import HttpResponse
+from django.test import SimpleTestCase, RequestFactory, override_settings
+
+from api import context, timing
+from api.externals.http import Http
+from api.middlewares.timing import ServerTimingMiddleware
+
+
+class TestTiming(SimpleTestCase):
+    def setUp(self):
+        context.begin()
+
+    def tearDown(self):
+        context.end()
+
+    def test_timers_accumulate(self):
+        with mock.patch('api.timing.time.perf_counter', side_effect=[0, 0.002, 1, 1.003]):
+            with timing.timer('db'):
+                pass
+            with timing.timer('db'):
+                pass
+
+        total, count = context.get().timings['db']
+        self.assertAlmostEqual(total, 0.005)
+        self.assertEqual(count, 2)
+
+    def test_server_timing(self):
+        self.assertEqual(
+            timing.server_timing({ 'auth': (0.0012, 1), 'db': (0.01, 3) }, 0.05),
+            'auth;dur=1.2;desc="1", db;dur=10.0;desc="3", total;dur=50.0'
+        )
+
+    def test_external_calls_timed_per_service(self):
+        with mock.patch.object(Http, '_Http__session') as session:
+            session.get.return_value = mock.Mock(status_code=200)
+            Http.get('http://iam/permission', service='iam-permission')
+            Http.get('http://iam/permission', service='iam-permission')
+
+        self.assertEqual(context.get().timings['iam-permission'][1], 2)
+
+
+@override_settings(SERVER_TIMING=True)
+class TestServerTimingMiddleware(SimpleTestCase):
+    def test_header_added(self):
+        def view(request):
+            timing.record('auth', 0.001)
+            return HttpResponse()
+
+        context.begin()
+        try:
+            res = ServerTimingMiddleware(view)(RequestFactory().get('/workspace/'))
+        finally:
+            context.end()
+
+        self.assertTrue(res['Server-Timing'].startswith('auth;dur=1.0;desc="1", total;dur='))
+
+    @override_settings(SERVER_TIMING=False)
+    def test_disabled(self):
+        res = ServerTimingMiddleware(lambda request: HttpResponse())(RequestFactory().get('/workspace/'))
+
+        self.assertFalse(res.has_header('Server-Timing'))
@@ -0,0 +1,133 @@
+import json
+import os
+import tempfile
+import threading
+from unittest import mock
+from django.http import HttpResponse
+from django.test import SimpleTestCase, RequestFactory, override_settings
+
+from api import context, tracing
+from api.externals.http import Http
+from api.middlewares.tracing import TracingMiddleware
+from api.serializers import fast
+
+
+TRACEPARENT = '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01'
+
+
+class TestTracing(SimpleTestCase):
+    def setUp(self):
+        context.begin()
+
+    def tearDown(self):
+        context.end()
+
+    def test_parse_traceparent(self):
+        self.assertEqual(
+            tracing.parse_traceparent(TRACEPARENT),
+            ('0af7651916cd43dd8448eb211c80319c', 'b7ad6b7169203331', True)
+        )
+        self.assertIsNone(tracing.parse_traceparent('00-xyz-b7ad6b7169203331-01'))
+        self.assertIsNone(tracing.parse_traceparent('garbage'))
+
+    @override_settings(TRACING_SAMPLE_RATE=0)
+    def test_caller_sampling_decision_is_kept(self):
+        trace = tracing.start_trace(TRACEPARENT)
+
+        self.assertTrue(trace.sampled)
+        self.assertEqual(trace.trace_id, '0af7651916cd43dd8448eb211c80319c')
+
+    @override_settings(TRACING_SAMPLE_RATE=0)
+    def test_unsampled_trace_records_nothing(self):
+        trace = tracing.start_trace()
+
+        with tracing.span('view') as span:
+            self.assertIsNone(span)
+        self.assertEqual(trace.spans, [])
+
+    @override_settings(TRACING_SAMPLE_RATE=1)
+    def test_nested_spans(self):
+        trace = tracing.start_trace()
+
+        with tracing.span('view') as view_span:
+            with tracing.span('db') as db_span:
+                pass
+
+        self.assertEqual(db_span.parent_id, view_span.span_id)
+        self.assertIsNone(view_span.parent_id)
+        self.assertEqual([span.name for span in trace.spans], ['db', 'view'])
+
+    @override_settings(TRACING_SAMPLE_RATE=1)
+    def test_serializer_span(self):
+        trace = tracing.start_trace()
+
+        fast.serialize_invitations([])
+
+        self.assertEqual([span.name for span in trace.spans], ['serialize invitations'])
+
+    @override_settings(TRACING_SAMPLE_RATE=1)
+    def test_trace_context_sent_downstream(self):
+        trace = tracing.start_trace()
+
+        with mock.patch.object(Http, '_Http__session') as session:
+            session.get.return_value = mock.Mock(status_code=200)
+            with tracing.span('view') as view_span:
+                Http.get('http://iam/users', service='iam')
+
+        http_span = trace.spans[0]
+        self.assertEqual(http_span.name, 'http iam')
+        self.assertEqual(http_span.parent_id, view_span.span_id)
+        self.assertEqual(
+            session.get.call_args[1]['headers']['traceparent'],
+            f'00-{trace.trace_id}-{http_span.span_id}-01'
+        )
+
+
+class TestTracingMiddleware(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.trace_file = tempfile.NamedTemporaryFile(delete=False)
+        self.trace_file.close()
+        tracing._exporters.clear()
+
+    def tearDown(self):
+        os.remove(self.trace_file.name)
+        tracing._exporters.clear()
+
+    def test_sampled_request_exported(self):
+        def view(request):
+            with tracing.span('view'):
+                return HttpResponse()
+
+        with override_settings(TRACING_SAMPLE_RATE=1, TRACING_FILE=self.trace_file.name,
+                               TRACING_EXPORTER='api.tracing.FileExporter'):
+            context.begin()
+            TracingMiddleware(view)(self.factory.get('/workspace/'))
+            context.end()
+            tracing.flush()
+
+        with open(self.trace_file.name) as trace_file:
+            spans = [json.loads(line) for line in trace_file]
+        self.assertEqual([span['name'] for span in spans], ['view', 'GET /workspace/'])
+        self.assertEqual(spans[1]['attributes']['status'], 200)
+        self.assertEqual(spans[0]['parentId'], spans[1]['spanId'])
+
+    @override_settings(TRACING_SAMPLE_RATE=1)
+    def test_exported_outside_of_the_request(self):
+        threads = []
+
+        def export(spans):
+            threads.append(threading.current_thread().name)
+
+        def view(request):
+            with tracing.span('view'):
+                return HttpResponse()
+
+        with mock.patch.object(tracing, 'get_exporter') as get_exporter:
+            get_exporter.return_value.export.side_effect = export
+            context.begin()
+            TracingMiddleware(view)(self.factory.get('/workspace/'))
+            context.end()
+            tracing.flush()
+
+        self.assertEqual(threads, ['tracing-export'])
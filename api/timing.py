@@ -0,0 +1,47 @@
+"""
+Time spent per phase of the request (authentication, IAM, database,
+rendering...), sent back in the Server-Timing response header.
+"""
+import contextlib
+import time
+
+from api import context
+
+
+@contextlib.contextmanager
+def timer(name):
+    """
+    Add the time spent in the block to the ``name`` phase of the request
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def record(name, duration):
+    timings = context.get().timings
+    total, count = timings.get(name, (0, 0))
+    timings[name] = (total + duration, count + 1)
+
+
+def db_wrapper(execute, sql, params, many, query_context):
+    """
+    connection.execute_wrapper timing queries
+    """
+    with timer('db'):
+        return execute(sql, params, many, query_context)
+
+
+def server_timing(timings, total=None):
+    """
+    Server-Timing header value of ``timings``, durations in milliseconds
+    """
+    metrics = [
+        f'{name};dur={duration * 1000:.1f};desc="{count}"'
+        for name, (duration, count) in timings.items()
+    ]
+    if total is not None:
+        metrics.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(metrics)
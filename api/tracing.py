@@ -0,0 +1,235 @@
+"""
+Lightweight request tracing.
+
+A trace is started for each request, sampled with TRACING_SAMPLE_RATE unless
+the caller already decided through a W3C ``traceparent`` header. Views, ORM
+queries, external calls, serializers and rendering record spans, handed to
+a background thread once the response is built and sent by TRACING_EXPORTER.
+Unsampled requests only pay for a few checks.
+"""
+import contextlib
+import functools
+import json
+import os
+import queue
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from api import context
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class Span():
+    def __init__(self, trace_id, span_id, parent_id, name, attributes=None):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes or {}
+        self.start = time.time()
+        self.duration = None
+
+    def finish(self):
+        self.duration = time.time() - self.start
+
+    def to_dict(self):
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentId': self.parent_id,
+            'name': self.name,
+            'start': self.start,
+            'durationMs': round(self.duration * 1000, 3) if self.duration is not None else None,
+            'attributes': self.attributes,
+        }
+
+
+class Trace():
+    def __init__(self, trace_id, parent_id=None, sampled=False):
+        self.trace_id = trace_id
+        # Span of the caller, parent of the request root span
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.stack = []
+        self.spans = []
+
+    @property
+    def current_span_id(self):
+        return self.stack[-1].span_id if self.stack else self.parent_id
+
+
+def _new_id(size):
+    return f'{random.getrandbits(size * 8):0{size * 2}x}'
+
+
+def parse_traceparent(header):
+    """
+    (trace id, parent span id, sampled) of a W3C traceparent header, None if malformed
+    """
+    try:
+        version, trace_id, parent_id, flags = header.strip().split('-')
+        int(trace_id, 16), int(parent_id, 16)
+        sampled = bool(int(flags, 16) & 1)
+    except (AttributeError, ValueError):
+        return None
+    if len(version) != 2 or len(trace_id) != 32 or len(parent_id) != 16 \
+            or trace_id == '0' * 32 or parent_id == '0' * 16:
+        return None
+    return trace_id.lower(), parent_id.lower(), sampled
+
+
+def start_trace(traceparent=None):
+    """
+    Start the trace of the current request, continuing the caller one if any
+    """
+    parent = parse_traceparent(traceparent) if traceparent else None
+    if parent is not None:
+        trace = Trace(*parent)
+    else:
+        trace = Trace(_new_id(16), sampled=random.random() < settings.TRACING_SAMPLE_RATE)
+    context.get().trace = trace
+    return trace
+
+
+def finish_trace():
+    trace = context.get().trace
+    context.get().trace = None
+    if trace is not None and trace.sampled and trace.spans:
+        try:
+            get_export_queue().put_nowait([span.to_dict() for span in trace.spans])
+        except queue.Full:
+            logger.warning(f"Trace export queue full, trace {trace.trace_id} dropped")
+
+
+def is_sampled():
+    trace = context.get().trace
+    return trace is not None and trace.sampled
+
+
+@contextlib.contextmanager
+def span(name, **attributes):
+    """
+    Record a span around the block, yield it (None when not sampled)
+    so attributes can be added
+    """
+    trace = context.get().trace
+    if trace is None or not trace.sampled:
+        yield None
+        return
+
+    current = Span(trace.trace_id, _new_id(8), trace.current_span_id, name, attributes)
+    trace.stack.append(current)
+    try:
+        yield current
+    except Exception as e:
+        current.attributes['error'] = type(e).__name__
+        raise
+    finally:
+        current.finish()
+        trace.stack.pop()
+        trace.spans.append(current)
+
+
+def traced(name):
+    """
+    Decorator recording a ``name`` span around each call
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traceparent():
+    """
+    traceparent header to send to downstream services, None outside of a trace
+    """
+    trace = context.get().trace
+    if trace is None:
+        return None
+    return f"00-{trace.trace_id}-{trace.current_span_id or _new_id(8)}-{'01' if trace.sampled else '00'}"
+
+
+def db_wrapper(execute, sql, params, many, query_context):
+    """
+    connection.execute_wrapper recording a span per query (or executemany batch)
+    """
+    with span('db', alias=query_context['connection'].alias, sql=sql, many=many):
+        return execute(sql, params, many, query_context)
+
+
+class FileExporter():
+    """
+    Append spans as JSON lines to TRACING_FILE, to be shipped by a collector
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def export(self, spans):
+        lines = ''.join(json.dumps(span_dict) + '\n' for span_dict in spans)
+        with self.lock, open(settings.TRACING_FILE, 'a') as trace_file:
+            trace_file.write(lines)
+
+
+class CollectorExporter():
+    """
+    POST spans as a JSON array to TRACING_COLLECTOR_URL
+    """
+    def export(self, spans):
+        import requests
+
+        requests.post(settings.TRACING_COLLECTOR_URL, json=spans, timeout=settings.TRACING_EXPORT_TIMEOUT)
+
+
+_exporters = {}
+
+
+def get_exporter():
+    path = settings.TRACING_EXPORTER
+    if path not in _exporters:
+        _exporters[path] = import_string(path)()
+    return _exporters[path]
+
+
+_export_queue = None
+_export_queue_pid = None
+
+
+def _export(export_queue):
+    while True:
+        spans = export_queue.get()
+        try:
+            get_exporter().export(spans)
+        except Exception as e:
+            logger.error(f"Unable to export trace {spans[0]['traceId']} ({e})")
+        finally:
+            export_queue.task_done()
+
+
+def get_export_queue():
+    """
+    Traces waiting for the export thread, exporters are never called from a request
+    """
+    # Threads don't survive fork, each worker needs its own
+    global _export_queue, _export_queue_pid
+    if _export_queue_pid != os.getpid():
+        _export_queue = queue.Queue(maxsize=settings.TRACING_EXPORT_QUEUE_SIZE)
+        _export_queue_pid = os.getpid()
+        threading.Thread(target=_export, args=(_export_queue,), name='tracing-export', daemon=True).start()
+    return _export_queue
+
+
+def flush():
+    """
+    Wait for the traces already finished to be exported
+    """
+    get_export_queue().join()
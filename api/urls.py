@@ -8,7 +8,17 @@ urlpatterns = [
     path('workspace/<int:pk>/', views.WorkspaceDetail.as_view()),
     path('invitation/', views.InvitationList.as_view()),
     path('invitation/status/<str:status>', views.InvitationList.as_view()),
+    path('invitation/count', views.InvitationCount.as_view()),
     path('invitation/<int:pk>/', views.InvitationDetail.as_view()),
+    path('internal/membership/workspace/<int:workspace_id>/user/<int:user_id>', views.MembershipDetail.as_view()),
+    path('internal/membership/user/<int:user_id>', views.UserMembershipList.as_view()),
+    path('internal/membership/batch', views.MembershipBatch.as_view()),
+    path('internal/iam/events', views.IamEvents.as_view()),
+    path('internal/export/<str:name>', views.Export.as_view()),
+    path('internal/profiles', views.ProfileList.as_view()),
+    path('internal/profiles/<str:profile_id>', views.ProfileDetail.as_view()),
+    path('internal/memory', views.MemoryStats.as_view()),
+    path('batch', views.Batch.as_view()),
     path('ping', views.Ping.as_view()),
     path('health', views.Health.as_view()),
 ]
@@ -4,10 +4,38 @@ from .workspace import (
 )
 
 from .invitation import (
+    InvitationCount,
     InvitationDetail,
     InvitationList,
 )
 
+from .membership import (
+    MembershipDetail,
+    UserMembershipList,
+    MembershipBatch,
+)
+
+from .iam import (
+    IamEvents,
+)
+
+from .export import (
+    Export,
+)
+
+from .batch import (
+    Batch,
+)
+
+from .profiling import (
+    ProfileList,
+    ProfileDetail,
+)
+
+from .memory import (
+    MemoryStats,
+)
+
 from .health import (
     Ping,
     Health
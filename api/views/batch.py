@@ -0,0 +1,99 @@
+import io
+import json
+import logging
+
+from django.core.handlers.base import BaseHandler
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import resolve, Resolver404
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+
+from api.authenticator import authenticate
+from api.middlewares.context import SUB_REQUEST
+from api.serializers import BatchSerializer
+
+
+logger = logging.getLogger(__name__)
+
+
+_handler = None
+
+
+def get_handler():
+    """
+    Handler running sub-requests through the middlewares, as the requests they stand for
+    """
+    global _handler
+    if _handler is None:
+        _handler = BaseHandler()
+        _handler.load_middleware()
+    return _handler
+
+
+class Batch(APIView):
+    """
+    Run several API calls in one round trip.
+    Sub-requests go through the middlewares and are rate limited as separate
+    requests, but are authenticated once and share the request context
+    (IAM users and permissions already fetched are not fetched again).
+    """
+    # Only sub-requests write and count against the rate limit
+    writes = False
+    rate_limited = False
+
+    @staticmethod
+    def __build_request(request, sub_request):
+        path, _, query_string = sub_request['path'].partition('?')
+        body = b''
+        if 'body' in sub_request:
+            body = json.dumps(sub_request['body']).encode('utf-8')
+
+        environ = request.META.copy()
+        environ.update({
+            'REQUEST_METHOD': sub_request['method'],
+            'PATH_INFO': path,
+            'QUERY_STRING': query_string,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': io.BytesIO(body),
+            SUB_REQUEST: True,
+        })
+        return WSGIRequest(environ)
+
+    @staticmethod
+    def __run(request, sub_request):
+        try:
+            match = resolve(sub_request['path'].partition('?')[0])
+        except Resolver404:
+            return status.HTTP_404_NOT_FOUND, "Not found"
+
+        if getattr(match.func, 'view_class', None) is Batch:
+            return status.HTTP_400_BAD_REQUEST, "Batch requests can't be nested"
+
+        response = get_handler().get_response(Batch.__build_request(request, sub_request))
+
+        if response.streaming:
+            return status.HTTP_400_BAD_REQUEST, "Streaming routes can't be batched"
+
+        if hasattr(response, 'data'):
+            return response.status_code, response.data
+        if response.status_code >= 500:
+            # Error page of the exception
+            return response.status_code, "Internal server error"
+        return response.status_code, response.content.decode('utf-8')
+
+    @authenticate
+    def post(self, request, format=None, user=None, token=None):
+        serializer = BatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            logger.warning(f"Unable to validate batch request : {serializer.errors}")
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        responses = []
+        for sub_request in serializer.validated_data['requests']:
+            status_code, body = Batch.__run(request, sub_request)
+            logger.info(f"Batched {sub_request['method']} {sub_request['path']} : {status_code}")
+            responses.append({ 'status': status_code, 'body': body })
+
+        return Response({ 'responses': responses })
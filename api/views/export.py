@@ -0,0 +1,55 @@
+import logging
+
+from django.http import Http404, StreamingHttpResponse
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+
+from api.authenticator import authenticate_internal
+from api.exports import EXPORTS, export_queryset, export_lines
+from api.serializers import ExportQuerySerializer
+
+
+logger = logging.getLogger(__name__)
+
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+class Export(APIView):
+    """
+    Stream every workspace or invitation, soft-deleted ones included,
+    as NDJSON or CSV (?output=csv). Used for analytics and billing reconciliation.
+    """
+    @authenticate_internal
+    def get(self, request, name, format=None):
+        if name not in EXPORTS:
+            raise Http404
+
+        # Plain dict, html input would turn a missing boolean into False
+        serializer = ExportQuerySerializer(data=request.query_params.dict())
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = serializer.validated_data
+
+        if 'status' in params and name != 'invitation':
+            return Response("Status filter is only available on invitations", status=status.HTTP_400_BAD_REQUEST)
+
+        logger.info(f"Exporting {name} ({params})")
+        queryset = export_queryset(
+            name,
+            since=params.get('since'),
+            until=params.get('until'),
+            status=params.get('status'),
+            deleted=params.get('deleted')
+        )
+
+        response = StreamingHttpResponse(
+            export_lines(name, queryset, params['output']),
+            content_type=CONTENT_TYPES[params['output']]
+        )
+        response['Content-Disposition'] = f'attachment; filename="{name}.{params["output"]}"'
+        return response
@@ -0,0 +1,29 @@
+import logging
+
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+
+from api.authenticator import authenticate_internal
+from api.externals.iam import events
+from api.serializers import IamEventBatchSerializer
+
+
+logger = logging.getLogger(__name__)
+
+
+class IamEvents(APIView):
+    """
+    Changes of users and permissions pushed by IAM, applied to the local
+    IAM cache and snapshots
+    """
+    @authenticate_internal
+    def post(self, request, format=None):
+        serializer = IamEventBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            logger.warning(f"Unable to validate IAM events : {serializer.errors}")
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        iam_events = serializer.validated_data['events']
+        events.apply(iam_events)
+        return Response({ 'applied': len(iam_events) })
@@ -5,17 +5,20 @@ from django.http import Http404
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.status import HTTP_400_BAD_REQUEST
 
 from api.externals.iam import ExternalUsers, ExternalWorkspacePermission
 from api.externals.sendgrid import ExternalMail
 from api.externals.notifier import ExternalNotify
 from api.authenticator import authenticate
+from api.caches import invitation_counts
 from api.models import (
     Invitation,
     InvitationStatus,
     WorkspacePermission
 )
 from api.serializers import (
+    fast,
     FullInvitationSerializer,
     CreateInvitationSerializer,
     InvitationSerializer,
@@ -31,13 +34,25 @@ class InvitationList(APIView):
     def get(self, request, status=None, format=None, user=None, token=None):
         """
         Retrieve every users invitation. Can be filtered with status param
+        Fields can be selected with ?fields=id,status
         """
+        # status is shadowed by the url parameter here
+        try:
+            fields = fast.requested_fields(request.query_params, fast.INVITATION_FIELDS)
+        except ValueError as e:
+            return Response(str(e), status=HTTP_400_BAD_REQUEST)
+
         invitations = Invitation.objects.filter(user_id=user.id)
         if status != None:
             invitations = invitations.filter(status=status)
+        # Creation order, whatever index the planner picks
+        invitations = invitations.order_by('id')
 
-        serializer = FullInvitationSerializer(invitations, many=True)
-        return Response(serializer.data)
+        if fields is None:
+            return Response(fast.serialize_invitations(fast.invitation_rows(invitations)))
+
+        rows = fast.invitation_fields_rows(invitations, fields)
+        return Response(fast.serialize_invitations_fields(rows, fields))
 
     @authenticate
     def post(self, request, format=None, user=None, token=None):
@@ -97,6 +112,15 @@ class InvitationList(APIView):
         return Response(result, status=status.HTTP_201_CREATED)
 
 
+class InvitationCount(APIView):
+    """
+    Number of invitations of the user per status
+    """
+    @authenticate
+    def get(self, request, format=None, user=None, token=None):
+        return Response(invitation_counts.user_invitation_counts(user.id))
+
+
 class InvitationDetail(APIView):
     """
     Retrieve, update or delete a invitation instance.
@@ -109,12 +133,33 @@ class InvitationDetail(APIView):
 
     @authenticate
     def get(self, request, pk, format=None, user=None, token=None):
-        invitation = self.get_object(pk)
-        if not invitation.user_id == user.id:
+        """
+        Retrieve an invitation, fields can be selected with ?fields=id,status
+        """
+        try:
+            fields = fast.requested_fields(request.query_params, fast.INVITATION_FIELDS)
+        except ValueError as e:
+            return Response(str(e), status=status.HTTP_400_BAD_REQUEST)
+
+        if fields is None:
+            invitation = self.get_object(pk)
+            if not invitation.user_id == user.id:
+                return Response("Permission denied", status=status.HTTP_403_FORBIDDEN)
+
+            serializer = FullInvitationSerializer(invitation)
+            return Response(serializer.data)
+
+        # user_id is needed to check permission
+        invitation = fast.invitation_fields_rows(
+            Invitation.objects.filter(pk=pk),
+            fields if 'user_id' in fields else fields + ('user_id',)
+        ).first()
+        if invitation is None:
+            raise Http404
+        if not invitation['user_id'] == user.id:
             return Response("Permission denied", status=status.HTTP_403_FORBIDDEN)
 
-        serializer = FullInvitationSerializer(invitation)
-        return Response(serializer.data)
+        return Response(fast.serialize_invitation_fields(invitation, fields))
 
     @authenticate
     def put(self, request, pk, format=None, user=None, token=None):
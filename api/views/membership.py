@@ -0,0 +1,62 @@
+import logging
+
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+
+from api.authenticator import authenticate_internal
+from api.caches import membership
+from api.serializers import MembershipBatchSerializer
+
+
+logger = logging.getLogger(__name__)
+
+
+class MembershipDetail(APIView):
+    """
+    Is a user a member of a workspace, used by other Worko services.
+    Answered from local data only, no external call.
+    """
+    @authenticate_internal
+    def get(self, request, workspace_id, user_id, format=None):
+        return Response({
+            'userId': user_id,
+            'workspaceId': workspace_id,
+            'member': membership.is_member(user_id, workspace_id)
+        })
+
+
+class UserMembershipList(APIView):
+    """
+    Workspaces a user is a member of, used by other Worko services.
+    """
+    @authenticate_internal
+    def get(self, request, user_id, format=None):
+        return Response({
+            'userId': user_id,
+            'workspaceIds': membership.user_workspace_ids(user_id)
+        })
+
+
+class MembershipBatch(APIView):
+    """
+    Check many (user, workspace) pairs at once
+    """
+    @authenticate_internal
+    def post(self, request, format=None):
+        serializer = MembershipBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            logger.warning(f"Unable to validate membership batch : {serializer.errors}")
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        pairs = [
+            (pair['userId'], pair['workspaceId'])
+            for pair in serializer.validated_data['pairs']
+        ]
+        results = membership.are_members(pairs)
+        return Response({
+            'results': [
+                { 'userId': user_id, 'workspaceId': workspace_id, 'member': member }
+                for (user_id, workspace_id), member in zip(pairs, results)
+            ]
+        })
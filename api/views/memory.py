@@ -0,0 +1,39 @@
+import os
+import tracemalloc
+
+from django.conf import settings
+from rest_framework.views import APIView
+from rest_framework.response import Response
+
+from api import memory
+from api.authenticator import authenticate_internal
+
+
+class MemoryStats(APIView):
+    """
+    Memory of the worker answering the request: resident size and, with
+    MEMORY_PROFILING, top allocating lines and growth since the previous snapshot
+    """
+    @authenticate_internal
+    def get(self, request, format=None):
+        stats = {
+            'pid': os.getpid(),
+            'rssMb': round(memory.current_rss() / (1024 * 1024), 1),
+            'tracing': tracemalloc.is_tracing(),
+            'top': [],
+            'growth': [],
+            'lastSnapshotAt': None,
+        }
+        if not tracemalloc.is_tracing():
+            return Response(stats)
+
+        traced, peak = tracemalloc.get_traced_memory()
+        stats['tracedKb'] = round(traced / 1024, 1)
+        stats['peakKb'] = round(peak / 1024, 1)
+        stats['top'] = memory.top_allocations(memory.take_snapshot(), settings.MEMORY_TOP_LIMIT)
+
+        monitor = memory.get_monitor()
+        if monitor is not None:
+            stats['growth'] = monitor.last_growth
+            stats['lastSnapshotAt'] = monitor.last_snapshot_at
+        return Response(stats)
@@ -0,0 +1,27 @@
+from django.http import Http404, HttpResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+
+from api import profiling
+from api.authenticator import authenticate_internal
+
+
+class ProfileList(APIView):
+    """
+    Profiles of the latest slow requests, most recent first
+    """
+    @authenticate_internal
+    def get(self, request, format=None):
+        return Response([profiling.summary(profile) for profile in profiling.ProfileStore().all()])
+
+
+class ProfileDetail(APIView):
+    """
+    Folded stacks of a profile, input of flamegraph.pl or speedscope
+    """
+    @authenticate_internal
+    def get(self, request, profile_id, format=None):
+        profile = profiling.ProfileStore().get(profile_id)
+        if profile is None:
+            raise Http404
+        return HttpResponse(profiling.folded(profile['stacks']), content_type='text/plain; charset=utf-8')
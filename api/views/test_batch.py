@@ -0,0 +1,191 @@
+import jwt
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from api import context, ratelimit
+from api.models import (
+    Workspace,
+    User,
+    WorkspacePermission,
+    Invitation
+)
+from api.externals.http import Http
+from api.externals.iam import ExternalUsers
+
+
+class TestBatch(TestCase):
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+        # Authorization
+        raw_token = jwt.encode({
+                'userId': 1,
+                'email': 'email@example.com'
+            },
+            'secret'
+        )
+        self.headers = {
+            'HTTP_AUTHORIZATION': f"Bearer {raw_token.decode('utf-8')}"
+        }
+
+        # Fixtures
+        self.workspace = Workspace.objects.create(name="Workspace", users=[1, 2])
+        Invitation.objects.create(workspace=self.workspace, sender="email@example.com", user_id=1)
+
+    def tearDown(self):
+        Workspace.objects.all().hard_delete()
+
+    def batch(self, requests):
+        return self.client.post(
+            '/batch',
+            { 'requests': requests },
+            content_type='application/json',
+            **self.headers
+        )
+
+    def test_batch_requires_authentication(self):
+        res = self.client.post('/batch', { 'requests': [] }, content_type='application/json')
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @mock.patch.object(ExternalUsers, 'get_by_ids', return_value=[
+        User(1, 'email@example.com'),
+        User(2, 'other@example.com')
+    ])
+    def test_batch_app_load(self, mock_get_by_ids):
+        iam_response = mock.Mock(status_code=200)
+        iam_response.json.return_value = { 'accessLevel': WorkspacePermission.USER.name }
+
+        with mock.patch.object(Http, 'get', return_value=iam_response) as mock_http_get:
+            res = self.batch([
+                { 'method': 'GET', 'path': '/workspace/' },
+                { 'method': 'GET', 'path': '/invitation/status/PENDING' },
+                { 'method': 'GET', 'path': f'/workspace/{self.workspace.id}/' },
+                { 'method': 'GET', 'path': f'/workspace/{self.workspace.id}/?fields=id,name' },
+            ])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        responses = res.json().get('responses')
+        self.assertEqual([response.get('status') for response in responses], [200, 200, 200, 200])
+        self.assertEqual(responses[0].get('body')[0].get('id'), self.workspace.id)
+        self.assertEqual(len(responses[1].get('body')), 1)
+        self.assertEqual(responses[2].get('body').get('users')[1].get('email'), 'other@example.com')
+        self.assertEqual(responses[3].get('body'), { 'id': self.workspace.id, 'name': 'Workspace' })
+
+        # Users and permission are fetched once for the whole batch
+        mock_get_by_ids.assert_called_once()
+        mock_http_get.assert_called_once()
+
+    @mock.patch.object(ExternalUsers, 'get_by_ids', return_value=[
+        User(1, 'email@example.com'),
+        User(2, 'other@example.com')
+    ])
+    def test_batch_workspace_loaded_once(self, mock_get_by_ids):
+        iam_response = mock.Mock(status_code=200)
+        iam_response.json.return_value = { 'accessLevel': WorkspacePermission.CREATOR.name }
+
+        with mock.patch.object(Http, 'get', return_value=iam_response), \
+                mock.patch('api.views.workspace.ExternalNotify.send'), \
+                CaptureQueriesContext(connection) as queries:
+            res = self.batch([
+                { 'method': 'GET', 'path': f'/workspace/{self.workspace.id}/' },
+                { 'method': 'PUT', 'path': f'/workspace/{self.workspace.id}/', 'body': { 'name': 'Renamed', 'users': [1, 2] } },
+                { 'method': 'GET', 'path': f'/workspace/{self.workspace.id}/' },
+            ])
+
+        responses = res.json().get('responses')
+        self.assertEqual([response.get('status') for response in responses], [200, 200, 200])
+        # Updated instance is shared with the following sub-requests
+        self.assertEqual(responses[2].get('body').get('name'), 'Renamed')
+        self.assertEqual(responses[2].get('body').get('users')[0].get('email'), 'email@example.com')
+        workspace_selects = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and f'"api_workspace"."id" = {self.workspace.id}' in query['sql']
+            and 'NOT' not in query['sql']
+        ]
+        self.assertEqual(len(workspace_selects), 1)
+        mock_get_by_ids.assert_called_once()
+
+    def test_batch_sub_request_errors(self):
+        res = self.batch([
+            { 'method': 'GET', 'path': '/unknown/' },
+            { 'method': 'POST', 'path': '/batch', 'body': { 'requests': [] } },
+            { 'method': 'GET', 'path': '/workspace/?fields=unknown' },
+        ])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [response.get('status') for response in res.json().get('responses')],
+            [404, 400, 400]
+        )
+
+    @override_settings(BATCH_MAX_REQUESTS=1)
+    def test_batch_too_many_requests(self):
+        res = self.batch([
+            { 'method': 'GET', 'path': '/workspace/' },
+            { 'method': 'GET', 'path': '/workspace/' },
+        ])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_malformed(self):
+        res = self.batch([{ 'method': 'PATCH', 'path': 'workspace/' }])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(
+    RATE_LIMIT=True,
+    RATE_LIMIT_BACKEND='api.ratelimit.LocalBackend',
+    RATE_LIMIT_READ_BURST=2,
+    RATE_LIMIT_READ_PER_SECOND=0.001,
+    RATE_LIMIT_WRITE_BURST=1,
+    RATE_LIMIT_WRITE_PER_SECOND=0.001
+)
+@mock.patch('api.views.invitation.invitation_counts.user_invitation_counts')
+class TestBatchSubRequests(SimpleTestCase):
+    def setUp(self):
+        self.client = Client()
+        ratelimit._backends.clear()
+        raw_token = jwt.encode({
+                'userId': 1,
+                'email': 'email@example.com'
+            },
+            'secret'
+        )
+        self.headers = {
+            'HTTP_AUTHORIZATION': f"Bearer {raw_token.decode('utf-8')}"
+        }
+
+    def tearDown(self):
+        ratelimit._backends.clear()
+
+    def batch(self, requests):
+        return self.client.post('/batch', { 'requests': requests }, content_type='application/json', **self.headers)
+
+    def test_sub_requests_rate_limited(self, user_invitation_counts):
+        user_invitation_counts.return_value = {}
+
+        res = self.batch([{ 'method': 'GET', 'path': '/invitation/count' }] * 3)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([response.get('status') for response in res.json().get('responses')], [200, 200, 429])
+        # The batch itself didn't take the only write token
+        self.assertTrue(ratelimit.consume(1, write=True)[0])
+
+    def test_sub_requests_share_context(self, user_invitation_counts):
+        read_only = []
+        user_invitation_counts.side_effect = lambda user_id: read_only.append(context.get().read_only) or {}
+
+        res = self.batch([{ 'method': 'GET', 'path': '/invitation/count' }] * 2)
+
+        self.assertEqual(read_only, [True, True])
+        # One Server-Timing header, with the authentication of the batch and each sub-request
+        auth = [metric for metric in res['Server-Timing'].split(', ') if metric.startswith('auth;')]
+        self.assertTrue(auth[0].endswith('desc="3"'))
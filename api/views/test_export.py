@@ -0,0 +1,79 @@
+import json
+from django.test import TestCase, Client, override_settings
+from rest_framework import status
+
+from api.models import Workspace, Invitation, InvitationStatus
+
+
+@override_settings(INTERNAL_API_TOKEN='internal-token')
+class TestExport(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.headers = {
+            'HTTP_X_INTERNAL_TOKEN': 'internal-token'
+        }
+
+        # Fixtures : a live and a soft-deleted workspace
+        self.workspace = Workspace.objects.create(name="Workspace", users=[1, 2])
+        self.deleted_workspace = Workspace.objects.create(name="Deleted workspace", users=[1])
+        self.deleted_workspace.delete()
+        Invitation.objects.create(workspace=self.workspace, sender="email@example.com", user_id=2)
+        Invitation.objects.create(
+            workspace=self.workspace,
+            sender="email@example.com",
+            user_id=3,
+            status=InvitationStatus.DECLINED.name
+        )
+
+    def tearDown(self):
+        Workspace.raw_objects.all().delete()
+
+    def export(self, path):
+        res = self.client.get(path, **self.headers)
+        return res, b''.join(res.streaming_content).decode('utf-8')
+
+    def test_export_requires_internal_token(self):
+        res = self.client.get('/internal/export/workspace')
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_unknown(self):
+        res = self.client.get('/internal/export/unknown', **self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_export_workspaces_ndjson_with_deleted(self):
+        res, content = self.export('/internal/export/workspace')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.workspace.id, self.deleted_workspace.id])
+        self.assertEqual(rows[0]['users'], [1, 2])
+        self.assertIsNotNone(rows[1]['deleted_at'])
+
+    def test_export_only_deleted(self):
+        res, content = self.export('/internal/export/workspace?deleted=true')
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.deleted_workspace.id])
+
+    def test_export_invitations_csv_by_status(self):
+        res, content = self.export('/internal/export/invitation?output=csv&status=DECLINED')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'text/csv')
+        lines = content.splitlines()
+        self.assertEqual(lines[0], 'id,workspace_id,sender,user_id,status,created_at,updated_at,deleted_at')
+        self.assertEqual(len(lines), 2)
+        self.assertIn(',3,DECLINED,', lines[1])
+
+    def test_export_status_only_on_invitations(self):
+        res = self.client.get('/internal/export/workspace?status=PENDING', **self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_date_range(self):
+        res, content = self.export('/internal/export/workspace?since=2999-01-01T00:00:00')
+
+        self.assertEqual(content, '')
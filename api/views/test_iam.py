@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from rest_framework import status
+
+from api.caches import iam as iam_cache
+from api.models import IamUserSnapshot, IamPermissionSnapshot, User, WorkspacePermission
+
+
+@override_settings(INTERNAL_API_TOKEN='internal-token')
+class TestIamEvents(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.headers = {
+            'HTTP_X_INTERNAL_TOKEN': 'internal-token'
+        }
+        cache.clear()
+
+    def post_events(self, iam_events, **headers):
+        return self.client.post(
+            '/internal/iam/events',
+            { 'events': iam_events },
+            content_type='application/json',
+            **(headers or self.headers)
+        )
+
+    def test_internal_token_must_be_provided(self):
+        res = self.client.post('/internal/iam/events', { 'events': [] }, content_type='application/json')
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_internal_token_must_be_valid(self):
+        res = self.post_events([], HTTP_X_INTERNAL_TOKEN='wrong')
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_invalid_event(self):
+        res = self.post_events([{ 'type': 'permission-changed', 'userId': 1 }])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_user_changed(self):
+        iam_cache.add_users([User(1, 'old@example.com')])
+
+        res = self.post_events([{ 'type': 'user-changed', 'userId': 1, 'email': 'new@example.com' }])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), { 'applied': 1 })
+        self.assertEqual(iam_cache.get_users([1])[1].email, 'new@example.com')
+        self.assertEqual(IamUserSnapshot.objects.get(id=1).email, 'new@example.com')
+
+    def test_permission_changed(self):
+        res = self.post_events([
+            { 'type': 'permission-changed', 'userId': 1, 'workspaceId': 3, 'accessLevel': 'USER' },
+            { 'type': 'permission-changed', 'userId': 1, 'workspaceId': 4, 'accessLevel': 'CREATOR' },
+            { 'type': 'permission-changed', 'userId': 1, 'workspaceId': 4 },
+        ])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(iam_cache.get_permission(1, 3), WorkspacePermission.USER)
+        self.assertIsNone(iam_cache.get_permission(1, 4))
+        self.assertEqual(
+            list(IamPermissionSnapshot.objects.values_list('workspace_id', 'access_level')),
+            [(3, 'USER')]
+        )
+
+    def test_user_deleted(self):
+        self.post_events([
+            { 'type': 'user-changed', 'userId': 1, 'email': 'user@example.com' },
+            { 'type': 'permission-changed', 'userId': 1, 'workspaceId': 3, 'accessLevel': 'USER' },
+        ])
+
+        res = self.post_events([{ 'type': 'user-deleted', 'userId': 1 }])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(iam_cache.get_users([1]), {})
+        self.assertIsNone(iam_cache.get_permission(1, 3))
+        self.assertFalse(IamUserSnapshot.objects.filter(id=1).exists())
+        self.assertFalse(IamPermissionSnapshot.objects.filter(user_id=1).exists())
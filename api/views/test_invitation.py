@@ -4,7 +4,8 @@ import json
 from unittest import mock
 
 from rest_framework import status
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, Client
 
 from api.models import (
     Workspace,
@@ -86,6 +87,18 @@ class TestInvitationList(TestCase):
         self.assertEqual(res.json()[0].get('status'), self.invitations[0].status)
         self.assertEqual(res.json()[0].get('workspace').get('id'), self.workspaces[0].id)
 
+    def test_list_sparse_fields(self):
+        res = self.client.get('/invitation/status/ACCEPTED?fields=id,status', **self.headers)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), [{'id': self.invitations[1].id, 'status': 'ACCEPTED'}])
+
+    def test_list_unknown_field(self):
+        res = self.client.get('/invitation/?fields=unknown', **self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.content, b'"Unknown fields (unknown)"')
+
     @mock.patch.object(ExternalUsers, 'get_by_email', return_value=User(3, 'invited@example.com'))
     def test_create(self, mock_users):
         res = self.client.post(
@@ -163,6 +176,77 @@ class TestInvitationList(TestCase):
         mock_notify.assert_called()
 
 
+# Counts are invalidated on commit, which TestCase never does
+class TestInvitationCount(TransactionTestCase):
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+        # Authorization
+        raw_token = jwt.encode({
+                'userId': 1,
+                'email': 'email@example.com'
+            },
+            'secret'
+        )
+        self.headers = {
+            'HTTP_AUTHORIZATION': f"Bearer {raw_token.decode('utf-8')}"
+        }
+
+        self.workspaces = [
+            Workspace.objects.create(name='Workspace'),
+            Workspace.objects.create(name='Workspace 2'),
+            Workspace.objects.create(name='Workspace 3'),
+        ]
+        self.invitation = Invitation.objects.create(workspace=self.workspaces[0], sender="email@example.com", user_id=1)
+        Invitation.objects.create(workspace=self.workspaces[1], sender="email@example.com", user_id=1)
+        Invitation.objects.create(
+            workspace=self.workspaces[2],
+            sender="email@example.com",
+            user_id=1,
+            status=InvitationStatus.DECLINED.name
+        )
+        Invitation.objects.create(workspace=self.workspaces[0], sender="email@example.com", user_id=2)
+
+    def tearDown(self):
+        Workspace.objects.all().hard_delete()
+
+    def test_count(self):
+        res = self.client.get('/invitation/count', **self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {'PENDING': 2, 'ACCEPTED': 0, 'DECLINED': 1})
+
+    def test_count_cached(self):
+        self.client.get('/invitation/count', **self.headers)
+
+        with self.assertNumQueries(0):
+            res = self.client.get('/invitation/count', **self.headers)
+        self.assertEqual(res.json().get('PENDING'), 2)
+
+    def test_count_updated_on_delete(self):
+        self.client.get('/invitation/count', **self.headers)
+
+        self.client.delete(f'/invitation/{self.invitation.id}/', **self.headers)
+
+        res = self.client.get('/invitation/count', **self.headers)
+        self.assertEqual(res.json().get('PENDING'), 1)
+
+    @mock.patch.object(ExternalWorkspacePermission, 'set', return_value=True)
+    def test_count_updated_on_status_change(self, mock):
+        self.client.get('/invitation/count', **self.headers)
+
+        self.client.put(
+            f'/invitation/{self.invitation.id}/',
+            {'status': 'ACCEPTED'},
+            content_type="application/json",
+            **self.headers
+        )
+
+        res = self.client.get('/invitation/count', **self.headers)
+        self.assertEqual(res.json(), {'PENDING': 1, 'ACCEPTED': 1, 'DECLINED': 1})
+
+
 class TestInvitationDetail(TestCase):
     def setUp(self):
         self.client = Client()
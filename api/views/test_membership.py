@@ -0,0 +1,144 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase, Client, override_settings
+from rest_framework import status
+
+from api.caches import membership
+from api.models import Workspace
+
+
+# Memberships are invalidated on commit, which TestCase never does
+@override_settings(INTERNAL_API_TOKEN='internal-token')
+class TestMembership(TransactionTestCase):
+    def setUp(self):
+        self.client = Client()
+        self.headers = {
+            'HTTP_X_INTERNAL_TOKEN': 'internal-token'
+        }
+        cache.clear()
+
+        # Fixtures
+        self.workspace = Workspace.objects.create(name="Workspace", users=[1, 2])
+        self.other_workspace = Workspace.objects.create(name="Other workspace", users=[2])
+
+    def tearDown(self):
+        Workspace.objects.all().hard_delete()
+
+    def test_internal_token_must_be_provided(self):
+        res = self.client.get('/internal/membership/user/1')
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_internal_token_must_be_valid(self):
+        res = self.client.get('/internal/membership/user/1', HTTP_X_INTERNAL_TOKEN='wrong')
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_is_member(self):
+        res = self.client.get(
+            f'/internal/membership/workspace/{self.workspace.id}/user/1',
+            **self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json().get('member'), True)
+
+    def test_is_not_member(self):
+        res = self.client.get(
+            f'/internal/membership/workspace/{self.other_workspace.id}/user/1',
+            **self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json().get('member'), False)
+
+    def test_unknown_workspace(self):
+        res = self.client.get('/internal/membership/workspace/12345678/user/1', **self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json().get('member'), False)
+
+    def test_user_workspaces(self):
+        res = self.client.get('/internal/membership/user/2', **self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.json().get('workspaceIds'),
+            sorted([self.workspace.id, self.other_workspace.id])
+        )
+
+    def test_user_workspaces_cached(self):
+        self.client.get('/internal/membership/user/2', **self.headers)
+
+        with self.assertNumQueries(0):
+            res = self.client.get('/internal/membership/user/2', **self.headers)
+        self.assertEqual(len(res.json().get('workspaceIds')), 2)
+
+    def test_cache_invalidated_on_workspace_update(self):
+        self.client.get('/internal/membership/user/1', **self.headers)
+
+        # User 1 leaves the workspace
+        workspace = Workspace.objects.get(pk=self.workspace.id)
+        workspace.users.remove(1)
+        workspace.save()
+
+        res = self.client.get('/internal/membership/user/1', **self.headers)
+        self.assertEqual(res.json().get('workspaceIds'), [])
+
+    def test_cache_invalidated_on_workspace_delete(self):
+        self.client.get(f'/internal/membership/workspace/{self.workspace.id}/user/1', **self.headers)
+
+        self.workspace.delete()
+
+        res = self.client.get(f'/internal/membership/workspace/{self.workspace.id}/user/1', **self.headers)
+        self.assertEqual(res.json().get('member'), False)
+
+    def test_cache_invalidated_after_commit(self):
+        membership.user_workspace_ids(1)
+
+        with transaction.atomic():
+            workspace = Workspace.objects.get(pk=self.workspace.id)
+            workspace.users.remove(1)
+            workspace.save()
+            # Kept until commit, dropped now a concurrent read would cache the old members again
+            self.assertEqual(cache.get('membership:user:1'), [self.workspace.id])
+
+        self.assertEqual(membership.user_workspace_ids(1), [])
+
+    @override_settings(MEMBERSHIP_CACHE_TTL=300, MEMBERSHIP_LOCAL_CACHE_MAX_TTL=30)
+    def test_ttl_capped_with_local_cache(self):
+        self.assertEqual(membership.ttl(), 30)
+
+        with override_settings(CACHES={ 'default': { 'BACKEND': 'django.core.cache.backends.dummy.DummyCache' } }):
+            self.assertEqual(membership.ttl(), 300)
+
+    def test_batch(self):
+        with self.assertNumQueries(1):
+            res = self.client.post(
+                '/internal/membership/batch',
+                {
+                    'pairs': [
+                        { 'userId': 1, 'workspaceId': self.workspace.id },
+                        { 'userId': 1, 'workspaceId': self.other_workspace.id },
+                        { 'userId': 2, 'workspaceId': self.other_workspace.id },
+                    ]
+                },
+                content_type='application/json',
+                **self.headers
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result.get('member') for result in res.json().get('results')],
+            [True, False, True]
+        )
+
+    def test_batch_malformed(self):
+        res = self.client.post(
+            '/internal/membership/batch',
+            { 'pairs': [{ 'userId': 1 }] },
+            content_type='application/json',
+            **self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -2,7 +2,9 @@ import logging
 logger = logging.getLogger(__name__)
 from unittest import mock
 import jwt
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 
 from api.views.workspace import (
@@ -55,6 +57,37 @@ class TestWorkspaceList(TestCase):
         self.assertEqual(res.json()[0].get('id'), self.workspace.id)
         self.assertEqual(res.json()[0].get('name'), self.workspace.name)
 
+    @mock.patch.object(ExternalUsers, 'get_by_ids')
+    def test_list_sparse_fields_skip_iam(self, mock_get_by_ids):
+        res = self.client.get('/workspace/?fields=id,name', **self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), [{'id': self.workspace.id, 'name': self.workspace.name}])
+        mock_get_by_ids.assert_not_called()
+
+    @mock.patch.object(ExternalUsers, 'get_by_ids')
+    def test_list_users_as_ids_skip_iam(self, mock_get_by_ids):
+        res = self.client.get('/workspace/?fields=id,users&users=ids', **self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), [{'id': self.workspace.id, 'users': [1]}])
+        mock_get_by_ids.assert_not_called()
+
+    @mock.patch.object(ExternalUsers, 'get_by_ids', return_value=[
+        User(1, 'email@example.com')
+    ])
+    def test_list_sparse_fields_with_users(self, mock):
+        res = self.client.get('/workspace/?fields=users', **self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), [{'users': [{'id': 1, 'email': 'email@example.com'}]}])
+
+    def test_list_unknown_field(self):
+        res = self.client.get('/workspace/?fields=id,unknown', **self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.content, b'"Unknown fields (unknown)"')
+
     @mock.patch.object(ExternalWorkspacePermission, 'set', return_value=True)
     def test_create_success(self, mock):
         res = self.client.post(
@@ -136,6 +169,19 @@ class TestWorkspaceDetail(TestCase):
         self.assertEqual(user.get('id'), 1)
         self.assertEqual(user.get('email'), 'email@example.com')
 
+    @mock.patch.object(ExternalUsers, 'get_by_ids')
+    @mock.patch.object(
+        ExternalWorkspacePermission,
+        'get',
+        return_value=WorkspacePermission.USER
+    )
+    def test_retrieve_sparse_fields_skip_iam_users(self, mock_get, mock_get_by_ids):
+        res = self.client.get(f'/workspace/{self.workspace.id}/?fields=name,users&users=ids', **self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {'users': [1], 'name': self.workspace.name})
+        mock_get_by_ids.assert_not_called()
+
     @mock.patch.object(
         ExternalWorkspacePermission,
         'get',
@@ -217,6 +263,39 @@ class TestWorkspaceDetail(TestCase):
         # Assert invitation has been removed
         self.assertEqual(len(Invitation.objects.all()), 0)
 
+    def remove_invited_users_queries(self, user_ids):
+        # Users invited to and members of self.workspace
+        for user_id in user_ids:
+            Invitation.objects.create(workspace=self.workspace, sender="email@example.com", user_id=user_id, status=InvitationStatus.ACCEPTED.name)
+        self.workspace.users = [1] + user_ids
+        self.workspace.save()
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.put(
+                f'/workspace/{self.workspace.id}/',
+                { 'name': 'test', 'users': [1] },
+                content_type='application/json',
+                **self.headers
+            )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(Invitation.objects.filter(workspace=self.workspace).count(), 0)
+        return len(queries)
+
+    @mock.patch.object(ExternalUsers, 'get_by_ids', return_value=[
+        User(1, 'email@example.com')
+    ])
+    @mock.patch.object(
+        ExternalWorkspacePermission,
+        'get',
+        return_value=WorkspacePermission.CREATOR
+    )
+    @mock.patch.object(ExternalNotify, 'send')
+    def test_update_remove_users_constant_queries(self, mock_notify, mock_get, mock_get_by_ids):
+        one_user_queries = self.remove_invited_users_queries([2])
+        many_users_queries = self.remove_invited_users_queries(list(range(3, 23)))
+
+        self.assertEqual(one_user_queries, many_users_queries)
+
     @mock.patch.object(ExternalUsers, 'get_by_ids', return_value=[
         User(1, 'email@example.com')
     ])
@@ -1,5 +1,6 @@
 import logging
 
+from django.db import transaction
 from django.http import Http404
 from rest_framework import status
 from rest_framework.views import APIView
@@ -13,11 +14,14 @@ from api.externals.notifier import ExternalNotify
 from api.externals.gamification import ExternalGamification
 from api.externals.billing import ExternalBilling
 from api.serializers import (
+    fast,
     UserFilledWorkspaceSerializer,
     WorkspaceSerializer,
     EditableWorkspaceSerializer,
 )
+from api import context
 from api.authenticator import authenticate
+from api.caches import invitation_counts
 from api.models import (
     Workspace,
     Invitation,
@@ -36,13 +40,32 @@ class WorkspaceList(APIView):
     def get(self, request, format=None, user=None, token=None):
         """
         List every users workspace with users informations filled
+        Fields can be selected with ?fields=id,name and users left as ids with ?users=ids
         """
+        try:
+            fields = fast.requested_fields(request.query_params, fast.USER_FILLED_WORKSPACE_FIELDS)
+        except ValueError as e:
+            return Response(str(e), status=status.HTTP_400_BAD_REQUEST)
+        users_as_ids = request.query_params.get('users') == 'ids'
+
         workspaces = Workspace.objects.filter(users__contains=[user.id])
-        workspaces = ExternalUsers.fill_workspaces_users(workspaces)
+
+        if fields is None and not users_as_ids:
+            workspaces = fast.workspace_rows(workspaces)
+            users = ExternalUsers.get_map_by_ids(fast.workspaces_user_ids(workspaces))
+
+            logger.debug(f"User workspaces : {workspaces}")
+            return Response(fast.serialize_user_filled_workspaces(workspaces, users))
+
+        # Sparse fieldset, users are only fetched from IAM when needed
+        fields = fields or fast.USER_FILLED_WORKSPACE_FIELDS
+        workspaces = workspaces.values(*fields)
+        users = None
+        if 'users' in fields and not users_as_ids:
+            users = ExternalUsers.get_map_by_ids(fast.workspaces_user_ids(workspaces))
 
         logger.debug(f"User workspaces : {workspaces}")
-        serializer = UserFilledWorkspaceSerializer(workspaces, many=True)
-        return Response(serializer.data)
+        return Response(fast.serialize_workspaces_fields(workspaces, fields, users))
 
     @authenticate
     def post(self, request, format=None, user=None, token=None):
@@ -96,28 +119,55 @@ class WorkspaceDetail(APIView):
     """
     Retrieve, update or delete a workspace instance.
     """
-    def get_object(self, pk):
+    @staticmethod
+    def __load(pk):
         try:
             return Workspace.objects.get(pk=pk)
         except Workspace.DoesNotExist:
+            return None
+
+    def get_object(self, pk):
+        # Same instance for the whole request
+        workspace = context.get().entities.load('workspace', int(pk), lambda: WorkspaceDetail.__load(pk))
+        if workspace is None or workspace.deleted_at is not None:
             raise Http404
+        return workspace
 
     @authenticate
     def get(self, request, pk, format=None, user=None, token=None):
         """
         Retrieve a specific workspace with users information filled
+        Fields can be selected with ?fields=id,name and users left as ids with ?users=ids
         """
+        try:
+            fields = fast.requested_fields(request.query_params, fast.USER_FILLED_WORKSPACE_FIELDS)
+        except ValueError as e:
+            return Response(str(e), status=status.HTTP_400_BAD_REQUEST)
+        users_as_ids = request.query_params.get('users') == 'ids'
+
         permission = ExternalWorkspacePermission.get(token, pk)
         if permission is None:
             return Response("Unable to retrieve workspace permission", status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         if permission == WorkspacePermission.NONE:
             return Response("Permission denied", status=status.HTTP_403_FORBIDDEN)
 
-        workspace = self.get_object(pk)
-        workspace = ExternalUsers.fill_workspace_users(workspace)
+        if fields is None and not users_as_ids:
+            workspace = self.get_object(pk)
+            workspace = ExternalUsers.fill_workspace_users(workspace)
+
+            serializer = UserFilledWorkspaceSerializer(workspace)
+            return Response(serializer.data)
 
-        serializer = UserFilledWorkspaceSerializer(workspace)
-        return Response(serializer.data)
+        # Sparse fieldset, users are only fetched from IAM when needed
+        fields = fields or fast.USER_FILLED_WORKSPACE_FIELDS
+        workspace = Workspace.objects.filter(pk=pk).values(*fields).first()
+        if workspace is None:
+            raise Http404
+        users = None
+        if 'users' in fields and not users_as_ids:
+            users = ExternalUsers.get_map_by_ids(list(workspace['users']))
+
+        return Response(fast.serialize_workspace_fields(workspace, fields, users))
 
     @authenticate
     def put(self, request, pk, format=None, user=None, token=None):
@@ -137,14 +187,19 @@ class WorkspaceDetail(APIView):
 
         serializer = EditableWorkspaceSerializer(workspace, data=request.data)
         if serializer.is_valid():
-            serializer.save()
-
-            # Allow users to be invited after been removed
-            if "users" in request.data:
-                deleted_user_ids = set(old_workspace_users) - set(workspace.users)
-                if len(deleted_user_ids) > 0:
-                    for deleted_user_id in deleted_user_ids:
-                        Invitation.objects.filter(workspace=workspace, user_id=deleted_user_id).delete()
+            with transaction.atomic():
+                serializer.save()
+
+                # Allow users to be invited after been removed
+                if "users" in request.data:
+                    deleted_user_ids = set(old_workspace_users) - set(workspace.users)
+                    if len(deleted_user_ids) > 0:
+                        Invitation.objects.filter(
+                            workspace=workspace,
+                            user_id__in=deleted_user_ids
+                        ).soft_delete_bulk()
+                        # Set-based delete doesn't send post_save
+                        transaction.on_commit(lambda: invitation_counts.invalidate(deleted_user_ids))
 
             # Send notification
             ExternalNotify.send(
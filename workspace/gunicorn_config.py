@@ -0,0 +1,126 @@
+"""
+Gunicorn configuration, see README.md (Deployment) for the variables.
+
+    gunicorn -c workspace/gunicorn_config.py
+
+The application follows the worker class, don't pass it on the command line.
+"""
+import multiprocessing
+import os
+
+
+def cpu_count():
+    """
+    CPUs available to the container: cgroup quota, then CPU affinity
+    """
+    quota = None
+    try:
+        # cgroup v2
+        with open('/sys/fs/cgroup/cpu.max') as cpu_max:
+            limit, period = cpu_max.read().split()
+            if limit != 'max':
+                quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            # cgroup v1
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as quota_file, \
+                    open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as period_file:
+                limit = int(quota_file.read())
+                if limit > 0:
+                    quota = limit / int(period_file.read())
+        except (OSError, ValueError):
+            pass
+
+    try:
+        available = len(os.sched_getaffinity(0))
+    except AttributeError:
+        available = multiprocessing.cpu_count()
+
+    if quota is None:
+        return available
+    return max(1, min(available, round(quota)))
+
+
+WORKER_CLASSES = {
+    'sync': 'sync',
+    'gthread': 'gthread',
+    'uvicorn': 'uvicorn.workers.UvicornWorker',
+}
+
+worker_profile = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+worker_class = WORKER_CLASSES.get(worker_profile, worker_profile)
+
+# Requests mostly wait on IAM and Postgres, threads cover that wait
+# without the memory of extra processes
+if worker_profile == 'gthread':
+    workers = int(os.getenv('GUNICORN_WORKERS', cpu_count() + 1))
+    threads = int(os.getenv('GUNICORN_THREADS', 4))
+else:
+    workers = int(os.getenv('GUNICORN_WORKERS', cpu_count() * 2 + 1))
+    threads = 1
+
+# ASGI application for the uvicorn workers, WSGI for the others
+ASGI_WORKER_CLASSES = ('uvicorn.workers.',)
+asgi_worker = worker_class.startswith(ASGI_WORKER_CLASSES)
+wsgi_app = 'workspace.asgi:application' if asgi_worker else 'workspace.wsgi:application'
+
+bind = os.getenv('GUNICORN_BIND', ':3002')
+
+# Load the application once in the master, workers are forked from it
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+if preload_app:
+    # Per worker initialization happens in post_fork instead of workspace.wsgi
+    os.environ['WSGI_WORKER_INIT_IN_POST_FORK'] = 'true'
+
+# Recycle workers regularly, jitter avoids restarting them all at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+# Longer than the idle timeout of the ingress upstream connections (60s)
+# so gunicorn never closes a connection the proxy is about to reuse
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 75))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Heartbeat file on memory instead of the container overlay filesystem
+worker_tmp_dir = os.getenv('GUNICORN_WORKER_TMP_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else None)
+
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+capture_output = True
+enable_stdio_inheritance = True
+
+
+def check_app(app_uri, worker_class):
+    """
+    Error message when the application doesn't suit the worker class, None if it does
+    """
+    asgi_app = app_uri.split(':')[0].endswith('asgi')
+    asgi_worker = worker_class.startswith(ASGI_WORKER_CLASSES)
+    if asgi_app != asgi_worker:
+        expected = 'an ASGI' if asgi_worker else 'a WSGI'
+        return f"The {worker_class} worker class needs {expected} application, not {app_uri}"
+    return None
+
+
+def on_starting(server):
+    # An application passed on the command line replaces wsgi_app
+    error = check_app(server.app.app_uri, server.cfg.worker_class_str)
+    if error:
+        raise RuntimeError(error)
+
+
+def pre_fork(server, worker):
+    # Connections opened while preloading must not be shared with workers
+    from django.db import connections
+    connections.close_all()
+
+
+def post_fork(server, worker):
+    from api import memory
+    from api.connections import warm_up_connections
+    from api.externals.http import Http
+
+    Http.reset_session()
+    warm_up_connections()
+    memory.start()
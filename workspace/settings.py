@@ -26,6 +26,10 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv('DJANGO_SECRET', 'secret')
 
+# Shared secret of the internal routes called by other Worko services,
+# internal routes are all rejected while it is unset
+INTERNAL_API_TOKEN = os.getenv('INTERNAL_API_TOKEN')
+
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = ENVIRONMENT != 'production'
 
@@ -40,14 +44,24 @@ INSTALLED_APPS = [
     'api.apps.ApiConfig',
 
     'rest_framework',
-    'django_extensions',
     'corsheaders',
 
     'django.contrib.contenttypes',
 ]
 
+# Development commands (shell_plus...), not loaded by production workers
+if ENVIRONMENT != 'production':
+    INSTALLED_APPS.append('django_extensions')
+
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'api.middlewares.admission.AdmissionControlMiddleware',
+    'api.middlewares.context.RequestContextMiddleware',
+    'api.middlewares.deadline.DeadlineMiddleware',
+    'api.middlewares.tracing.TracingMiddleware',
+    'api.middlewares.timing.ServerTimingMiddleware',
+    'api.middlewares.profiling.ProfilingMiddleware',
+    'api.middlewares.memory.MemoryGuardMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -68,10 +82,174 @@ DATABASES = {
         'USER': os.getenv('DB_USER', 'postgres'),
         'PASSWORD': os.getenv('DB_PASSWORD', 'postgres'),
         'HOST': os.getenv('DB_HOST', 'localhost'),
-        'PORT': os.getenv('DB_PORT', '')
+        'PORT': os.getenv('DB_PORT', ''),
+        # Keep connections open between requests instead of paying TCP,
+        # authentication and backend fork on every request (0 disables it)
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        # Server-side cursors do not survive a transaction pooling proxy
+        # (pgbouncer pool_mode=transaction)
+        'DISABLE_SERVER_SIDE_CURSORS': os.getenv('DB_POOL_MODE', 'session') == 'transaction',
+        'OPTIONS': {
+            'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5)),
+        },
     }
 }
 
+# Read replicas, comma separated list of host[:port]
+# Read-only requests are sent to a replica, writes and everything else to the primary
+DB_REPLICAS = []
+for index, replica in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(','))):
+    host, _, port = replica.strip().partition(':')
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DB_REPLICAS.append(alias)
+
+if DB_REPLICAS:
+    DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+
+# Seconds during which a user reads from the primary after one of its writes
+DB_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', 5))
+
+# Ping persistent connections at request start and drop the broken ones, each
+# connection at most every DB_CONN_HEALTH_CHECK_INTERVAL seconds
+DB_CONN_HEALTH_CHECKS = os.getenv('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true'
+DB_CONN_HEALTH_CHECK_INTERVAL = float(os.getenv('DB_CONN_HEALTH_CHECK_INTERVAL', 10))
+
+# Open database connections when a worker boots instead of on its first request
+DB_CONN_WARMUP = os.getenv('DB_CONN_WARMUP', 'true').lower() == 'true'
+
+# Cache
+# https://docs.djangoproject.com/en/3.0/topics/cache/
+# Local memory cache is per worker, use a shared backend when running several workers
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Seconds workspace memberships are cached, invalidated on workspace changes
+MEMBERSHIP_CACHE_TTL = int(os.getenv('MEMBERSHIP_CACHE_TTL', 300))
+# Invalidations only reach one worker with the local memory cache, the TTL is
+# then capped so the others don't answer old memberships for long
+MEMBERSHIP_LOCAL_CACHE_MAX_TTL = int(os.getenv('MEMBERSHIP_LOCAL_CACHE_MAX_TTL', 30))
+
+# Seconds the invitations count per status of a user is cached, invalidated on invitation changes
+INVITATION_COUNTS_CACHE_TTL = int(os.getenv('INVITATION_COUNTS_CACHE_TTL', 30))
+
+# Maximum number of sub-requests of a /batch request
+BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', 20))
+
+# Rows fetched at a time by the server-side cursor of exports
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+
+# Archival of soft-deleted rows (purge_deleted command)
+PURGE_RETENTION_DAYS = int(os.getenv('PURGE_RETENTION_DAYS', 90))
+PURGE_BATCH_SIZE = int(os.getenv('PURGE_BATCH_SIZE', 500))
+# Pause between batches, in seconds
+PURGE_BATCH_SLEEP = float(os.getenv('PURGE_BATCH_SLEEP', 0.1))
+PURGE_LOCK_TIMEOUT_MS = int(os.getenv('PURGE_LOCK_TIMEOUT_MS', 1000))
+
+# Admission control, requests in flight per worker (overall and per route)
+# beyond the limits wait up to ADMISSION_QUEUE_TIMEOUT seconds then get a 503
+ADMISSION_CONTROL = os.getenv('ADMISSION_CONTROL', 'true').lower() == 'true'
+ADMISSION_MAX_CONCURRENCY = int(os.getenv('ADMISSION_MAX_CONCURRENCY', 16))
+ADMISSION_ROUTE_MAX_CONCURRENCY = int(os.getenv('ADMISSION_ROUTE_MAX_CONCURRENCY', 8))
+ADMISSION_MIN_CONCURRENCY = int(os.getenv('ADMISSION_MIN_CONCURRENCY', 1))
+ADMISSION_QUEUE_SIZE = int(os.getenv('ADMISSION_QUEUE_SIZE', 16))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 1))
+# Limits shrink when requests get slower than this, 0 keeps them fixed
+ADMISSION_TARGET_LATENCY_MS = int(os.getenv('ADMISSION_TARGET_LATENCY_MS', 1000))
+ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', 1))
+ADMISSION_EXEMPT_PATHS = ['/ping', '/health']
+
+# Per-user token buckets, requests allowed in a burst and refilled per second
+RATE_LIMIT = os.getenv('RATE_LIMIT', 'true').lower() == 'true'
+# api.ratelimit.CacheBackend shares the buckets between workers through the cache
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'api.ratelimit.LocalBackend')
+RATE_LIMIT_READ_BURST = int(os.getenv('RATE_LIMIT_READ_BURST', 200))
+RATE_LIMIT_READ_PER_SECOND = float(os.getenv('RATE_LIMIT_READ_PER_SECOND', 50))
+RATE_LIMIT_WRITE_BURST = int(os.getenv('RATE_LIMIT_WRITE_BURST', 60))
+RATE_LIMIT_WRITE_PER_SECOND = float(os.getenv('RATE_LIMIT_WRITE_PER_SECOND', 10))
+
+# Tracing, share of requests traced when the caller sent no traceparent header
+TRACING_SAMPLE_RATE = float(os.getenv('TRACING_SAMPLE_RATE', 0.01))
+# api.tracing.CollectorExporter posts spans to TRACING_COLLECTOR_URL instead
+TRACING_EXPORTER = os.getenv('TRACING_EXPORTER', 'api.tracing.FileExporter')
+TRACING_FILE = os.getenv('TRACING_FILE', '/tmp/workspace-traces.jsonl')
+TRACING_COLLECTOR_URL = os.getenv('TRACING_COLLECTOR_URL', 'http://localhost:4318/spans')
+TRACING_EXPORT_TIMEOUT = float(os.getenv('TRACING_EXPORT_TIMEOUT', 0.5))
+# Traces waiting for the export thread, new ones are dropped beyond
+TRACING_EXPORT_QUEUE_SIZE = int(os.getenv('TRACING_EXPORT_QUEUE_SIZE', 1000))
+
+# Server-Timing response header with the time spent per phase of the request
+SERVER_TIMING = os.getenv('SERVER_TIMING', 'true').lower() == 'true'
+
+# Sampling profiler, all requests are sampled while enabled and the profiles
+# of those slower than PROFILING_SLOW_MS (or picked at random) are kept
+PROFILING = os.getenv('PROFILING', 'false').lower() == 'true'
+PROFILING_SLOW_MS = int(os.getenv('PROFILING_SLOW_MS', 1000))
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+PROFILING_INTERVAL_MS = int(os.getenv('PROFILING_INTERVAL_MS', 10))
+PROFILING_MAX_PROFILES = int(os.getenv('PROFILING_MAX_PROFILES', 20))
+PROFILING_DIR = os.getenv('PROFILING_DIR', '/tmp/workspace-profiles')
+
+# Memory instrumentation, allocations traced with tracemalloc (frames kept per
+# allocation) and diffed every MEMORY_SNAPSHOT_INTERVAL seconds
+MEMORY_PROFILING = os.getenv('MEMORY_PROFILING', 'false').lower() == 'true'
+MEMORY_TRACE_FRAMES = int(os.getenv('MEMORY_TRACE_FRAMES', 1))
+MEMORY_SNAPSHOT_INTERVAL = int(os.getenv('MEMORY_SNAPSHOT_INTERVAL', 300))
+MEMORY_TOP_LIMIT = int(os.getenv('MEMORY_TOP_LIMIT', 20))
+# Workers using more resident memory are recycled, 0 disables the guard
+MEMORY_MAX_RSS_MB = int(os.getenv('MEMORY_MAX_RSS_MB', 0))
+
+# Time budget of a request (0 disables it), external calls get what is left and
+# calls that can be skipped (notifications, gamification) are skipped once less
+# than REQUEST_DEADLINE_NON_ESSENTIAL_MS is left
+REQUEST_DEADLINE_MS = int(os.getenv('REQUEST_DEADLINE_MS', 10000))
+REQUEST_DEADLINE_NON_ESSENTIAL_MS = int(os.getenv('REQUEST_DEADLINE_NON_ESSENTIAL_MS', 500))
+# Calls with less time than this fail right away
+REQUEST_DEADLINE_MIN_CALL_MS = int(os.getenv('REQUEST_DEADLINE_MIN_CALL_MS', 20))
+
+# Hedged IAM reads, a second request is sent when the first one is slower than
+# HTTP_HEDGE_PERCENTILE of the last HTTP_HEDGE_WINDOW latencies, for at most
+# HTTP_HEDGE_BUDGET (ratio) of the requests
+HTTP_HEDGING = os.getenv('HTTP_HEDGING', 'false').lower() == 'true'
+HTTP_HEDGE_PERCENTILE = float(os.getenv('HTTP_HEDGE_PERCENTILE', 95))
+HTTP_HEDGE_MIN_SAMPLES = int(os.getenv('HTTP_HEDGE_MIN_SAMPLES', 20))
+HTTP_HEDGE_WINDOW = int(os.getenv('HTTP_HEDGE_WINDOW', 200))
+HTTP_HEDGE_BUDGET = float(os.getenv('HTTP_HEDGE_BUDGET', 0.05))
+# Threads running hedged calls, a call and its hedge for each request thread of
+# the worker. Calls made while they are all busy run unhedged
+HTTP_HEDGE_WORKERS = int(os.getenv('HTTP_HEDGE_WORKERS', 2 * int(os.getenv('GUNICORN_THREADS', 4))))
+
+# Seconds IAM users and permissions are cached, updated by the events IAM sends
+# to /internal/iam/events. Invalidated entries can't be filled again for
+# IAM_CACHE_TOMBSTONE_SECONDS, so answers fetched before an event are dropped
+IAM_USERS_CACHE_TTL = int(os.getenv('IAM_USERS_CACHE_TTL', 3600))
+IAM_PERMISSIONS_CACHE_TTL = int(os.getenv('IAM_PERMISSIONS_CACHE_TTL', 3600))
+IAM_CACHE_TOMBSTONE_SECONDS = int(os.getenv('IAM_CACHE_TOMBSTONE_SECONDS', 10))
+# Events only reach one worker with the local memory cache, the IAM TTLs are
+# then capped so the others don't keep revoked access for long
+IAM_LOCAL_CACHE_MAX_TTL = int(os.getenv('IAM_LOCAL_CACHE_MAX_TTL', 60))
+
+# Last known IAM users and permissions, served while IAM is unavailable. IAM is
+# then left alone for IAM_STALE_RETRY_SECONDS, unchanged snapshots are only
+# rewritten every IAM_SNAPSHOT_WRITE_INTERVAL seconds
+IAM_SNAPSHOTS = os.getenv('IAM_SNAPSHOTS', 'true').lower() == 'true'
+IAM_STALE_RETRY_SECONDS = int(os.getenv('IAM_STALE_RETRY_SECONDS', 10))
+IAM_SNAPSHOT_WRITE_INTERVAL = int(os.getenv('IAM_SNAPSHOT_WRITE_INTERVAL', 3600))
+
+# Cold start budget of a production worker (imports and first response),
+# checked by api.test_startup
+STARTUP_BUDGET_MS = int(os.getenv('STARTUP_BUDGET_MS', 1500))
+
 # LOGGING
 LOGGING_CONFIG = None
 logging.config.dictConfig({
@@ -158,7 +336,7 @@ REST_FRAMEWORK = {
     'UNAUTHENTICATED_USER': None,
 
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'api.renderers.FastJSONRenderer',
     )
 }
 
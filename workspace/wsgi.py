@@ -8,9 +8,22 @@ https://docs.djangoproject.com/en/3.0/howto/deployment/wsgi/
 """
 
 import os
+from importlib import import_module
 
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'workspace.settings')
 
 application = get_wsgi_application()
+
+from api import memory  # noqa: E402
+from api.connections import warm_up_connections  # noqa: E402
+
+# Preloaded by gunicorn, done in each worker by gunicorn_config.post_fork
+if os.getenv('WSGI_WORKER_INIT_IN_POST_FORK') != 'true':
+    warm_up_connections()
+    memory.start()
+else:
+    # Forked workers inherit the URLconf and views instead of importing them on their first request
+    from django.conf import settings  # noqa: E402
+    import_module(settings.ROOT_URLCONF)